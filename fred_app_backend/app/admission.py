@@ -0,0 +1,144 @@
+"""
+Admission control: at most as many database-bound requests run at once as
+the worker's pool has connections, so none of them blocks in the pool
+checkout (up to its 30 s timeout) while more pile up in the threadpool.
+
+Requests are split in two classes with their own limit, so a burst of reads
+cannot starve the writes: "read" (GET/HEAD) and "write" (everything else).
+By default writes get a third of pool_size + max_overflow and reads the
+rest. Over the limit a request waits in a bounded FIFO queue for at most
+ADMISSION_QUEUE_TIMEOUT seconds; when the queue is full, or the wait runs
+out, it gets an immediate 503 with Retry-After instead of a slow timeout.
+
+Requests that hold no connection while they run skip the queue: health,
+metrics, docs, photos (files) and the SSE change feed (it releases its
+session before streaming).
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Deque
+
+from fastapi.responses import JSONResponse
+
+from app import metrics
+from app.config import settings
+from app.database import pool_limits
+
+_EXEMPT_PATHS = {"/", "/health", "/metrics", "/docs", "/redoc", "/openapi.json", "/docs/oauth2-redirect"}
+
+
+class Limiter:
+    """Up to limit concurrent holders, then a FIFO queue of up to queue_size waiters."""
+
+    def __init__(self, route_class: str, limit: int, queue_size: int, timeout: float):
+        self.route_class = route_class
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._in_flight_gauge = metrics.ADMISSION_IN_FLIGHT.labels(route_class)
+        self._queue_depth_gauge = metrics.ADMISSION_QUEUE_DEPTH.labels(route_class)
+
+    def _publish(self):
+        # Set on every change: with several workers the gauges are read from files, not called back
+        self._in_flight_gauge.set(self.in_flight)
+        self._queue_depth_gauge.set(len(self._waiters))
+
+    async def acquire(self) -> bool:
+        """Take a slot; False (request to be shed) when the queue is full or the wait times out."""
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self._publish()
+            return True
+        if len(self._waiters) >= self.queue_size:
+            metrics.ADMISSION_REJECTED.labels(self.route_class, "queue_full").inc()
+            return False
+
+        start = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._publish()
+        try:
+            await asyncio.wait({waiter}, timeout=self.timeout)
+        except asyncio.CancelledError:
+            # Client gone while queued; a slot handed over meanwhile goes to the next one
+            if waiter.done():
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+                self._publish()
+            raise
+
+        if not waiter.done():
+            self._waiters.remove(waiter)
+            self._publish()
+            metrics.ADMISSION_REJECTED.labels(self.route_class, "timeout").inc()
+            return False
+        metrics.ADMISSION_WAIT.labels(self.route_class).observe(time.perf_counter() - start)
+        return True
+
+    def release(self):
+        if self._waiters:
+            # The slot passes straight to the oldest waiter: in_flight is unchanged
+            self._waiters.popleft().set_result(None)
+        else:
+            self.in_flight -= 1
+        self._publish()
+
+
+def _limits():
+    pool_size, max_overflow = pool_limits()
+    connections = pool_size + max_overflow
+    write_limit = settings.admission_write_limit or max(1, connections // 3)
+    read_limit = settings.admission_read_limit or max(1, connections - write_limit)
+    return read_limit, write_limit
+
+
+def _exempt(path: str) -> bool:
+    return path in _EXEMPT_PATHS or path.startswith("/photos") or path.endswith("/events")
+
+
+class AdmissionMiddleware:
+    """ASGI middleware queueing or shedding requests per route class (see module docstring)."""
+
+    def __init__(self, app):
+        self.app = app
+        self._limiters = None
+
+    def _limiter(self, method: str) -> Limiter:
+        if self._limiters is None:
+            # Built on the first request: the pool sizes come from the worker's settings
+            read_limit, write_limit = _limits()
+            self._limiters = {
+                route_class: Limiter(
+                    route_class, limit, settings.admission_queue_size or 2 * limit, settings.admission_queue_timeout
+                )
+                for route_class, limit in (("read", read_limit), ("write", write_limit))
+            }
+        return self._limiters["read" if method in ("GET", "HEAD") else "write"]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or _exempt(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self._limiter(scope["method"])
+        if not await limiter.acquire():
+            response = JSONResponse(
+                status_code=503,
+                content={
+                    "error": "ServiceUnavailable",
+                    "message": "Server busy, retry shortly",
+                    "statusCode": 503,
+                },
+                headers={"Retry-After": str(settings.admission_retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
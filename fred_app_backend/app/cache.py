@@ -0,0 +1,200 @@
+"""
+In-process response cache for the GET endpoints.
+
+Entries are keyed by path + query string and tagged with the data version of
+the pet they belong to (the pet_id path/query parameter). Every write in
+app/crud.py marks its pet as changed on the session, and the version is
+bumped once the transaction commits, so entries built from older data stop
+matching and simply age out of the LRU.
+
+Responses carry a strong ETag (hash of the body); a matching If-None-Match
+is answered with 304 straight from the cache, before the route opens a
+database session.
+
+Each process has its own cache; writes made by the other workers (or other
+instances) arrive through NOTIFY, see app/events.py.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import read_routing
+from app.utils import now_brasilia
+
+# Response headers replayed from the cache (everything else is rebuilt)
+_CACHED_HEADERS = ("content-type", "x-next-cursor")
+
+# Session.info key holding the pets touched by the current transaction
+_CHANGED_PETS = "cache_changed_pets"
+ALL_PETS = "*"
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._pet_versions: Dict[str, int] = {}
+        self._global_version = 0  # bumped by every write: unscoped lists (GET /pets)
+        self._epoch = 0  # bumped by writes spanning all pets
+        # Monotonic time of the last write: any pet, every pet, each pet
+        self._changed_at = float("-inf")
+        self._all_changed_at = float("-inf")
+        self._pet_changed_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def version(self, pet_id: Optional[str]) -> Tuple[int, int]:
+        with self._lock:
+            if pet_id is None:
+                return self._epoch, self._global_version
+            return self._epoch, self._pet_versions.get(pet_id, 0)
+
+    def bump(self, pet_ids):
+        now = time.monotonic()
+        with self._lock:
+            self._global_version += 1
+            self._changed_at = now
+            if ALL_PETS in pet_ids:
+                self._epoch += 1
+                self._all_changed_at = now
+                self._pet_versions.clear()
+                self._pet_changed_at.clear()
+                self._entries.clear()
+                return
+            for pet_id in pet_ids:
+                self._pet_versions[pet_id] = self._pet_versions.get(pet_id, 0) + 1
+                self._pet_changed_at[pet_id] = now
+
+    def changed_within(self, pet_id: Optional[str], seconds: float) -> bool:
+        """Whether pet_id (None: any pet) had a write in the last seconds."""
+        since = time.monotonic() - seconds
+        with self._lock:
+            if pet_id is None:
+                return self._changed_at >= since
+            return max(self._all_changed_at, self._pet_changed_at.get(pet_id, float("-inf"))) >= since
+
+    def get(self, key: tuple, version: Tuple[int, int]):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple, version: Tuple[int, int], etag: str, body: bytes, headers: Dict[str, str]):
+        with self._lock:
+            self._entries[key] = (version, etag, body, headers)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache(settings.response_cache_size)
+
+
+def mark_pet_changed(db: Session, pet_id: Optional[str]):
+    """Record a write to pet_id (None = every pet); applied when db commits."""
+    db.info.setdefault(_CHANGED_PETS, set()).add(pet_id or ALL_PETS)
+
+
+def pending_changes(db: Session) -> set:
+    """Pets marked as changed by db's current transaction."""
+    return db.info.get(_CHANGED_PETS, set())
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_changed_pets(session):
+    changed = session.info.pop(_CHANGED_PETS, None)
+    if changed:
+        response_cache.bump(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_pets(session):
+    session.info.pop(_CHANGED_PETS, None)
+
+
+def _etag(body: bytes) -> str:
+    return '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+async def serve_cached(request: Request, handler: Callable) -> Response:
+    pet_id = request.path_params.get("pet_id") or request.query_params.get("pet_id")
+    # Handlers default "today" both from the server clock and Brasília time
+    key = (
+        request.url.path,
+        tuple(sorted(request.query_params.multi_items())),
+        date.today(),
+        now_brasilia().date(),
+    )
+    version = response_cache.version(pet_id)
+
+    entry = response_cache.get(key, version)
+    if entry is not None:
+        _, etag, body, headers = entry
+        if etag_matches(request, etag):
+            return _not_modified(etag)
+        return Response(content=body, headers={**headers, "ETag": etag, "Cache-Control": "no-cache"})
+
+    response = await handler(request)
+    body = getattr(response, "body", None)
+    if response.status_code != 200 or body is None:
+        return response
+
+    etag = _etag(body)
+    headers = {name: response.headers[name] for name in _CACHED_HEADERS if name in response.headers}
+    # A replica may not have replayed a recent write yet: what it returned must
+    # not outlive that lag in the cache
+    routing = read_routing.get()
+    stale_risk = (
+        routing is not None and routing.replica_used
+        and response_cache.changed_within(pet_id, settings.replica_sticky_seconds)
+    )
+    if not stale_risk:
+        # Stored under the version read before the handler ran: a write committed
+        # meanwhile bumps the version and the entry is never served
+        response_cache.put(key, version, etag, body, headers)
+
+    if etag_matches(request, etag):
+        return _not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+class CachedRoute(APIRoute):
+    """APIRoute that serves GET endpoints through response_cache."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        if "GET" not in self.methods or response_cache.max_entries <= 0:
+            return handler
+
+        async def cached_handler(request: Request) -> Response:
+            return await serve_cached(request, handler)
+
+        return cached_handler
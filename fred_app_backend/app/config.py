@@ -1,4 +1,5 @@
-from typing import Optional
+import os
+from typing import Dict, List, Optional
 from urllib.parse import quote_plus
 
 from pydantic_settings import BaseSettings
@@ -21,6 +22,79 @@ class Settings(BaseSettings):
     # DATABASE_URL (será construída automaticamente se não fornecida)
     database_url: Optional[str] = None
 
+    # Usa AsyncSession (psycopg async) nas rotas em vez da Session síncrona
+    db_async: bool = False
+
+    # Conexões abertas no pool durante o startup (0: abre sob demanda, na primeira requisição)
+    db_pool_warmup: int = 0
+
+    # Réplicas de leitura (JSON, ex. DATABASE_REPLICA_URLS='["postgresql+psycopg://...@replica1/postgres"]').
+    # GETs leem delas em round-robin entre as saudáveis; escritas, e as leituras do mesmo
+    # cliente até replica_sticky_seconds depois de uma escrita (cookie ou header X-Last-Write),
+    # ficam no primário. replica_max_lag_seconds > 0 tira de rotação a réplica atrasada
+    database_replica_urls: List[str] = []
+    replica_sticky_seconds: float = 5
+    replica_health_interval: float = 10
+    replica_max_lag_seconds: float = 0
+
+    # Orçamento total de conexões com o banco, somando todos os workers (ex. o limite
+    # do Supabase menos uma folga para migrations e psql). 0: pool fixo de 5 + 10 por engine
+    db_max_connections: int = 0
+
+    # Controle de admissão (por worker, app/admission.py): requisições simultâneas que usam
+    # o banco, por classe (leitura: GET/HEAD; escrita: as demais). 0: deriva do pool do worker
+    # (1/3 para escritas, o resto para leituras). Além do limite, espera numa fila de até
+    # admission_queue_size (0: 2x o limite) por no máximo admission_queue_timeout segundos;
+    # fila cheia ou espera esgotada: 503 com Retry-After imediato
+    admission_control: bool = True
+    admission_read_limit: int = 0
+    admission_write_limit: int = 0
+    admission_queue_size: int = 0
+    admission_queue_timeout: float = 2.0
+    admission_retry_after: int = 1
+
+    # Servidor de produção (gunicorn.conf.py): processos worker (0: um por núcleo de CPU),
+    # reciclagem após N requisições (0 desativa) e prazo para terminar as requisições em curso
+    web_concurrency: int = 0
+    worker_max_requests: int = 2000
+    worker_graceful_timeout: int = 30
+
+    # Materializa as tarefas do dia para todos os pets à meia-noite de Brasília
+    daily_tasks_scheduler: bool = True
+
+    # Faixa alvo de glicemia (mg/dL) usada nas estatísticas diárias.
+    # Ao alterar, reprocesse com: python -m app.jobs.backfill_glucose_stats
+    glucose_range_low: float = 80
+    glucose_range_high: float = 250
+
+    # Listagens (glicemia, humor, passeios) leem linhas Core e serializam com orjson,
+    # sem montar objetos ORM nem revalidar com Pydantic
+    lean_reads: bool = True
+
+    # Máximo de respostas GET mantidas no cache em memória (0 desativa o cache)
+    response_cache_size: int = 1024
+
+    # Publica inserções/alterações/exclusões via NOTIFY para o feed GET /pets/{id}/events
+    change_feed: bool = True
+
+    # Rastreamento de SQL por requisição (dev/staging): headers X-DB-Queries / X-DB-Time
+    # e orçamento de comandos por rota, ex. QUERY_BUDGETS='{"GET /pets/{pet_id}/dashboard": 8}'
+    query_trace: bool = False
+    query_budget: int = 10
+    query_budgets: Dict[str, int] = {}
+    query_repeat_limit: int = 3  # mesmo comando repetido N vezes: provável N+1
+    query_budget_action: str = "log"  # log ou raise
+    query_trace_stack_depth: int = 6
+
+    # Fotos dos passeios: arquivos endereçados pelo SHA-256 do conteúdo
+    # (backend "local" grava em photo_storage_dir)
+    photo_storage_backend: str = "local"
+    photo_storage_dir: str = "data/photos"
+    photo_max_bytes: int = 20 * 1024 * 1024
+
+    # Processos dedicados à geração de miniaturas (fora do event loop e do threadpool)
+    thumbnail_workers: int = 2
+
     secret_key: str = "your-secret-key-here"
     debug: bool = True
     timezone: str = "America/Sao_Paulo"
@@ -45,5 +119,11 @@ class Settings(BaseSettings):
 
 settings = Settings()
 
+
+def worker_count() -> int:
+    """Worker processes of the production server (WEB_CONCURRENCY, else one per CPU core)."""
+    return settings.web_concurrency or os.cpu_count() or 1
+
+
 # Timezone object for use throughout the application
 BRASILIA_TZ = pytz.timezone(settings.timezone)
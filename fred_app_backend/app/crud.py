@@ -1,13 +1,80 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, case
-from typing import List, Optional
-from datetime import datetime, date
+from sqlalchemy.orm import Session, undefer
+from sqlalchemy import desc, case, cast, delete, func, insert, literal, literal_column, select, tuple_, union_all, update, Column, Date, Integer, JSON, MetaData, String, Table
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Iterable, List, Optional, Tuple
+from datetime import datetime, date, timedelta
+import json
+import math
 import uuid
 
 from app import models, schemas
+from app.cache import mark_pet_changed
+from app.config import settings
+from app.events import record_bulk_change, record_change
+from app.photo_storage import externalize_photos
 from app.utils import now_brasilia, to_brasilia
 
 
+# RETURNING helpers: one statement per write, no refresh or pre-select.
+# commit=False lets the caller add statements (e.g. rollups) to the same transaction.
+# Rows come back with every column (deferred ones included) since they are
+# returned as the full response schema.
+# Each one marks the row's pet as changed so cached GET responses are invalidated,
+# and records the change for the pet's event feed.
+def _mark_changed(db: Session, model, db_obj, op: str):
+    if db_obj is not None:
+        mark_pet_changed(db, db_obj.id if model is models.Pet else db_obj.pet_id)
+        record_change(db, model, op, db_obj)
+
+
+def _insert_returning(db: Session, model, values: dict):
+    db_obj = db.scalar(insert(model).values(**values).returning(model).options(undefer("*")))
+    _mark_changed(db, model, db_obj, "insert")
+    db.commit()
+    return db_obj
+
+
+def _insert_for_pet_returning(db: Session, model, values: dict, commit: bool = True):
+    """
+    INSERT ... SELECT ... FROM pets WHERE id = :pet_id RETURNING *.
+    Returns None when the pet does not exist, so the existence check and the
+    insert are a single round trip.
+    """
+    table = model.__table__
+    values = {"created_at": now_brasilia(), **values}
+    pet_row = select(
+        *[literal(value, table.c[column].type).label(column) for column, value in values.items()]
+    ).where(models.Pet.id == values["pet_id"])
+
+    db_obj = db.scalar(insert(model).from_select(list(values), pet_row).returning(model).options(undefer("*")))
+    _mark_changed(db, model, db_obj, "insert")
+    if commit:
+        db.commit()
+    return db_obj
+
+
+def _update_returning(db: Session, model, row_id: str, values: dict, commit: bool = True):
+    """UPDATE ... RETURNING *; None when the row does not exist."""
+    if not values:
+        return db.scalar(select(model).where(model.id == row_id).options(undefer("*")))
+
+    statement = update(model).where(model.id == row_id).values(**values).returning(model).options(undefer("*"))
+    db_obj = db.scalar(statement.execution_options(populate_existing=True))
+    _mark_changed(db, model, db_obj, "update")
+    if commit:
+        db.commit()
+    return db_obj
+
+
+def _delete_returning(db: Session, model, row_id: str, commit: bool = True):
+    """DELETE ... RETURNING *; None when the row does not exist."""
+    db_obj = db.scalar(delete(model).where(model.id == row_id).returning(model).options(undefer("*")))
+    _mark_changed(db, model, db_obj, "delete")
+    if commit:
+        db.commit()
+    return db_obj
+
+
 # Pet CRUD operations
 def get_pet(db: Session, pet_id: str):
     return db.query(models.Pet).filter(models.Pet.id == pet_id).first()
@@ -18,24 +85,16 @@ def get_pets(db: Session, skip: int = 0, limit: int = 100):
 
 
 def create_pet(db: Session, pet: schemas.PetCreate):
-    db_pet = models.Pet(
+    return _insert_returning(db, models.Pet, dict(
         id=str(uuid.uuid4()),
         name=pet.name,
         breed=pet.breed,
         age=pet.age
-    )
-    db.add(db_pet)
-    db.commit()
-    db.refresh(db_pet)
-    return db_pet
+    ))
 
 
 def delete_pet(db: Session, pet_id: str):
-    db_pet = db.query(models.Pet).filter(models.Pet.id == pet_id).first()
-    if db_pet:
-        db.delete(db_pet)
-        db.commit()
-    return db_pet
+    return _delete_returning(db, models.Pet, pet_id)
 
 
 # Routine Template CRUD operations
@@ -49,87 +108,123 @@ def get_routine_templates(db: Session, pet_id: str, active_only: bool = True):
 
 
 def create_routine_template(db: Session, template: schemas.RoutineTemplateCreate, pet_id: str):
-    db_template = models.RoutineTemplate(
+    """Returns None if the pet does not exist."""
+    return _insert_for_pet_returning(db, models.RoutineTemplate, dict(
         id=str(uuid.uuid4()),
         pet_id=pet_id,
         period=template.period,
         task=template.task,
         is_active=True
-    )
-    db.add(db_template)
-    db.commit()
-    db.refresh(db_template)
-    return db_template
+    ))
 
 
 def update_routine_template(db: Session, template_id: str, template_update: schemas.RoutineTemplateUpdate):
-    db_template = db.query(models.RoutineTemplate).filter(models.RoutineTemplate.id == template_id).first()
-    if db_template:
-        if template_update.is_active is not None:
-            db_template.is_active = template_update.is_active
-        if template_update.period is not None:
-            db_template.period = template_update.period
-        if template_update.task is not None:
-            db_template.task = template_update.task
-        db.commit()
-        db.refresh(db_template)
-    return db_template
+    values = {}
+    if template_update.is_active is not None:
+        values["is_active"] = template_update.is_active
+    if template_update.period is not None:
+        values["period"] = template_update.period
+    if template_update.task is not None:
+        values["task"] = template_update.task
+
+    return _update_returning(db, models.RoutineTemplate, template_id, values)
 
 
 def delete_routine_template(db: Session, template_id: str):
-    db_template = db.query(models.RoutineTemplate).filter(models.RoutineTemplate.id == template_id).first()
-    if db_template:
-        db.delete(db_template)
-        db.commit()
-    return db_template
+    # Items already created from the template are kept, detached from it
+    detached = db.execute(
+        update(models.RoutineItem.__table__)
+        .where(models.RoutineItem.template_id == template_id)
+        .values(template_id=None)
+        .returning(*models.RoutineItem.__table__.c)
+    ).all()
+    for item in detached:
+        record_change(db, models.RoutineItem, "update", item)
+    return _delete_returning(db, models.RoutineTemplate, template_id)
 
 
-def ensure_daily_tasks(db: Session, pet_id: str, target_date: str):
-    """
-    Ensure that routine items exist for the given date.
-    If they don't exist, create them from active templates.
+def _materialize_daily_tasks_statement(
+    target_date: date,
+    pet_id: Optional[str] = None,
+    created_at: Optional[datetime] = None
+):
     """
-    existing_tasks = db.query(models.RoutineItem).filter(
-        models.RoutineItem.pet_id == pet_id,
-        models.RoutineItem.date == target_date
-    ).all()
+    INSERT INTO routine_items SELECT ... FROM the active templates
+    ON CONFLICT (pet_id, template_id, date) DO NOTHING.
 
-    # Get active templates
-    templates = get_routine_templates(db, pet_id, active_only=True)
+    The unique index makes concurrent calls safe: whoever inserts first wins
+    and the others silently skip the row.
+    """
+    routine_items = models.RoutineItem.__table__
+    templates = models.RoutineTemplate
+
+    source = select(
+        cast(func.gen_random_uuid(), String),
+        templates.pet_id,
+        templates.id,
+        templates.period,
+        templates.task,
+        literal(False),
+        literal(target_date, routine_items.c.date.type),
+        literal(created_at or now_brasilia(), routine_items.c.created_at.type),
+    ).where(templates.is_active == True)
+
+    if pet_id is not None:
+        source = source.where(templates.pet_id == pet_id)
+
+    return pg_insert(routine_items).from_select(
+        ["id", "pet_id", "template_id", "period", "task", "completed", "date", "created_at"],
+        source,
+    ).on_conflict_do_nothing(index_elements=["pet_id", "template_id", "date"])
+
+
+def materialize_daily_tasks(db: Session, target_date: date, pet_id: Optional[str] = None) -> int:
+    """
+    Create the missing routine items for target_date from the active
+    templates, for one pet or for every pet. Returns how many were created.
+    """
+    routine_items = models.RoutineItem.__table__
+    created = db.execute(_materialize_daily_tasks_statement(target_date, pet_id).returning(*routine_items.c)).all()
+    if created:
+        mark_pet_changed(db, pet_id)
+    for item in created:
+        record_change(db, models.RoutineItem, "insert", item)
+    db.commit()
+    return len(created)
 
-    # Track which templates already have items for this date
-    existing_template_ids = {
-        task.template_id for task in existing_tasks if task.template_id is not None
-    }
 
-    # Create routine items from templates that are missing
-    created_items = []
-    for template in templates:
-        if template.id in existing_template_ids:
-            continue
-
-        db_routine_item = models.RoutineItem(
-            id=str(uuid.uuid4()),
-            pet_id=pet_id,
-            template_id=template.id,
-            period=template.period,
-            task=template.task,
-            date=target_date,
-            completed=False
-        )
-        db.add(db_routine_item)
-        created_items.append(db_routine_item)
+def ensure_daily_tasks(db: Session, pet_id: str, target_date: date):
+    """
+    Ensure that routine items exist for the given date.
+    If they don't exist, create them from active templates.
 
-    if created_items:
-        db.commit()
-        for item in created_items:
-            db.refresh(item)
+    Single round trip: the INSERT ... ON CONFLICT runs as a CTE next to the
+    read of the day's items. Once the nightly job has materialized the day
+    it inserts nothing and the call is just the read.
+    """
+    routine_items = models.RoutineItem.__table__
+    created_at = now_brasilia()
+    inserted = _materialize_daily_tasks_statement(target_date, pet_id, created_at).returning(*routine_items.c).cte("inserted")
+    existing = select(*routine_items.c).where(
+        routine_items.c.pet_id == pet_id,
+        routine_items.c.date == target_date,
+    )
 
-    return existing_tasks + created_items
+    tasks = db.scalars(
+        select(models.RoutineItem).from_statement(union_all(existing, select(*inserted.c)))
+    ).all()
+    # The rows this call inserted carry its created_at
+    created = [task for task in tasks if task.created_at == created_at]
+    if created:
+        mark_pet_changed(db, pet_id)
+    for task in created:
+        record_change(db, models.RoutineItem, "insert", task)
+    db.commit()
+    return tasks
 
 
 # Routine Item CRUD operations
-def get_routine_items(db: Session, pet_id: str, date_filter: Optional[str] = None, sort: Optional[str] = None):
+def get_routine_items(db: Session, pet_id: str, date_filter: Optional[date] = None, sort: Optional[str] = None):
     query = db.query(models.RoutineItem).filter(models.RoutineItem.pet_id == pet_id)
     
     if date_filter:
@@ -150,68 +245,122 @@ def get_routine_items(db: Session, pet_id: str, date_filter: Optional[str] = Non
 
 
 def create_routine_item(db: Session, routine_item: schemas.RoutineItemCreate, pet_id: str):
+    """Returns None if the pet does not exist."""
     # Set default date if not provided
-    item_date = routine_item.date or str(date.today())
-    
-    db_routine_item = models.RoutineItem(
+    item_date = routine_item.date or date.today()
+
+    return _insert_for_pet_returning(db, models.RoutineItem, dict(
         id=str(uuid.uuid4()),
         pet_id=pet_id,
         template_id=routine_item.template_id,
         period=routine_item.period,
         task=routine_item.task,
+        completed=False,
         date=item_date
-    )
-    db.add(db_routine_item)
-    db.commit()
-    db.refresh(db_routine_item)
-    return db_routine_item
+    ))
 
 
 def update_routine_item(db: Session, routine_item_id: str, routine_item_update: schemas.RoutineItemUpdate):
-    db_routine_item = db.query(models.RoutineItem).filter(models.RoutineItem.id == routine_item_id).first()
-    if db_routine_item:
-        db_routine_item.completed = routine_item_update.completed
-        if routine_item_update.completed_at is not None:
-            if routine_item_update.completed_at:
-                # Parse the datetime and convert to Brasília timezone
-                dt = datetime.fromisoformat(routine_item_update.completed_at.replace('Z', '+00:00'))
-                db_routine_item.completed_at = to_brasilia(dt)
-            else:
-                db_routine_item.completed_at = None
-        db.commit()
-        db.refresh(db_routine_item)
-    return db_routine_item
+    values = {"completed": routine_item_update.completed}
+    if routine_item_update.completed_at is not None:
+        if routine_item_update.completed_at:
+            # Parse the datetime and convert to Brasília timezone
+            dt = datetime.fromisoformat(routine_item_update.completed_at.replace('Z', '+00:00'))
+            values["completed_at"] = to_brasilia(dt)
+        else:
+            values["completed_at"] = None
+
+    return _update_returning(db, models.RoutineItem, routine_item_id, values)
 
 
 def delete_routine_item(db: Session, routine_item_id: str):
-    db_routine_item = db.query(models.RoutineItem).filter(models.RoutineItem.id == routine_item_id).first()
-    if db_routine_item:
-        db.delete(db_routine_item)
-        db.commit()
-    return db_routine_item
+    return _delete_returning(db, models.RoutineItem, routine_item_id)
+
+
+def _keyset_page(
+    db: Session,
+    query,
+    sort_column,
+    id_column,
+    ascending: bool,
+    limit: int,
+    after: Optional[Tuple[datetime, str]],
+    columns: Optional[List[str]] = None
+):
+    """
+    Orders by (sort_column, id) and returns the page that starts right after
+    the `after` key, so every page is an index range scan instead of an OFFSET.
+
+    With columns the page is read as plain Core rows holding only those
+    columns (no ORM hydration; see utils.rows_response). Otherwise full ORM
+    objects, deferred columns included.
+    """
+    if ascending:
+        if after is not None:
+            query = query.where(tuple_(sort_column, id_column) > tuple_(*after))
+        query = query.order_by(sort_column.asc(), id_column.asc())
+    else:
+        if after is not None:
+            query = query.where(tuple_(sort_column, id_column) < tuple_(*after))
+        query = query.order_by(desc(sort_column), desc(id_column))
+
+    if limit:
+        query = query.limit(limit)
+
+    if columns is not None:
+        table = sort_column.class_.__table__
+        return db.execute(query.with_only_columns(*[table.c[name] for name in columns])).all()
+    return db.scalars(query.options(undefer("*"))).all()
+
+
+def _lean_columns(schema, lean: bool, fields: Optional[List[str]]):
+    """Columns read by the lean path: the requested fields, or the whole response schema."""
+    if fields:
+        return fields
+    return list(schema.model_fields) if lean else None
 
 
 # Glucose Reading CRUD operations
-def get_glucose_readings(db: Session, pet_id: str, limit: int = 30, sort: Optional[str] = None):
-    query = db.query(models.GlucoseReading).filter(models.GlucoseReading.pet_id == pet_id)
-    
-    if sort == "created_at:desc":
-        query = query.order_by(desc(models.GlucoseReading.created_at))
-    
-    return query.limit(limit).all()
+def get_glucose_readings(
+    db: Session,
+    pet_id: str,
+    limit: int = 30,
+    sort: Optional[str] = None,
+    after: Optional[Tuple[datetime, str]] = None,
+    lean: bool = False,
+    fields: Optional[List[str]] = None
+):
+    query = select(models.GlucoseReading).where(models.GlucoseReading.pet_id == pet_id)
+    return _keyset_page(
+        db,
+        query,
+        models.GlucoseReading.created_at,
+        models.GlucoseReading.id,
+        sort == "created_at:asc",
+        limit,
+        after,
+        columns=_lean_columns(schemas.GlucoseReading, lean, fields),
+    )
 
 
-def create_glucose_reading(db: Session, glucose_reading: schemas.GlucoseReadingCreate, pet_id: str):
+def _glucose_reading_values(glucose_reading: schemas.GlucoseReadingCreate, pet_id: str):
     from app.utils import get_time_of_day_from_hour
 
+    # The reading's own time when given (imports, late entries), else now, in Brasília time
+    if glucose_reading.measured_at:
+        measured_at = to_brasilia(glucose_reading.measured_at)
+        default_date = measured_at.date()
+    else:
+        measured_at = now_brasilia()
+        default_date = date.today()
+
     # Set default date if not provided
-    reading_date = glucose_reading.date or str(date.today())
+    reading_date = glucose_reading.date or default_date
 
-    # Calculate time_of_day based on current hour in Brasília timezone
-    current_time = now_brasilia()
-    time_of_day = get_time_of_day_from_hour(current_time.hour)
+    # Calculate time_of_day based on the hour of the reading in Brasília timezone
+    time_of_day = get_time_of_day_from_hour(measured_at.hour)
 
-    db_glucose_reading = models.GlucoseReading(
+    return dict(
         id=str(uuid.uuid4()),
         pet_id=pet_id,
         value=glucose_reading.value,
@@ -219,54 +368,255 @@ def create_glucose_reading(db: Session, glucose_reading: schemas.GlucoseReadingC
         protocol=glucose_reading.protocol,
         notes=glucose_reading.notes,
         insulin_dose=glucose_reading.insulin_dose,
-        date=reading_date
+        date=reading_date,
+        created_at=measured_at
     )
-    db.add(db_glucose_reading)
+
+
+def create_glucose_reading(db: Session, glucose_reading: schemas.GlucoseReadingCreate, pet_id: str):
+    """Returns None if the pet does not exist."""
+    db_glucose_reading = _insert_for_pet_returning(
+        db, models.GlucoseReading, _glucose_reading_values(glucose_reading, pet_id), commit=False
+    )
+    if db_glucose_reading is not None:
+        refresh_glucose_daily_stats(db, pet_id=pet_id, dates=[db_glucose_reading.date])
     db.commit()
-    db.refresh(db_glucose_reading)
     return db_glucose_reading
 
 
-def update_glucose_reading(db: Session, glucose_reading_id: str, updates: schemas.GlucoseReadingUpdate):
-    db_glucose_reading = (
-        db.query(models.GlucoseReading).filter(models.GlucoseReading.id == glucose_reading_id).first()
-    )
+def create_glucose_readings(db: Session, glucose_readings: List[schemas.GlucoseReadingCreate], pet_id: str):
+    """Insert many readings with one multi-row INSERT ... RETURNING in a single transaction."""
+    if not glucose_readings:
+        return []
 
-    if not db_glucose_reading:
-        return None
+    rows = [_glucose_reading_values(glucose_reading, pet_id) for glucose_reading in glucose_readings]
+    db_glucose_readings = db.scalars(
+        insert(models.GlucoseReading).returning(models.GlucoseReading, sort_by_parameter_order=True),
+        rows,
+        # Keep NULLs in the VALUES list so rows with different empty fields are
+        # not split into separate INSERT statements
+        execution_options={"render_nulls": True},
+    ).all()
+    refresh_glucose_daily_stats(db, pet_id=pet_id, dates={reading.date for reading in db_glucose_readings})
+    mark_pet_changed(db, pet_id)
+    for reading in db_glucose_readings:
+        record_change(db, models.GlucoseReading, "insert", reading)
+    db.commit()
+    return db_glucose_readings
 
-    update_data = updates.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_glucose_reading, field, value)
 
+def update_glucose_reading(db: Session, glucose_reading_id: str, updates: schemas.GlucoseReadingUpdate):
+    update_data = updates.model_dump(exclude_unset=True)
+    db_glucose_reading = _update_returning(
+        db, models.GlucoseReading, glucose_reading_id, update_data, commit=False
+    )
+    # Only value and date feed the daily rollup
+    if db_glucose_reading is not None and update_data.keys() & {"value", "date"}:
+        refresh_glucose_daily_stats(db, pet_id=db_glucose_reading.pet_id, dates=[db_glucose_reading.date])
     db.commit()
-    db.refresh(db_glucose_reading)
     return db_glucose_reading
 
 
 def delete_glucose_reading(db: Session, glucose_reading_id: str):
-    db_glucose_reading = db.query(models.GlucoseReading).filter(models.GlucoseReading.id == glucose_reading_id).first()
-    if db_glucose_reading:
-        db.delete(db_glucose_reading)
-        db.commit()
+    db_glucose_reading = _delete_returning(db, models.GlucoseReading, glucose_reading_id, commit=False)
+    if db_glucose_reading is not None:
+        refresh_glucose_daily_stats(db, pet_id=db_glucose_reading.pet_id, dates=[db_glucose_reading.date])
+    db.commit()
     return db_glucose_reading
 
 
+def _glucose_daily_stats_source(pet_id: Optional[str] = None, dates: Optional[Iterable[date]] = None):
+    """Per (pet, day) aggregates of glucose_readings, optionally limited to one pet / some days."""
+    readings = models.GlucoseReading
+    value = readings.value
+    low, high = settings.glucose_range_low, settings.glucose_range_high
+
+    source = select(
+        readings.pet_id,
+        readings.date,
+        func.count(),
+        func.sum(value),
+        func.sum(value * value),
+        func.min(value),
+        func.max(value),
+        func.sum(case((value < low, 1), else_=0)),
+        func.sum(case((value.between(low, high), 1), else_=0)),
+        func.sum(case((value > high, 1), else_=0)),
+        literal(now_brasilia(), models.GlucoseDailyStat.updated_at.type),
+    ).group_by(readings.pet_id, readings.date)
+
+    if pet_id is not None:
+        source = source.where(readings.pet_id == pet_id)
+    if dates is not None:
+        source = source.where(readings.date.in_(list(dates)))
+    return source
+
+
+def _lock_rollup_days(db: Session, stats: Table, pet_id: Optional[str], dates):
+    """
+    Serialize the refreshes of the same rollup rows, until the transaction ends.
+
+    A refresh of some days of one pet takes the table-wide advisory lock in
+    shared mode, then one exclusive lock per (pet_id, date), in sorted order
+    so two writers never wait on each other crosswise. A wider refresh
+    (backfill) takes the table-wide lock exclusively.
+    """
+    table_key = func.hashtext(stats.name)
+    if pet_id is None or dates is None:
+        db.execute(select(func.pg_advisory_xact_lock(table_key)))
+        return
+
+    day_keys = [func.hashtext(f"{stats.name}:{pet_id}:{day.isoformat()}") for day in sorted(set(dates))]
+    # One round trip; the target list is evaluated left to right
+    db.execute(select(
+        func.pg_advisory_xact_lock_shared(table_key),
+        *[func.pg_advisory_xact_lock(key) for key in day_keys],
+    ))
+
+
+def _refresh_daily_rollup(db: Session, stats_model, source_model, source, pet_id: Optional[str], dates):
+    """
+    Recompute rollup rows keyed by (pet_id, date) from `source`, an aggregate
+    select over source_model with the rollup's columns in table order. Days
+    left without source rows lose their rollup row. Runs in the caller's
+    transaction.
+
+    Under READ COMMITTED two writers of the same day would each aggregate a
+    snapshot without the other's uncommitted row, and the last upsert would
+    drop the other's contribution. The advisory locks make the second writer
+    wait for the first to commit; its statements then see both rows.
+    """
+    stats = stats_model.__table__
+    _lock_rollup_days(db, stats, pet_id, dates)
+
+    stale = delete(stats).where(
+        ~select(source_model.id)
+        .where(source_model.pet_id == stats.c.pet_id, source_model.date == stats.c.date)
+        .exists()
+    )
+    if pet_id is not None:
+        stale = stale.where(stats.c.pet_id == pet_id)
+    if dates is not None:
+        stale = stale.where(stats.c.date.in_(list(dates)))
+    db.execute(stale)
+
+    columns = [column.name for column in stats.c]
+    upsert = pg_insert(stats).from_select(columns, source)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=["pet_id", "date"],
+        set_={column: upsert.excluded[column] for column in columns[2:]},
+    )
+    db.execute(upsert)
+
+
+def refresh_glucose_daily_stats(db: Session, pet_id: Optional[str] = None, dates: Optional[Iterable[date]] = None):
+    """
+    Recompute the glucose_daily_stats rows of the given pet/days from the raw
+    readings, in the caller's transaction. Called by every glucose write with
+    the affected day, so each write touches one rollup row; without filters
+    it rebuilds everything (backfill).
+    """
+    _refresh_daily_rollup(
+        db,
+        models.GlucoseDailyStat,
+        models.GlucoseReading,
+        _glucose_daily_stats_source(pet_id, dates),
+        pet_id,
+        dates,
+    )
+
+
+def get_glucose_daily_stats(db: Session, pet_id: str, start_date: date, end_date: date):
+    return (
+        db.query(models.GlucoseDailyStat)
+        .filter(
+            models.GlucoseDailyStat.pet_id == pet_id,
+            models.GlucoseDailyStat.date >= start_date,
+            models.GlucoseDailyStat.date <= end_date,
+        )
+        .order_by(models.GlucoseDailyStat.date)
+        .all()
+    )
+
+
+def get_glucose_stats(db: Session, pet_id: str, days: int, end_date: date):
+    """Summary of the last `days` days (ending at end_date) from the daily rollup."""
+    start_date = end_date - timedelta(days=days - 1)
+    daily = get_glucose_daily_stats(db, pet_id, start_date, end_date)
+
+    reading_count = sum(day.reading_count for day in daily)
+    value_sum = sum(day.value_sum for day in daily)
+    value_sum_squares = sum(day.value_sum_squares for day in daily)
+
+    mean = value_sum / reading_count if reading_count else None
+    std_dev = None
+    if reading_count > 1:
+        variance = (value_sum_squares - value_sum * value_sum / reading_count) / (reading_count - 1)
+        std_dev = math.sqrt(max(variance, 0.0))
+
+    def share(count):
+        return count / reading_count if reading_count else None
+
+    return {
+        "pet_id": pet_id,
+        "days": days,
+        "start_date": start_date,
+        "end_date": end_date,
+        "range_low": settings.glucose_range_low,
+        "range_high": settings.glucose_range_high,
+        "reading_count": reading_count,
+        "days_with_readings": len(daily),
+        "readings_per_day": reading_count / len(daily) if daily else None,
+        "mean": mean,
+        "std_dev": std_dev,
+        "min": min((day.value_min for day in daily), default=None),
+        "max": max((day.value_max for day in daily), default=None),
+        "time_in_range": share(sum(day.in_range_count for day in daily)),
+        "time_below_range": share(sum(day.below_range_count for day in daily)),
+        "time_above_range": share(sum(day.above_range_count for day in daily)),
+        "daily": [
+            {
+                "date": day.date,
+                "reading_count": day.reading_count,
+                "mean": day.value_sum / day.reading_count,
+                "min": day.value_min,
+                "max": day.value_max,
+                "in_range_count": day.in_range_count,
+            }
+            for day in daily
+        ],
+    }
+
+
 # Mood Entry CRUD operations
-def get_mood_entries(db: Session, pet_id: str, limit: int = 30, sort: Optional[str] = None):
-    query = db.query(models.MoodEntry).filter(models.MoodEntry.pet_id == pet_id)
-    
-    if sort == "created_at:desc":
-        query = query.order_by(desc(models.MoodEntry.created_at))
-    
-    return query.limit(limit).all()
+def get_mood_entries(
+    db: Session,
+    pet_id: str,
+    limit: int = 30,
+    sort: Optional[str] = None,
+    after: Optional[Tuple[datetime, str]] = None,
+    lean: bool = False,
+    fields: Optional[List[str]] = None
+):
+    query = select(models.MoodEntry).where(models.MoodEntry.pet_id == pet_id)
+    return _keyset_page(
+        db,
+        query,
+        models.MoodEntry.created_at,
+        models.MoodEntry.id,
+        sort == "created_at:asc",
+        limit,
+        after,
+        columns=_lean_columns(schemas.MoodEntry, lean, fields),
+    )
 
 
 def create_mood_entry(db: Session, mood_entry: schemas.MoodEntryCreate, pet_id: str):
+    """Returns None if the pet does not exist."""
     # Set default date if not provided
-    entry_date = mood_entry.date or str(date.today())
-    
-    db_mood_entry = models.MoodEntry(
+    entry_date = mood_entry.date or date.today()
+
+    return _insert_for_pet_returning(db, models.MoodEntry, dict(
         id=str(uuid.uuid4()),
         pet_id=pet_id,
         energy_level=mood_entry.energy_level,
@@ -275,19 +625,11 @@ def create_mood_entry(db: Session, mood_entry: schemas.MoodEntryCreate, pet_id:
         walk=mood_entry.walk,
         notes=mood_entry.notes,
         date=entry_date
-    )
-    db.add(db_mood_entry)
-    db.commit()
-    db.refresh(db_mood_entry)
-    return db_mood_entry
+    ))
 
 
 def delete_mood_entry(db: Session, mood_entry_id: str):
-    db_mood_entry = db.query(models.MoodEntry).filter(models.MoodEntry.id == mood_entry_id).first()
-    if db_mood_entry:
-        db.delete(db_mood_entry)
-        db.commit()
-    return db_mood_entry
+    return _delete_returning(db, models.MoodEntry, mood_entry_id)
 
 
 def _normalize_pause_events(pause_events):
@@ -320,28 +662,32 @@ def get_walk_entries(
     pet_id: str,
     limit: int = 30,
     sort: Optional[str] = None,
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    after: Optional[Tuple[datetime, str]] = None,
+    lean: bool = False,
+    fields: Optional[List[str]] = None
 ):
-    query = db.query(models.WalkEntry).filter(models.WalkEntry.pet_id == pet_id)
+    query = select(models.WalkEntry).where(models.WalkEntry.pet_id == pet_id)
 
     if start_date:
-        query = query.filter(models.WalkEntry.date >= start_date)
+        query = query.where(models.WalkEntry.date >= start_date)
     if end_date:
-        query = query.filter(models.WalkEntry.date <= end_date)
-
-    if sort == "start_time:asc":
-        query = query.order_by(models.WalkEntry.start_time.asc())
-    else:
-        query = query.order_by(desc(models.WalkEntry.start_time))
-
-    if limit:
-        query = query.limit(limit)
-
-    return query.all()
+        query = query.where(models.WalkEntry.date <= end_date)
+
+    return _keyset_page(
+        db,
+        query,
+        models.WalkEntry.start_time,
+        models.WalkEntry.id,
+        sort == "start_time:asc",
+        limit,
+        after,
+        columns=_lean_columns(schemas.WalkEntry, lean, fields),
+    )
 
 
-def create_walk_entry(db: Session, walk_entry: schemas.WalkEntryCreate, pet_id: str):
+def _walk_entry_values(walk_entry: schemas.WalkEntryCreate, pet_id: str):
     start_time = to_brasilia(walk_entry.start_time)
     end_time = to_brasilia(walk_entry.end_time) if walk_entry.end_time else None
 
@@ -351,9 +697,9 @@ def create_walk_entry(db: Session, walk_entry: schemas.WalkEntryCreate, pet_id:
         duration_seconds = int((end_time - start_time).total_seconds())
 
     pause_events = _normalize_pause_events(walk_entry.pause_events)
-    entry_date = walk_entry.date or start_time.date().isoformat()
+    entry_date = walk_entry.date or start_time.date()
 
-    db_walk_entry = models.WalkEntry(
+    return dict(
         id=str(uuid.uuid4()),
         pet_id=pet_id,
         date=entry_date,
@@ -372,7 +718,7 @@ def create_walk_entry(db: Session, walk_entry: schemas.WalkEntryCreate, pet_id:
         poop_blood=walk_entry.poop_blood,
         poop_mucus=walk_entry.poop_mucus,
         poop_color=walk_entry.poop_color,
-        photos=walk_entry.photos,
+        photos=externalize_photos(walk_entry.photos),
         weather=walk_entry.weather,
         temperature_celsius=walk_entry.temperature_celsius,
         route_distance_km=walk_entry.route_distance_km,
@@ -384,42 +730,333 @@ def create_walk_entry(db: Session, walk_entry: schemas.WalkEntryCreate, pet_id:
         notes=walk_entry.notes,
         alerts=walk_entry.alerts,
     )
-    db.add(db_walk_entry)
+
+
+def create_walk_entry(db: Session, walk_entry: schemas.WalkEntryCreate, pet_id: str):
+    """Returns None if the pet does not exist."""
+    db_walk_entry = _insert_for_pet_returning(
+        db, models.WalkEntry, _walk_entry_values(walk_entry, pet_id), commit=False
+    )
+    if db_walk_entry is not None:
+        refresh_walk_daily_stats(db, pet_id=pet_id, dates=[db_walk_entry.date])
     db.commit()
-    db.refresh(db_walk_entry)
     return db_walk_entry
 
 
-def update_walk_entry(db: Session, walk_entry_id: str, updates: schemas.WalkEntryUpdate):
-    db_walk_entry = db.query(models.WalkEntry).filter(models.WalkEntry.id == walk_entry_id).first()
+def create_walk_entries(db: Session, walk_entries: List[schemas.WalkEntryCreate], pet_id: str):
+    """Insert many walks with one multi-row INSERT ... RETURNING in a single transaction."""
+    if not walk_entries:
+        return []
+
+    rows = [_walk_entry_values(walk_entry, pet_id) for walk_entry in walk_entries]
+    db_walk_entries = db.scalars(
+        insert(models.WalkEntry).returning(models.WalkEntry, sort_by_parameter_order=True).options(undefer("*")),
+        rows,
+        # Keep NULLs in the VALUES list so rows with different empty fields are
+        # not split into separate INSERT statements
+        execution_options={"render_nulls": True},
+    ).all()
+    refresh_walk_daily_stats(db, pet_id=pet_id, dates={entry.date for entry in db_walk_entries})
+    mark_pet_changed(db, pet_id)
+    for entry in db_walk_entries:
+        record_change(db, models.WalkEntry, "insert", entry)
+    db.commit()
+    return db_walk_entries
 
-    if not db_walk_entry:
-        return None
 
+def update_walk_entry(db: Session, walk_entry_id: str, updates: schemas.WalkEntryUpdate):
     update_data = updates.model_dump(exclude_unset=True)
 
     if "pause_events" in update_data:
         update_data["pause_events"] = _normalize_pause_events(update_data["pause_events"])
 
+    if "photos" in update_data:
+        update_data["photos"] = externalize_photos(update_data["photos"])
+
     if "end_time" in update_data:
         end_time = update_data["end_time"]
         update_data["end_time"] = to_brasilia(end_time) if end_time else None
 
-    for field, value in update_data.items():
-        setattr(db_walk_entry, field, value)
-
-    # Automatically recompute duration if end_time updated and duration not explicitly provided
-    if "end_time" in update_data and "duration_seconds" not in update_data and db_walk_entry.end_time:
-        db_walk_entry.duration_seconds = int((db_walk_entry.end_time - db_walk_entry.start_time).total_seconds())
+    # Automatically recompute duration if end_time updated and duration not explicitly provided.
+    # start_time is not known here, so the subtraction happens in the UPDATE itself.
+    if "end_time" in update_data and "duration_seconds" not in update_data and update_data["end_time"]:
+        elapsed = literal(update_data["end_time"], models.WalkEntry.end_time.type) - models.WalkEntry.start_time
+        update_data["duration_seconds"] = cast(func.floor(func.extract("epoch", elapsed)), Integer)
 
+    db_walk_entry = _update_returning(db, models.WalkEntry, walk_entry_id, update_data, commit=False)
+    if db_walk_entry is not None and update_data.keys() & _WALK_ROLLUP_FIELDS:
+        refresh_walk_daily_stats(db, pet_id=db_walk_entry.pet_id, dates=[db_walk_entry.date])
     db.commit()
-    db.refresh(db_walk_entry)
     return db_walk_entry
 
 
 def delete_walk_entry(db: Session, walk_entry_id: str):
-    db_walk_entry = db.query(models.WalkEntry).filter(models.WalkEntry.id == walk_entry_id).first()
-    if db_walk_entry:
-        db.delete(db_walk_entry)
-        db.commit()
+    db_walk_entry = _delete_returning(db, models.WalkEntry, walk_entry_id, commit=False)
+    if db_walk_entry is not None:
+        refresh_walk_daily_stats(db, pet_id=db_walk_entry.pet_id, dates=[db_walk_entry.date])
+    db.commit()
     return db_walk_entry
+
+
+# Walk fields that feed walk_daily_stats
+_WALK_ROLLUP_FIELDS = {
+    "duration_seconds",
+    "route_distance_km",
+    "pee_count",
+    "poop_made",
+    "poop_consistency",
+    "energy_level",
+}
+
+_PEE_COUNT_VALUES = {"1x": 1, "2x": 2, "3x-plus": 3}
+_ENERGY_SCORES = {"very-low": 1, "low": 2, "moderate": 3, "high": 4, "very-high": 5}
+
+
+def _walk_daily_stats_source(pet_id: Optional[str] = None, dates: Optional[Iterable[date]] = None):
+    """Per (pet, day) aggregates of walk_entries, optionally limited to one pet / some days."""
+    walks = models.WalkEntry
+    pee_count = case(
+        *[(walks.pee_count == label, value) for label, value in _PEE_COUNT_VALUES.items()], else_=0
+    )
+    energy_score = case(
+        *[(walks.energy_level == label, score) for label, score in _ENERGY_SCORES.items()], else_=None
+    )
+
+    source = select(
+        walks.pet_id,
+        walks.date,
+        func.count(),
+        func.coalesce(func.sum(walks.duration_seconds), 0),
+        func.coalesce(func.sum(walks.route_distance_km), 0.0),
+        func.sum(case((pee_count > 0, 1), else_=0)),
+        func.sum(pee_count),
+        func.sum(case((walks.poop_made == True, 1), else_=0)),
+        func.sum(case((walks.poop_consistency.in_(["soft", "diarrhea"]), 1), else_=0)),
+        func.coalesce(func.sum(energy_score), 0),
+        func.count(energy_score),
+        literal(now_brasilia(), models.WalkDailyStat.updated_at.type),
+    ).group_by(walks.pet_id, walks.date)
+
+    if pet_id is not None:
+        source = source.where(walks.pet_id == pet_id)
+    if dates is not None:
+        source = source.where(walks.date.in_(list(dates)))
+    return source
+
+
+def refresh_walk_daily_stats(db: Session, pet_id: Optional[str] = None, dates: Optional[Iterable[date]] = None):
+    """
+    Recompute the walk_daily_stats rows of the given pet/days from the raw
+    walks, in the caller's transaction. Without filters it rebuilds every
+    pet and day in one set-based statement (backfill). Concurrent walk
+    writes and imports of the same day are serialized by _refresh_daily_rollup.
+    """
+    _refresh_daily_rollup(
+        db,
+        models.WalkDailyStat,
+        models.WalkEntry,
+        _walk_daily_stats_source(pet_id, dates),
+        pet_id,
+        dates,
+    )
+
+
+def get_walk_summary(
+    db: Session,
+    pet_id: str,
+    bucket: str = "week",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+):
+    """Weekly or monthly walk totals, aggregated from the daily rollup."""
+    if bucket not in ("week", "month"):
+        raise ValueError(f"Unsupported bucket: {bucket}")
+
+    stats = models.WalkDailyStat
+    # Literal (not a bind param) so SELECT and GROUP BY render the same expression
+    bucket_start = cast(func.date_trunc(literal_column(f"'{bucket}'"), stats.date), Date)
+
+    query = db.query(
+        bucket_start.label("bucket_start"),
+        func.sum(stats.walk_count).label("walk_count"),
+        func.sum(stats.total_duration_seconds).label("total_duration_seconds"),
+        func.sum(stats.total_distance_km).label("total_distance_km"),
+        func.sum(stats.pee_walk_count).label("pee_walk_count"),
+        func.sum(stats.pee_count).label("pee_count"),
+        func.sum(stats.poop_count).label("poop_count"),
+        func.sum(stats.loose_poop_count).label("loose_poop_count"),
+        func.sum(stats.energy_score_sum).label("energy_score_sum"),
+        func.sum(stats.energy_score_count).label("energy_score_count"),
+    ).filter(stats.pet_id == pet_id)
+
+    if start_date:
+        query = query.filter(stats.date >= start_date)
+    if end_date:
+        query = query.filter(stats.date <= end_date)
+
+    rows = query.group_by(bucket_start).order_by(bucket_start).all()
+
+    return [
+        {
+            "bucket_start": row.bucket_start,
+            "walk_count": row.walk_count,
+            "total_duration_seconds": row.total_duration_seconds,
+            "average_duration_seconds": row.total_duration_seconds / row.walk_count,
+            "total_distance_km": row.total_distance_km,
+            "pee_walk_count": row.pee_walk_count,
+            "pee_count": row.pee_count,
+            "poop_count": row.poop_count,
+            "poop_frequency": row.poop_count / row.walk_count,
+            "loose_poop_count": row.loose_poop_count,
+            "average_energy_score": (
+                row.energy_score_sum / row.energy_score_count if row.energy_score_count else None
+            ),
+        }
+        for row in rows
+    ]
+
+
+# Dashboard
+def get_pet_dashboard(
+    db: Session,
+    pet_id: str,
+    target_date: date,
+    glucose_limit: int = 30,
+    mood_limit: int = 30,
+    walk_limit: int = 60,
+    routine_days: int = 30
+):
+    """
+    Everything the app loads when a pet is selected, in a single session.
+    Today's tasks are materialized from the active templates (same as
+    ensure_daily_tasks) and queried in period order; all_routine_items is
+    the routine history of the routine_days days up to target_date.
+
+    The materialize only runs when an active template has no item for the
+    day yet, so once the day exists the dashboard is a read-only request
+    (and can be served by a read replica).
+    """
+    pet = get_pet(db, pet_id)
+    if pet is None:
+        return None
+
+    templates = get_routine_templates(db, pet_id, active_only=True)
+    today_items = get_routine_items(db, pet_id, date_filter=target_date, sort="period")
+    materialized = {item.template_id for item in today_items}
+    if any(template.id not in materialized for template in templates):
+        materialize_daily_tasks(db, target_date, pet_id=pet_id)
+        today_items = get_routine_items(db, pet_id, date_filter=target_date, sort="period")
+    all_routine_items = (
+        db.query(models.RoutineItem)
+        .filter(
+            models.RoutineItem.pet_id == pet_id,
+            models.RoutineItem.date > target_date - timedelta(days=routine_days),
+            models.RoutineItem.date <= target_date,
+        )
+        .order_by(desc(models.RoutineItem.date))
+        .all()
+    )
+
+    return {
+        "pet": pet,
+        "date": target_date,
+        "routine_templates": templates,
+        "routine_items": today_items,
+        "all_routine_items": all_routine_items,
+        "glucose_readings": get_glucose_readings(db, pet_id, limit=glucose_limit, sort="created_at:desc"),
+        "mood_entries": get_mood_entries(db, pet_id, limit=mood_limit, sort="created_at:desc"),
+        "walk_entries": get_walk_entries(db, pet_id, limit=walk_limit),
+    }
+
+
+# History export: (record type, model, response schema, order column)
+_EXPORT_SOURCES = (
+    ("glucose_reading", models.GlucoseReading, schemas.GlucoseReading, models.GlucoseReading.created_at),
+    ("mood_entry", models.MoodEntry, schemas.MoodEntry, models.MoodEntry.created_at),
+    ("routine_item", models.RoutineItem, schemas.RoutineItem, models.RoutineItem.date),
+    ("walk_entry", models.WalkEntry, schemas.WalkEntry, models.WalkEntry.start_time),
+)
+
+
+def iter_pet_history(db: Session, pet_id: str, since: Optional[date] = None, batch_size: int = 500):
+    """
+    Yield (record type, rows) batches of a pet's whole history, table by
+    table, oldest first. Rows are Core rows with the response schema's
+    columns, read through a server-side cursor (stream_results + yield_per),
+    so only one batch is in memory whatever the history size.
+    """
+    for record_type, model, schema, order_column in _EXPORT_SOURCES:
+        table = model.__table__
+        query = select(*[table.c[name] for name in schema.model_fields]).where(table.c.pet_id == pet_id)
+        if since:
+            query = query.where(table.c.date >= since)
+        query = query.order_by(order_column, table.c.id)
+
+        result = db.execute(query, execution_options={"stream_results": True, "yield_per": batch_size})
+        for rows in result.partitions():
+            yield record_type, rows
+
+
+# Bulk import: kind -> (model, values builder, rollup refresh, natural key of an already stored row)
+_IMPORT_TARGETS = {
+    "glucose": (models.GlucoseReading, _glucose_reading_values, refresh_glucose_daily_stats, ("created_at", "value")),
+    "walks": (models.WalkEntry, _walk_entry_values, refresh_walk_daily_stats, ("start_time",)),
+}
+
+
+def _copy_rows(db: Session, table: Table, rows: List[dict]):
+    """COPY rows into table through the session's psycopg connection, in its transaction."""
+    columns = [column.name for column in table.c]
+    json_columns = {column.name for column in table.c if isinstance(column.type, JSON)}
+
+    driver_connection = db.connection().connection.driver_connection
+    with driver_connection.cursor() as cursor:
+        with cursor.copy(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row([
+                    json.dumps(row[name]) if name in json_columns and row.get(name) is not None else row.get(name)
+                    for name in columns
+                ])
+
+
+def import_rows(db: Session, kind: str, pet_id: str, items: List) -> Tuple[int, int]:
+    """
+    Load validated items (schemas.*Create) of one pet: COPY into a temporary
+    staging table, then a single INSERT ... SELECT into the real table that
+    skips rows already stored (same natural key) and repeats inside the
+    batch. Rollups of the touched days are refreshed in the same transaction.
+    Returns (imported, duplicates).
+    """
+    model, build_values, refresh_rollup, natural_key = _IMPORT_TARGETS[kind]
+    target = model.__table__
+    columns = [column.name for column in target.c]
+
+    staging = Table(
+        f"import_staging_{target.name}",
+        MetaData(),
+        *[Column(column.name, column.type) for column in target.c],
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP",
+    )
+    staging.create(db.connection())
+
+    # Column defaults do not apply to COPY
+    created_at = now_brasilia()
+    rows = [{"created_at": created_at, **build_values(item, pet_id)} for item in items]
+    _copy_rows(db, staging, rows)
+
+    already_stored = (
+        select(target.c.id)
+        .where(target.c.pet_id == staging.c.pet_id, *[target.c[name] == staging.c[name] for name in natural_key])
+        .exists()
+    )
+    key = [staging.c[name] for name in natural_key]
+    source = select(*[staging.c[name] for name in columns]).where(~already_stored).distinct(*key).order_by(*key)
+
+    dates = db.execute(insert(target).from_select(columns, source).returning(target.c.date)).scalars().all()
+    if dates:
+        refresh_rollup(db, pet_id=pet_id, dates=set(dates))
+        mark_pet_changed(db, pet_id)
+        record_bulk_change(db, model, pet_id, len(dates))
+    db.commit()
+    return len(dates), len(rows) - len(dates)
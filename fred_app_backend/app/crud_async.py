@@ -0,0 +1,95 @@
+"""
+Async versions of the app.crud functions.
+
+Each function accepts either a sync Session or an AsyncSession (see
+database.get_session). With an AsyncSession the crud function runs through
+AsyncSession.run_sync, so every statement is awaited on the psycopg async
+driver without holding a thread; with a sync Session it runs in the
+threadpool, which is what FastAPI did for the old sync handlers.
+"""
+from functools import wraps
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app import crud
+from app.photo_storage import externalize_photos
+
+
+def _async(fn):
+    @wraps(fn)
+    async def wrapper(db, *args, **kwargs):
+        if isinstance(db, AsyncSession):
+            return await db.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, db, *args, **kwargs)
+
+    return wrapper
+
+
+# Pets
+get_pet = _async(crud.get_pet)
+get_pets = _async(crud.get_pets)
+create_pet = _async(crud.create_pet)
+delete_pet = _async(crud.delete_pet)
+get_pet_dashboard = _async(crud.get_pet_dashboard)
+
+# Routine templates
+get_routine_templates = _async(crud.get_routine_templates)
+create_routine_template = _async(crud.create_routine_template)
+update_routine_template = _async(crud.update_routine_template)
+delete_routine_template = _async(crud.delete_routine_template)
+ensure_daily_tasks = _async(crud.ensure_daily_tasks)
+materialize_daily_tasks = _async(crud.materialize_daily_tasks)
+
+# Routine items
+get_routine_items = _async(crud.get_routine_items)
+create_routine_item = _async(crud.create_routine_item)
+update_routine_item = _async(crud.update_routine_item)
+delete_routine_item = _async(crud.delete_routine_item)
+
+# Glucose readings
+get_glucose_readings = _async(crud.get_glucose_readings)
+create_glucose_reading = _async(crud.create_glucose_reading)
+create_glucose_readings = _async(crud.create_glucose_readings)
+update_glucose_reading = _async(crud.update_glucose_reading)
+delete_glucose_reading = _async(crud.delete_glucose_reading)
+get_glucose_stats = _async(crud.get_glucose_stats)
+
+# Mood entries
+get_mood_entries = _async(crud.get_mood_entries)
+create_mood_entry = _async(crud.create_mood_entry)
+delete_mood_entry = _async(crud.delete_mood_entry)
+
+# Walk entries
+get_walk_entries = _async(crud.get_walk_entries)
+_create_walk_entry = _async(crud.create_walk_entry)
+_create_walk_entries = _async(crud.create_walk_entries)
+_update_walk_entry = _async(crud.update_walk_entry)
+delete_walk_entry = _async(crud.delete_walk_entry)
+get_walk_summary = _async(crud.get_walk_summary)
+
+
+async def _with_stored_photos(db, walk_entry):
+    """
+    Inline base64 photos written to storage in the threadpool: under
+    AsyncSession.run_sync the crud function runs on the event loop thread,
+    where externalize_photos would block it on decoding and file I/O. The
+    crud function then finds only references and has nothing left to store.
+    """
+    if not isinstance(db, AsyncSession) or not walk_entry.photos:
+        return walk_entry
+    photos = await run_in_threadpool(externalize_photos, walk_entry.photos)
+    return walk_entry.model_copy(update={"photos": photos})
+
+
+async def create_walk_entry(db, walk_entry, pet_id):
+    return await _create_walk_entry(db, await _with_stored_photos(db, walk_entry), pet_id)
+
+
+async def create_walk_entries(db, walk_entries, pet_id):
+    walk_entries = [await _with_stored_photos(db, walk_entry) for walk_entry in walk_entries]
+    return await _create_walk_entries(db, walk_entries, pet_id)
+
+
+async def update_walk_entry(db, walk_entry_id, updates):
+    return await _update_walk_entry(db, walk_entry_id, await _with_stored_photos(db, updates))
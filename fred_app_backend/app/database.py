@@ -1,8 +1,19 @@
+import asyncio
+import itertools
 import logging
-from sqlalchemy import create_engine
+import threading
+from contextvars import ContextVar
+from typing import List, Optional, Tuple, Union
+from sqlalchemy import Select, create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from app.config import settings
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
+from starlette.concurrency import run_in_threadpool
+from app.config import settings, worker_count
+from app import query_trace
+from app.metrics import TimedAsyncQueuePool, TimedQueuePool, instrument_engine
 
 logger = logging.getLogger("fred_app.database")
 logger.setLevel(logging.INFO)
@@ -28,42 +39,281 @@ def log_connection_info():
             "database_url": settings.database_url if settings.database_url else "Not configured",
         },
     )
-    print(
-        f"[Database] Connecting to {connection_type} -> "
-        f"database_url={'***configured***' if settings.database_url else 'Not configured'}"
-    )
-
 
-log_connection_info()
-
-# Validate that DATABASE_URL is set
-if not settings.database_url:
-    error_msg = (
-        "DATABASE_URL is not configured. "
-        "Please set either DATABASE_URL or SUPABASE_URL in your environment variables."
-    )
-    logger.error(error_msg)
-    raise ValueError(error_msg)
 
-# Create SQLAlchemy engine
-# Supabase uses PostgreSQL, so this works seamlessly
+# Engines are created on first use (first session, migration or warm-up),
+# so importing the app opens no connection and needs no database at all
 connect_args = {
     "connect_timeout": 10,
 }
 
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
-    pool_recycle=3600,  # Recycle connections after 1 hour
-    connect_args=connect_args,
+# Fixed per-engine pool when DB_MAX_CONNECTIONS is not set
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+
+_engine: Optional[Engine] = None
+_async_engine: Optional[AsyncEngine] = None
+_engine_lock = threading.Lock()
+
+
+def _check_database_url():
+    if not settings.database_url:
+        error_msg = (
+            "DATABASE_URL is not configured. "
+            "Please set either DATABASE_URL or SUPABASE_URL in your environment variables."
+        )
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+
+
+def pool_limits() -> Tuple[int, int]:
+    """
+    (pool_size, max_overflow) of each engine of this process. With
+    DB_MAX_CONNECTIONS the budget is split between the workers, minus the
+    change feed / cache invalidation listener of each one, then between the
+    engines of a worker (with DB_ASYNC the sync engine still serves exports,
+    imports and jobs).
+    A third of each share stays open, the rest is overflow opened on demand.
+    """
+    if not settings.db_max_connections:
+        return DEFAULT_POOL_SIZE, DEFAULT_MAX_OVERFLOW
+
+    workers = worker_count()
+    listener = settings.change_feed or settings.response_cache_size > 0
+    per_worker = settings.db_max_connections // workers - (1 if listener else 0)
+    per_engine = per_worker // (2 if settings.db_async else 1)
+    if per_engine < 1:
+        raise ValueError(
+            f"DB_MAX_CONNECTIONS={settings.db_max_connections} is too small for {workers} workers; "
+            "lower WEB_CONCURRENCY or raise the budget"
+        )
+    pool_size = max(1, per_engine // 3)
+    return pool_size, per_engine - pool_size
+
+
+def _new_engine(url: str, name: str) -> Engine:
+    pool_size, max_overflow = pool_limits()
+    engine = create_engine(
+        url,
+        poolclass=TimedQueuePool,
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=3600,  # Recycle connections after 1 hour
+        connect_args=connect_args,
+    )
+    instrument_engine(engine, name)
+    if settings.query_trace:
+        query_trace.instrument_engine(engine)
+    return engine
+
+
+def _new_async_engine(url: str, name: str) -> AsyncEngine:
+    pool_size, max_overflow = pool_limits()
+    async_engine = create_async_engine(
+        url,
+        poolclass=TimedAsyncQueuePool,
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=3600,
+        connect_args=connect_args,
+    )
+    instrument_engine(async_engine.sync_engine, name)
+    if settings.query_trace:
+        query_trace.instrument_engine(async_engine.sync_engine)
+    return async_engine
+
+
+def get_engine() -> Engine:
+    """The sync engine, created on first call."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _check_database_url()
+                log_connection_info()
+                _engine = _new_engine(settings.database_url, "sync")
+    return _engine
+
+
+def get_async_engine() -> AsyncEngine:
+    """The async engine (psycopg async driver), created on first call."""
+    global _async_engine
+    if _async_engine is None:
+        with _engine_lock:
+            if _async_engine is None:
+                _check_database_url()
+                log_connection_info()
+                _async_engine = _new_async_engine(settings.database_url, "async")
+    return _async_engine
+
+
+class Replica:
+    """A read replica (DATABASE_REPLICA_URLS): its engines, created on first use, and its health."""
+
+    def __init__(self, number: int, url: str):
+        self.name = f"replica{number}"
+        self.url = url
+        # Set by the health checks (app/replicas.py) and by connection failures
+        self.healthy = True
+        self._engine: Optional[Engine] = None
+        self._async_engine: Optional[AsyncEngine] = None
+
+    def engine(self) -> Engine:
+        if self._engine is None:
+            with _engine_lock:
+                if self._engine is None:
+                    engine = _new_engine(self.url, f"{self.name}-sync")
+                    event.listen(engine, "handle_error", self._failed)
+                    self._engine = engine
+        return self._engine
+
+    def async_engine(self) -> AsyncEngine:
+        if self._async_engine is None:
+            with _engine_lock:
+                if self._async_engine is None:
+                    async_engine = _new_async_engine(self.url, f"{self.name}-async")
+                    event.listen(async_engine.sync_engine, "handle_error", self._failed)
+                    self._async_engine = async_engine
+        return self._async_engine
+
+    def _failed(self, exception_context):
+        if exception_context.is_disconnect and self.healthy:
+            logger.warning("%s unreachable; reading from the primary until it passes a health check", self.name)
+            self.healthy = False
+
+    async def dispose(self):
+        if self._async_engine is not None:
+            await self._async_engine.dispose()
+            self._async_engine = None
+        if self._engine is not None:
+            await run_in_threadpool(self._engine.dispose)
+            self._engine = None
+
+
+replicas: List[Replica] = [
+    Replica(number, url) for number, url in enumerate(settings.database_replica_urls, start=1)
+]
+_replica_turn = itertools.count()
+
+
+def pick_replica() -> Optional[Replica]:
+    """Next healthy replica (round-robin), None when there is none."""
+    healthy = [replica for replica in replicas if replica.healthy]
+    if not healthy:
+        return None
+    return healthy[next(_replica_turn) % len(healthy)]
+
+
+class ReadRouting:
+    """Routing state of one request (see app/replicas.py)."""
+
+    __slots__ = ("replica_allowed", "replica_used", "wrote")
+
+    def __init__(self, replica_allowed: bool):
+        self.replica_allowed = replica_allowed
+        self.replica_used = False
+        self.wrote = False
+
+
+# Set per request by ReadRoutingMiddleware; shared by reference with the
+# threadpool and the AsyncSession greenlets. None (jobs, scripts): primary only
+read_routing: ContextVar[Optional[ReadRouting]] = ContextVar("read_routing", default=None)
+
+# Session.info keys: the session wrote (everything after goes to the primary),
+# and the replica its reads stick to
+_PRIMARY_ONLY = "routing_primary_only"
+_REPLICA = "routing_replica"
+
+
+def _route(session: Session, clause) -> Optional[Replica]:
+    """The replica a statement of session reads from; None for the primary."""
+    routing = read_routing.get()
+    if routing is None:
+        return None
+    if session._flushing or isinstance(clause, UpdateBase):
+        routing.wrote = True
+        session.info[_PRIMARY_ONLY] = True
+        return None
+    # Only plain SELECTs move; text(), COPY (no clause) and the rest stay on the primary
+    if not routing.replica_allowed or session.info.get(_PRIMARY_ONLY) or not isinstance(clause, Select):
+        return None
+
+    replica = session.info.get(_REPLICA)
+    if replica is None or not replica.healthy:
+        replica = pick_replica()
+        if replica is None:
+            return None
+        session.info[_REPLICA] = replica
+    routing.replica_used = True
+    return replica
+
+
+class LazySession(Session):
+    """Session bound to get_engine() at its first statement; reads may go to a replica (_route)."""
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        replica = _route(self, clause)
+        return replica.engine() if replica is not None else get_engine()
+
+
+class LazyAsyncBoundSession(Session):
+    """Sync side of the AsyncSessions, bound to get_async_engine() (or a replica) at their first statement."""
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        replica = _route(self, clause)
+        async_engine = replica.async_engine() if replica is not None else get_async_engine()
+        return async_engine.sync_engine
+
+
+# expire_on_commit=False: objects returned by crud stay loaded after commit,
+# so serializing them never triggers a lazy refresh (required for AsyncSession)
+SessionLocal = sessionmaker(class_=LazySession, autocommit=False, autoflush=False, expire_on_commit=False)
+
+# Used by the routers when DB_ASYNC is enabled
+AsyncSessionLocal = async_sessionmaker(
+    sync_session_class=LazyAsyncBoundSession,
+    autoflush=False,
+    expire_on_commit=False,
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+async def warm_up_pool(connections: int):
+    """Open up to pool_size connections of the engine the routers use, before the first request."""
+    if connections <= 0:
+        return
+    if settings.db_async:
+        pool_engine = get_async_engine()
+        # Connections beyond pool_size would be discarded as soon as they are returned
+        connections = min(connections, pool_engine.pool.size())
+        opened = await asyncio.gather(*(pool_engine.connect().start() for _ in range(connections)))
+        await asyncio.gather(*(connection.close() for connection in opened))
+    else:
+        pool_engine = get_engine()
+        connections = min(connections, pool_engine.pool.size())
+        opened = await asyncio.gather(*(run_in_threadpool(pool_engine.connect) for _ in range(connections)))
+        await asyncio.gather(*(run_in_threadpool(connection.close) for connection in opened))
+    logger.info("Database pool warmed up with %s connections", connections)
+
+
+async def dispose_engines():
+    """Close the pooled connections (shutdown, worker recycling)."""
+    global _engine, _async_engine
+    for replica in replicas:
+        await replica.dispose()
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+    if _engine is not None:
+        await run_in_threadpool(_engine.dispose)
+        _engine = None
+
 
 Base = declarative_base()
 
+DbSession = Union[Session, AsyncSession]
+
 
 def get_db():
     """Dependency to get database session."""
@@ -72,3 +322,21 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency to get an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def release_session(db: DbSession):
+    """Give the session's connection back to the pool before a long-lived response."""
+    if isinstance(db, AsyncSession):
+        await db.close()
+    else:
+        await run_in_threadpool(db.close)
+
+
+# Dependency used by the routers: AsyncSession when DB_ASYNC is set, else Session
+get_session = get_async_db if settings.db_async else get_db
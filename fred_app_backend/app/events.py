@@ -0,0 +1,230 @@
+"""
+Per-pet change feed (GET /pets/{pet_id}/events, Server-Sent Events).
+
+The write functions in app/crud.py record a change event per inserted,
+updated or deleted routine item, glucose reading, mood entry and walk on the
+session. The events are sent with pg_notify right before the transaction
+commits; NOTIFY is transactional, so a rolled back write never reaches the
+clients. Every worker LISTENs on the channel with one dedicated connection
+and fans the events out to its own SSE subscribers. The connection is opened
+by the first subscriber.
+
+Event payload (one SSE "change" event each):
+    {"pet_id": ..., "entity": "walk_entry", "op": "insert|update|delete", "id": ..., "data": {...}}
+"data" is the record in its response schema, left out when it does not fit
+in a NOTIFY. Bulk imports send one {"op": "bulk"} event per entity instead
+of a row each; clients refetch that list. A "resync" event means events were
+lost (slow client, listener reconnect) and the client should reload
+everything.
+
+The same statement notifies CACHE_CHANNEL with the pets the transaction
+changed, so that every other process drops its stale response cache entries
+(app/cache.py). Processes with the cache enabled start listening at startup.
+"""
+import asyncio
+import logging
+import os
+import socket
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator, Dict, Optional, Set
+
+import orjson
+import psycopg
+from sqlalchemy import event, make_url, text
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.cache import ALL_PETS, pending_changes, response_cache
+from app.config import settings
+
+logger = logging.getLogger("fred_app.events")
+
+CHANNEL = "pet_events"
+CACHE_CHANNEL = "cache_invalidation"
+# NOTIFY payloads must stay below 8000 bytes
+MAX_PAYLOAD_BYTES = 7900
+HEARTBEAT_SECONDS = 15
+SUBSCRIBER_QUEUE_SIZE = 256
+RECONNECT_SECONDS = 5
+
+# Models with a change feed: model -> (entity name, response schema)
+ENTITIES = {
+    models.RoutineItem: ("routine_item", schemas.RoutineItem),
+    models.GlucoseReading: ("glucose_reading", schemas.GlucoseReading),
+    models.MoodEntry: ("mood_entry", schemas.MoodEntry),
+    models.WalkEntry: ("walk_entry", schemas.WalkEntry),
+}
+
+# Session.info key holding the payloads of the current transaction
+_PENDING_EVENTS = "change_feed_events"
+
+_NOTIFY = text(
+    "SELECT pg_notify(channel, payload) "
+    "FROM unnest(CAST(:channels AS text[]), CAST(:payloads AS text[])) AS notify(channel, payload)"
+)
+
+
+def _origin() -> str:
+    # Evaluated per call: workers forked from a preloaded master share module state
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _payload(event_fields: dict) -> str:
+    payload = orjson.dumps(event_fields, option=orjson.OPT_UTC_Z)
+    if len(payload) > MAX_PAYLOAD_BYTES:
+        # Too big for NOTIFY (large walks): clients fetch the record instead
+        event_fields = {name: value for name, value in event_fields.items() if name != "data"}
+        payload = orjson.dumps(event_fields)
+    return payload.decode()
+
+
+def record_change(db: Session, model, op: str, row):
+    """Queue an insert/update/delete event for row (ORM object or Core row); sent when db commits."""
+    if not settings.change_feed or row is None or model not in ENTITIES:
+        return
+    entity, schema = ENTITIES[model]
+    data = {name: getattr(row, name) for name in schema.model_fields}
+    db.info.setdefault(_PENDING_EVENTS, []).append(
+        _payload({"pet_id": row.pet_id, "entity": entity, "op": op, "id": row.id, "data": data})
+    )
+
+
+def record_bulk_change(db: Session, model, pet_id: str, count: int):
+    """Queue one event for many rows of a pet (imports); clients reload that list."""
+    if not settings.change_feed or not count or model not in ENTITIES:
+        return
+    entity, _ = ENTITIES[model]
+    db.info.setdefault(_PENDING_EVENTS, []).append(
+        _payload({"pet_id": pet_id, "entity": entity, "op": "bulk", "count": count})
+    )
+
+
+def _cache_payload(pet_ids: set) -> str:
+    payload = orjson.dumps({"origin": _origin(), "pets": sorted(pet_ids)})
+    if len(payload) > MAX_PAYLOAD_BYTES:
+        payload = orjson.dumps({"origin": _origin(), "pets": [ALL_PETS]})
+    return payload.decode()
+
+
+@event.listens_for(Session, "before_commit")
+def _notify_pending_events(session):
+    payloads = session.info.pop(_PENDING_EVENTS, None) or []
+    channels = [CHANNEL] * len(payloads)
+    changed = pending_changes(session)
+    if changed and response_cache.max_entries > 0:
+        channels.append(CACHE_CHANNEL)
+        payloads.append(_cache_payload(changed))
+    if payloads:
+        # One round trip for the whole transaction, delivered at commit
+        session.execute(_NOTIFY, {"channels": channels, "payloads": payloads})
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_events(session):
+    session.info.pop(_PENDING_EVENTS, None)
+
+
+class ChangeBroker:
+    """LISTENs on CHANNEL and hands each event to the queues subscribed to its pet."""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start listening (idempotent)."""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    @asynccontextmanager
+    async def subscribe(self, pet_id: str) -> AsyncIterator[asyncio.Queue]:
+        self.start()
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(pet_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(pet_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[pet_id]
+
+    def _resync(self, queue: asyncio.Queue):
+        # Drop the backlog and ask the client to reload
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(("resync", "{}"))
+
+    def publish(self, payload: str):
+        try:
+            pet_id = orjson.loads(payload)["pet_id"]
+        except (orjson.JSONDecodeError, KeyError, TypeError):
+            logger.warning("Ignoring malformed change event: %.200s", payload)
+            return
+
+        for queue in self._subscribers.get(pet_id, ()):
+            try:
+                queue.put_nowait(("change", payload))
+            except asyncio.QueueFull:
+                self._resync(queue)
+
+    def invalidate_cache(self, payload: str):
+        try:
+            message = orjson.loads(payload)
+            origin, pet_ids = message["origin"], message["pets"]
+        except (orjson.JSONDecodeError, KeyError, TypeError):
+            logger.warning("Ignoring malformed cache invalidation: %.200s", payload)
+            return
+        if origin != _origin():  # our own writes were applied at commit
+            response_cache.bump(set(pet_ids))
+
+    async def _listen(self):
+        conninfo = make_url(settings.database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(conninfo, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {CHANNEL}")
+                    await conn.execute(f"LISTEN {CACHE_CHANNEL}")
+                    # Writes of other processes made while not listening are unknown
+                    response_cache.bump({ALL_PETS})
+                    async for notify in conn.notifies():
+                        if notify.channel == CACHE_CHANNEL:
+                            self.invalidate_cache(notify.payload)
+                        else:
+                            self.publish(notify.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Change feed listener failed; reconnecting in %ss", RECONNECT_SECONDS)
+
+            # Events sent while disconnected are lost
+            for queues in self._subscribers.values():
+                for queue in queues:
+                    self._resync(queue)
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    async def shutdown(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+
+
+broker = ChangeBroker()
+
+
+async def sse_stream(pet_id: str) -> AsyncIterator[bytes]:
+    """SSE bytes for one client: "change"/"resync" events plus heartbeat comments."""
+    async with broker.subscribe(pet_id) as queue:
+        yield b"retry: 3000\nevent: ready\ndata: {}\n\n"
+        while True:
+            try:
+                name, payload = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle stream
+                yield b": ping\n\n"
+                continue
+            yield f"event: {name}\ndata: {payload}\n\n".encode()
@@ -0,0 +1,81 @@
+"""
+Streaming NDJSON/CSV export of a pet's history (GET /pets/{pet_id}/export).
+
+The chunk generators are synchronous: StreamingResponse iterates them in
+the threadpool, one database batch per chunk, so the first bytes go out
+before any query runs and memory stays at one batch.
+"""
+import csv
+import io
+from datetime import date
+from typing import Iterator, Optional
+
+import orjson
+
+from app import crud, schemas
+from app.database import SessionLocal
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+_RECORD_SCHEMAS = (schemas.GlucoseReading, schemas.MoodEntry, schemas.RoutineItem, schemas.WalkEntry)
+
+# One CSV layout for every record type: type, id, date, then the other fields in schema order
+CSV_COLUMNS = ["type", "id", "date"]
+for _schema in _RECORD_SCHEMAS:
+    CSV_COLUMNS.extend(name for name in _schema.model_fields if name not in CSV_COLUMNS)
+
+
+def _history_batches(pet_id: str, since: Optional[date]):
+    # Own session: the stream outlives the request's dependency session
+    db = SessionLocal()
+    try:
+        yield from crud.iter_pet_history(db, pet_id, since)
+    finally:
+        db.close()
+
+
+def ndjson_chunks(pet: dict, since: Optional[date]) -> Iterator[bytes]:
+    """One JSON object per line: the pet first, then every record tagged with its type."""
+    yield orjson.dumps({"type": "pet", **pet}, option=orjson.OPT_UTC_Z) + b"\n"
+
+    for record_type, rows in _history_batches(pet["id"], since):
+        yield b"".join(
+            orjson.dumps({"type": record_type, **row._asdict()}, option=orjson.OPT_UTC_Z) + b"\n"
+            for row in rows
+        )
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        return orjson.dumps(value).decode()
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def csv_chunks(pet: dict, since: Optional[date]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> bytes:
+        chunk = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    writer.writerow(CSV_COLUMNS)
+    yield flush()
+
+    for record_type, rows in _history_batches(pet["id"], since):
+        for row in rows:
+            record = row._asdict()
+            record["type"] = record_type
+            writer.writerow([_csv_value(record.get(column)) for column in CSV_COLUMNS])
+        yield flush()
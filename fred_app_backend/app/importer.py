@@ -0,0 +1,117 @@
+"""
+Bulk import of a pet's glucose readings or walks from CSV/NDJSON
+(POST /pets/{pet_id}/import and python -m app.jobs.import_history).
+
+The file is read and validated in chunks with the same Pydantic schemas as
+the JSON API; each chunk of valid rows is loaded by crud.import_rows (COPY
+into a staging table + one set-based merge) and committed on its own, so an
+interrupted import keeps what it already loaded and can simply be re-run:
+rows already stored are skipped as duplicates. Glucose rows must therefore
+carry their own timestamp (measured_at, or created_at as in an export).
+
+Progress comes back as NDJSON events, one per line:
+    {"event": "error", "line": 12, "error": "value: Field required"}
+    {"event": "progress", "processed": 1000, "imported": 990, "duplicates": 4, "rejected": 6}
+    {"event": "done", ...same counters...}
+"""
+import csv
+import io
+from typing import IO, Any, Dict, Iterator, List, Tuple
+
+import orjson
+
+from app import crud, schemas
+from app.database import SessionLocal
+from app.utils import validate_batch_items
+
+CHUNK_ROWS = 1000
+
+SCHEMAS = {
+    "glucose": schemas.GlucoseReadingImport,
+    "walks": schemas.WalkEntryCreate,
+}
+
+FORMATS = ("csv", "ndjson")
+
+
+def _csv_cell(value: str):
+    if value == "":
+        return None
+    # List/object columns (behavior, pause_events, ...) are written as JSON, like the export
+    if value[0] in "[{":
+        try:
+            return orjson.loads(value)
+        except orjson.JSONDecodeError:
+            pass
+    return value
+
+
+def _csv_records(stream: IO[bytes]) -> Iterator[Tuple[int, Any]]:
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    for row in reader:
+        record = {name: _csv_cell(value or "") for name, value in row.items() if name}
+        yield reader.line_num, record
+
+
+def _ndjson_records(stream: IO[bytes]) -> Iterator[Tuple[int, Any]]:
+    for line_num, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_num, orjson.loads(line)
+        except orjson.JSONDecodeError as exc:
+            yield line_num, exc
+
+
+def _chunks(records: Iterator[Tuple[int, Any]], size: int) -> Iterator[List[Tuple[int, Any]]]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _event(event: str, **fields) -> bytes:
+    return orjson.dumps({"event": event, **fields}) + b"\n"
+
+
+def import_events(stream: IO[bytes], pet_id: str, kind: str, format: str,
+                  chunk_rows: int = CHUNK_ROWS) -> Iterator[bytes]:
+    """Import a binary file object, yielding NDJSON progress/error events."""
+    schema = SCHEMAS[kind]
+    records = _csv_records(stream) if format == "csv" else _ndjson_records(stream)
+    counters: Dict[str, int] = {"processed": 0, "imported": 0, "duplicates": 0, "rejected": 0}
+
+    # Own session: the response stream outlives the request's dependency session
+    db = SessionLocal()
+    try:
+        for chunk in _chunks(records, chunk_rows):
+            parsed = []
+            for line_num, record in chunk:
+                if isinstance(record, dict):
+                    parsed.append((line_num, record))
+                else:
+                    counters["rejected"] += 1
+                    error = str(record) if isinstance(record, Exception) else "expected a JSON object"
+                    yield _event("error", line=line_num, error=error)
+
+            valid, errors = validate_batch_items([record for _, record in parsed], schema)
+            for index, message in errors:
+                counters["rejected"] += 1
+                yield _event("error", line=parsed[index][0], error=message)
+
+            if valid:
+                imported, duplicates = crud.import_rows(db, kind, pet_id, [item for _, item in valid])
+                counters["imported"] += imported
+                counters["duplicates"] += duplicates
+
+            counters["processed"] += len(chunk)
+            yield _event("progress", **counters)
+    finally:
+        db.close()
+
+    yield _event("done", **counters)
@@ -0,0 +1,42 @@
+"""
+Rebuilds the glucose_daily_stats rollup from the raw glucose readings.
+
+Needed once after the table is created, and again whenever
+GLUCOSE_RANGE_LOW / GLUCOSE_RANGE_HIGH change:
+    python -m app.jobs.backfill_glucose_stats [--pet-id PET_ID]
+"""
+import argparse
+import logging
+from typing import Optional
+
+from app import crud
+from app.cache import mark_pet_changed
+from app.database import SessionLocal
+
+logger = logging.getLogger("fred_app.jobs.backfill_glucose_stats")
+
+
+def backfill(pet_id: Optional[str] = None):
+    db = SessionLocal()
+    try:
+        crud.refresh_glucose_daily_stats(db, pet_id=pet_id)
+        # Workers drop the cached stats responses of the pet (None: every pet) on commit
+        mark_pet_changed(db, pet_id)
+        db.commit()
+    finally:
+        db.close()
+
+    logger.info("Glucose daily stats rebuilt for %s", pet_id or "all pets")
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Rebuild the glucose daily stats rollup")
+    parser.add_argument("--pet-id", default=None, help="Only rebuild this pet (default: all pets)")
+    args = parser.parse_args(argv)
+
+    backfill(args.pet_id)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
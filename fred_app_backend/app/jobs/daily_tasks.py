@@ -0,0 +1,72 @@
+"""
+Nightly pre-materialization of routine items.
+
+At Brasília midnight, creates the routine items of the day that just started
+for every pet, so the first ensure-daily / dashboard call of the day only
+reads. The insert is ON CONFLICT DO NOTHING, so running it from several
+workers (or from cron as well) is harmless.
+
+Run once from the command line (e.g. from cron):
+    python -m app.jobs.daily_tasks [--date YYYY-MM-DD]
+"""
+import argparse
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app import crud
+from app.config import BRASILIA_TZ
+from app.database import SessionLocal
+from app.utils import now_brasilia
+
+logger = logging.getLogger("fred_app.jobs.daily_tasks")
+
+
+def materialize_day(target_date: date) -> int:
+    """Materialize target_date's routine items for all pets."""
+    db = SessionLocal()
+    try:
+        created = crud.materialize_daily_tasks(db, target_date=target_date)
+    finally:
+        db.close()
+
+    logger.info("Materialized %s routine items for %s", created, target_date)
+    return created
+
+
+def _next_midnight(now: datetime) -> datetime:
+    tomorrow = (now + timedelta(days=1)).date()
+    return BRASILIA_TZ.localize(datetime.combine(tomorrow, datetime.min.time()))
+
+
+async def run_scheduler():
+    """Sleep until each Brasília midnight and materialize the new day."""
+    while True:
+        next_run = _next_midnight(now_brasilia())
+        await asyncio.sleep((next_run - now_brasilia()).total_seconds())
+
+        try:
+            await run_in_threadpool(materialize_day, next_run.date())
+        except Exception:
+            logger.exception("Daily routine item materialization failed")
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Materialize routine items for all pets")
+    parser.add_argument(
+        "--date",
+        default=None,
+        type=date.fromisoformat,
+        help="Date in YYYY-MM-DD format (default: today in Brasília)",
+    )
+    args = parser.parse_args(argv)
+
+    materialize_day(args.date or now_brasilia().date())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,54 @@
+"""
+Bulk-loads a pet's glucose readings or walks from a CSV/NDJSON file
+(spreadsheet history, another app's export), COPYing each validated chunk:
+    python -m app.jobs.import_history --pet-id PET_ID --kind glucose|walks [--format csv|ndjson] FILE
+
+Rejected rows are logged with their line number; the rest is imported.
+Re-running the same file only reports duplicates.
+"""
+import argparse
+import logging
+import os
+from typing import Optional
+
+import orjson
+
+from app import importer
+
+logger = logging.getLogger("fred_app.jobs.import_history")
+
+
+def import_file(path: str, pet_id: str, kind: str, format: str) -> dict:
+    summary = {}
+    with open(path, "rb") as stream:
+        for line in importer.import_events(stream, pet_id, kind, format):
+            event = orjson.loads(line)
+            if event["event"] == "error":
+                logger.warning("Line %s rejected: %s", event["line"], event["error"])
+            elif event["event"] == "progress":
+                logger.info(
+                    "%(processed)s rows read, %(imported)s imported, %(duplicates)s duplicates, %(rejected)s rejected",
+                    event,
+                )
+            else:
+                summary = event
+    return summary
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Bulk import glucose readings or walks of a pet")
+    parser.add_argument("file", help="CSV (header row with the API field names) or NDJSON file")
+    parser.add_argument("--pet-id", required=True)
+    parser.add_argument("--kind", required=True, choices=sorted(importer.SCHEMAS))
+    parser.add_argument("--format", choices=importer.FORMATS, default=None,
+                        help="Default: from the file extension")
+    args = parser.parse_args(argv)
+
+    format = args.format or ("ndjson" if os.path.splitext(args.file)[1].lower() in (".ndjson", ".jsonl") else "csv")
+    summary = import_file(args.file, args.pet_id, args.kind, format)
+    logger.info("Import finished: %s", summary)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -1,22 +1,57 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from app.database import engine
-from app import models
-from app.routers import pets, routine_items, glucose_readings, mood_entries, routine_templates, walk_entries
+from app import admission, database, events, metrics, photo_thumbnails, query_trace, replicas
+from app.config import settings
+from app.jobs import daily_tasks
+from app.routers import pets, photos, routine_items, glucose_readings, mood_entries, routine_templates, walk_entries
+
+# Database schema is managed by Alembic (see migrations/); run
+# `alembic upgrade head` before starting the API. Importing this module
+# touches no database: engines are created on first use.
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await database.warm_up_pool(settings.db_pool_warmup)
+    if settings.response_cache_size > 0:
+        # Drops the cache entries made stale by the other workers' writes
+        events.broker.start()
+
+    tasks = []
+    if settings.daily_tasks_scheduler:
+        tasks.append(asyncio.create_task(daily_tasks.run_scheduler()))
+    if database.replicas:
+        tasks.append(asyncio.create_task(replicas.run_health_checks()))
+
+    yield
+
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await events.broker.shutdown()
+    photo_thumbnails.shutdown()
+    await database.dispose_engines()
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="Fred Care API",
     description="API REST para o Fred Care - Sistema de cuidados para pets",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
+# Inside CORS, so the browser can read the 503s it sends
+if settings.admission_control:
+    app.add_middleware(admission.AdmissionMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -24,7 +59,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-DB-Queries", "X-DB-Time", "X-Last-Write", "Retry-After"],
 )
+app.add_middleware(metrics.MetricsMiddleware)
+if database.replicas:
+    app.add_middleware(replicas.ReadRoutingMiddleware)
+if settings.query_trace:
+    app.add_middleware(query_trace.QueryTraceMiddleware)
 
 # Include routers (nginx já adiciona o prefixo /api no proxy)
 app.include_router(pets.router, tags=["pets"])
@@ -33,6 +74,7 @@ app.include_router(routine_items.router, tags=["routine-items"])
 app.include_router(glucose_readings.router, tags=["glucose-readings"])
 app.include_router(mood_entries.router, tags=["mood-entries"])
 app.include_router(walk_entries.router, tags=["walk-entries"])
+app.include_router(photos.router, tags=["photos"])
 
 
 @app.exception_handler(HTTPException)
@@ -52,6 +94,11 @@ def read_root():
     return {"message": "Welcome to Fred Care API", "docs": "/docs"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    return metrics.metrics_response()
+
+
 @app.get("/health")
 def health_check():
     return {"status": "healthy", "service": "fred-care-api"}
@@ -0,0 +1,223 @@
+"""
+Prometheus metrics (GET /metrics).
+
+HTTP: latency histogram (until the response headers are sent, so streams
+count their time to first byte) and a request counter per route template
+and status.
+
+Database, from SQLAlchemy engine events on the engines of app.database:
+duration of every statement, statements and SQL time per request (per
+route), pool checked-out / overflow gauges and the time spent waiting for a
+pool connection. Pool saturation shows up as checked_out reaching
+size + max_overflow and pool_wait_seconds growing.
+
+Admission control (app/admission.py): requests running and queued per
+route class, queue wait and requests shed with 503.
+
+Under gunicorn every worker writes its values to PROMETHEUS_MULTIPROC_DIR
+(set by gunicorn.conf.py) and a scrape of any worker aggregates them all:
+counters and histograms are summed, gauges are summed over the live
+workers (so the pool gauges are the container's totals).
+"""
+import os
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+
+from fastapi import Response
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time until the response headers are sent",
+    ["method", "route"],
+    buckets=_LATENCY_BUCKETS,
+)
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests", ["method", "route", "status"])
+
+DB_STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds",
+    "Duration of each SQL statement",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+DB_STATEMENTS_PER_REQUEST = Histogram(
+    "db_statements_per_request",
+    "SQL statements issued while serving one request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds",
+    "SQL time spent while serving one request",
+    ["route"],
+    buckets=_LATENCY_BUCKETS,
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections currently checked out", ["engine"], multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Connections open beyond pool_size (negative: pool not yet filled)",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured pool_size", ["engine"], multiprocess_mode="livesum")
+DB_POOL_MAX_OVERFLOW = Gauge(
+    "db_pool_max_overflow", "Configured max_overflow", ["engine"], multiprocess_mode="livesum"
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time to get a connection from the pool (including opening a new one)",
+    ["engine"],
+    buckets=(0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30),
+)
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight", "Requests admitted and running", ["route_class"], multiprocess_mode="livesum"
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth", "Requests waiting for admission", ["route_class"], multiprocess_mode="livesum"
+)
+ADMISSION_WAIT = Histogram(
+    "admission_wait_seconds",
+    "Time admitted requests spent in the admission queue",
+    ["route_class"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total", "Requests shed with 503 (queue_full or timeout)", ["route_class", "reason"]
+)
+
+
+class _RequestDbStats:
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+
+# Stats of the request being served; copied into the threadpool and the
+# AsyncSession greenlets with the rest of the context
+_request_db_stats: ContextVar[Optional[_RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+
+class _TimedCheckout:
+    """Pool mixin observing how long each checkout waited for a connection."""
+
+    metrics_engine = "sync"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.labels(self.metrics_engine).observe(time.perf_counter() - start)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    metrics_engine = "sync"
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    metrics_engine = "async"
+
+
+def instrument_engine(engine: Engine, name: str):
+    """Statement timings and pool gauges for engine (the sync_engine of an AsyncEngine)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_statement(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_statement_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end_statement(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_statement_start"].pop()
+        DB_STATEMENT_DURATION.labels(name).observe(elapsed)
+        stats = _request_db_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.seconds += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _failed_statement(exception_context):
+        connection = exception_context.connection
+        starts = connection.info.get("metrics_statement_start") if connection is not None else None
+        if starts:
+            starts.pop()
+
+    # Plain values, updated on every checkout/checkin: the multiprocess
+    # collector reads them from the worker's file, it cannot call back
+    pool = engine.pool
+    checked_out = DB_POOL_CHECKED_OUT.labels(name)
+    overflow = DB_POOL_OVERFLOW.labels(name)
+
+    @event.listens_for(engine, "checkout")
+    def _checked_out(dbapi_connection, connection_record, connection_proxy):
+        checked_out.set(pool.checkedout())
+        overflow.set(pool.overflow())
+
+    @event.listens_for(engine, "checkin")
+    def _checked_in(dbapi_connection, connection_record):
+        # Fired before the connection goes back to the pool
+        checked_out.set(max(pool.checkedout() - 1, 0))
+        overflow.set(pool.overflow())
+
+    checked_out.set(pool.checkedout())
+    overflow.set(pool.overflow())
+    DB_POOL_SIZE.labels(name).set(pool.size())
+    DB_POOL_MAX_OVERFLOW.labels(name).set(pool._max_overflow)
+
+
+def _route_label(scope) -> str:
+    # Route template (e.g. /pets/{pet_id}), never the raw path: bounded label values
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording the HTTP and per-request DB metrics."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        stats = _RequestDbStats()
+        token = _request_db_stats.set(stats)
+        status: List[int] = [500]
+
+        async def send_with_metrics(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                HTTP_REQUEST_DURATION.labels(scope["method"], _route_label(scope)).observe(time.perf_counter() - start)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _request_db_stats.reset(token)
+            route = _route_label(scope)
+            HTTP_REQUESTS.labels(scope["method"], route, str(status[0])).inc()
+            DB_STATEMENTS_PER_REQUEST.labels(route).observe(stats.statements)
+            DB_TIME_PER_REQUEST.labels(route).observe(stats.seconds)
+
+
+def metrics_response() -> Response:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        # Every worker's values, whichever worker answers the scrape
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Float, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, Text, ForeignKey, Float, JSON, Index
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from app.database import Base
 from app.utils import now_brasilia
@@ -25,6 +25,9 @@ class Pet(Base):
 
 class RoutineTemplate(Base):
     __tablename__ = "routine_templates"
+    __table_args__ = (
+        Index("ix_routine_templates_pet_id_is_active", "pet_id", "is_active"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     pet_id = Column(String, ForeignKey("pets.id"), nullable=False)
@@ -40,6 +43,11 @@ class RoutineTemplate(Base):
 
 class RoutineItem(Base):
     __tablename__ = "routine_items"
+    __table_args__ = (
+        Index("ix_routine_items_pet_id_date", "pet_id", "date"),
+        # One item per template per day; target of ensure_daily_tasks' ON CONFLICT
+        Index("uq_routine_items_pet_id_template_id_date", "pet_id", "template_id", "date", unique=True),
+    )
 
     id = Column(String, primary_key=True, index=True)
     pet_id = Column(String, ForeignKey("pets.id"), nullable=False)
@@ -48,7 +56,7 @@ class RoutineItem(Base):
     task = Column(String, nullable=False)
     completed = Column(Boolean, default=False)
     completed_at = Column(DateTime(timezone=True), nullable=True)
-    date = Column(String, nullable=False)  # YYYY-MM-DD format
+    date = Column(Date, nullable=False)
     created_at = Column(DateTime(timezone=True), default=now_brasilia)
 
     # Relationships
@@ -58,6 +66,10 @@ class RoutineItem(Base):
 
 class GlucoseReading(Base):
     __tablename__ = "glucose_readings"
+    __table_args__ = (
+        Index("ix_glucose_readings_pet_id_created_at_id", "pet_id", "created_at", "id"),
+        Index("ix_glucose_readings_pet_id_date", "pet_id", "date"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     pet_id = Column(String, ForeignKey("pets.id"), nullable=False)
@@ -65,7 +77,7 @@ class GlucoseReading(Base):
     time_of_day = Column(String, nullable=False)
     protocol = Column(String, nullable=True)
     notes = Column(Text, nullable=True)
-    date = Column(String, nullable=False)  # YYYY-MM-DD format
+    date = Column(Date, nullable=False)
     insulin_dose = Column(Float, nullable=True)
     created_at = Column(DateTime(timezone=True), default=now_brasilia)
 
@@ -73,8 +85,29 @@ class GlucoseReading(Base):
     pet = relationship("Pet", back_populates="glucose_readings")
 
 
+class GlucoseDailyStat(Base):
+    """Per pet, per day glucose rollup kept in sync by the glucose crud writes."""
+    __tablename__ = "glucose_daily_stats"
+
+    pet_id = Column(String, ForeignKey("pets.id"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    reading_count = Column(Integer, nullable=False)
+    value_sum = Column(Float, nullable=False)
+    value_sum_squares = Column(Float, nullable=False)
+    value_min = Column(Float, nullable=False)
+    value_max = Column(Float, nullable=False)
+    below_range_count = Column(Integer, nullable=False)
+    in_range_count = Column(Integer, nullable=False)
+    above_range_count = Column(Integer, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=now_brasilia)
+
+
 class MoodEntry(Base):
     __tablename__ = "mood_entries"
+    __table_args__ = (
+        Index("ix_mood_entries_pet_id_created_at_id", "pet_id", "created_at", "id"),
+        Index("ix_mood_entries_pet_id_date", "pet_id", "date"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     pet_id = Column(String, ForeignKey("pets.id"), nullable=False)
@@ -83,7 +116,7 @@ class MoodEntry(Base):
     appetite = Column(String, nullable=False)  # alto, normal, baixo, nao-comeu
     walk = Column(String, nullable=False)  # longo, curto, nao-passeou
     notes = Column(Text, nullable=True)
-    date = Column(String, nullable=False)  # YYYY-MM-DD format
+    date = Column(Date, nullable=False)
     created_at = Column(DateTime(timezone=True), default=now_brasilia)
 
     # Relationship
@@ -92,16 +125,22 @@ class MoodEntry(Base):
 
 class WalkEntry(Base):
     __tablename__ = "walk_entries"
+    __table_args__ = (
+        Index("ix_walk_entries_pet_id_start_time_id", "pet_id", "start_time", "id"),
+        Index("ix_walk_entries_pet_id_date", "pet_id", "date"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     pet_id = Column(String, ForeignKey("pets.id"), nullable=False)
-    date = Column(String, nullable=False)  # YYYY-MM-DD
+    date = Column(Date, nullable=False)
     start_time = Column(DateTime(timezone=True), nullable=False)
     end_time = Column(DateTime(timezone=True), nullable=True)
     duration_seconds = Column(Integer, nullable=True)
-    pause_events = Column(JSON, nullable=True)
+    # JSON/Text columns are deferred ("details" group): loaded only when
+    # accessed, or with undefer("*") where the full entry is returned
+    pause_events = deferred(Column(JSON, nullable=True), group="details")
     energy_level = Column(String, nullable=True)  # very-low, low, moderate, high, very-high
-    behavior = Column(JSON, nullable=True)  # list of behaviors observed
+    behavior = deferred(Column(JSON, nullable=True), group="details")  # list of behaviors observed
     completed_route = Column(Boolean, default=True)
     pee_count = Column(String, nullable=True)  # none, 1x, 2x, 3x-plus
     pee_volume = Column(String, nullable=True)  # low, normal, high
@@ -111,18 +150,36 @@ class WalkEntry(Base):
     poop_blood = Column(Boolean, nullable=True)
     poop_mucus = Column(Boolean, nullable=True)
     poop_color = Column(String, nullable=True)
-    photos = Column(JSON, nullable=True)  # list of photo URLs/base64 refs
+    photos = deferred(Column(JSON, nullable=True), group="details")  # list of photo URLs or content-addressed refs (SHA-256, see app.photo_storage); never inline base64
     weather = Column(String, nullable=True)
     temperature_celsius = Column(Float, nullable=True)
     route_distance_km = Column(Float, nullable=True)
     route_description = Column(String, nullable=True)
-    mobility_notes = Column(Text, nullable=True)
+    mobility_notes = deferred(Column(Text, nullable=True), group="details")
     disorientation = Column(Boolean, nullable=True)
     excessive_panting = Column(Boolean, nullable=True)
     cough = Column(Boolean, nullable=True)
-    notes = Column(Text, nullable=True)
-    alerts = Column(JSON, nullable=True)  # precomputed alert tags
+    notes = deferred(Column(Text, nullable=True), group="details")
+    alerts = deferred(Column(JSON, nullable=True), group="details")  # precomputed alert tags
     created_at = Column(DateTime(timezone=True), default=now_brasilia)
 
     # Relationship
     pet = relationship("Pet", back_populates="walk_entries")
+
+
+class WalkDailyStat(Base):
+    """Per pet, per day walk rollup kept in sync by the walk crud writes."""
+    __tablename__ = "walk_daily_stats"
+
+    pet_id = Column(String, ForeignKey("pets.id"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    walk_count = Column(Integer, nullable=False)
+    total_duration_seconds = Column(Integer, nullable=False)
+    total_distance_km = Column(Float, nullable=False)
+    pee_walk_count = Column(Integer, nullable=False)  # walks with at least one pee
+    pee_count = Column(Integer, nullable=False)  # 3x-plus counts as 3
+    poop_count = Column(Integer, nullable=False)
+    loose_poop_count = Column(Integer, nullable=False)  # soft or diarrhea
+    energy_score_sum = Column(Integer, nullable=False)  # very-low=1 ... very-high=5
+    energy_score_count = Column(Integer, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=now_brasilia)
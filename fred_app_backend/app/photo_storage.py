@@ -0,0 +1,161 @@
+"""
+Content-addressed photo storage.
+
+Blobs are named by the SHA-256 of their bytes: the same photo uploaded twice
+is stored once, and walk rows keep only the 64-char hex reference
+(WalkEntry.photos) instead of inline base64. The backend is picked by
+settings.photo_storage_backend; only "local" (filesystem) exists today.
+"""
+import base64
+import binascii
+import hashlib
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+from app.config import settings
+
+CHUNK_SIZE = 1024 * 1024
+
+PHOTO_REF_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# Magic numbers of the accepted image formats
+_IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+class PhotoTooLarge(ValueError):
+    pass
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Media type from the first bytes of a file, None if it is not a supported image."""
+    for signature, media_type in _IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return media_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"heic", b"heix", b"mif1", b"msf1"):
+        return "image/heic"
+    return None
+
+
+def is_photo_ref(value: str) -> bool:
+    return bool(PHOTO_REF_RE.match(value))
+
+
+class PhotoStorage(ABC):
+    @abstractmethod
+    def save_stream(self, chunks: Iterable[bytes], max_bytes: Optional[int] = None) -> Tuple[str, int]:
+        """Store the blob, returning (sha256 hex, size). Raises PhotoTooLarge past max_bytes."""
+
+    @abstractmethod
+    def exists(self, digest: str) -> bool:
+        ...
+
+    @abstractmethod
+    def local_path(self, digest: str) -> Optional[str]:
+        """Filesystem path of the blob (served with FileResponse), None if missing."""
+
+    @abstractmethod
+    def derivative_path(self, digest: str, variant: str) -> str:
+        """Filesystem path where a derivative (e.g. thumbnail) of the blob is cached."""
+
+    def save_bytes(self, data: bytes) -> str:
+        digest, _ = self.save_stream([data])
+        return digest
+
+
+class LocalPhotoStorage(PhotoStorage):
+    """Files under root/ab/cd/<sha256>, written to a temp file and renamed into place."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def save_stream(self, chunks: Iterable[bytes], max_bytes: Optional[int] = None) -> Tuple[str, int]:
+        os.makedirs(self.root, exist_ok=True)
+        sha256 = hashlib.sha256()
+        size = 0
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in chunks:
+                    size += len(chunk)
+                    if max_bytes is not None and size > max_bytes:
+                        raise PhotoTooLarge(f"Photo larger than {max_bytes} bytes")
+                    sha256.update(chunk)
+                    tmp.write(chunk)
+
+            digest = sha256.hexdigest()
+            path = self._path(digest)
+            if os.path.exists(path):
+                # Already stored: dedup
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+            return digest, size
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def exists(self, digest: str) -> bool:
+        return is_photo_ref(digest) and os.path.exists(self._path(digest))
+
+    def local_path(self, digest: str) -> Optional[str]:
+        return self._path(digest) if self.exists(digest) else None
+
+    def derivative_path(self, digest: str, variant: str) -> str:
+        return os.path.join(self.root, "derivatives", digest[:2], digest[2:4], f"{digest}-{variant}")
+
+
+@lru_cache(maxsize=1)
+def get_photo_storage() -> PhotoStorage:
+    if settings.photo_storage_backend == "local":
+        return LocalPhotoStorage(settings.photo_storage_dir)
+    raise ValueError(f"Unknown photo storage backend: {settings.photo_storage_backend}")
+
+
+def _inline_image_bytes(value: str) -> Optional[bytes]:
+    """Decoded image of a data: URL or bare base64 string, None for URLs and refs."""
+    if value.startswith("data:"):
+        _, _, payload = value.partition(";base64,")
+    elif len(value) >= 256 and "://" not in value:
+        payload = value
+    else:
+        return None
+
+    try:
+        data = base64.b64decode(payload, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    return data if sniff_image_type(data[:16]) else None
+
+
+def externalize_photos(photos: Optional[List[str]]) -> Optional[List[str]]:
+    """Replace inline base64 images with references to the stored blob; URLs and refs are kept."""
+    if not photos:
+        return photos
+
+    storage = None
+    result = []
+    for value in photos:
+        data = _inline_image_bytes(value) if isinstance(value, str) else None
+        if data is None:
+            result.append(value)
+            continue
+        storage = storage or get_photo_storage()
+        result.append(storage.save_bytes(data))
+    return result
@@ -0,0 +1,122 @@
+"""
+Thumbnails of the stored walk photos.
+
+Derivatives are rendered with Pillow on a ProcessPoolExecutor, so the CPU
+work never runs on the event loop or the request threadpool. They are
+cached on disk next to the blobs: eagerly after an upload, lazily on the
+first GET /photos/{id}?size=... otherwise.
+"""
+import asyncio
+import contextlib
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Set, Tuple
+
+from app.config import settings
+from app.photo_storage import get_photo_storage
+
+logger = logging.getLogger("fred_app.photo_thumbnails")
+
+# Longest edge in pixels
+THUMBNAIL_SIZES = {"small": 160, "medium": 480, "large": 1080}
+
+# Output format -> (Pillow format, media type, save options)
+THUMBNAIL_FORMATS = {
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "image/jpeg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+_executor: Optional[ProcessPoolExecutor] = None
+_in_flight: Dict[Tuple[str, str, str], "asyncio.Future[bool]"] = {}
+_background: Set[asyncio.Task] = set()
+
+
+def _render_thumbnail(source_path: str, target_path: str, max_edge: int, image_format: str) -> bool:
+    """Runs in a worker process. False when the source cannot be decoded."""
+    from PIL import Image, ImageOps
+
+    pil_format, _, options = THUMBNAIL_FORMATS[image_format]
+    tmp_path = None
+    try:
+        with Image.open(source_path) as image:
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((max_edge, max_edge))
+            if image.mode not in ("RGB", "RGBA") or pil_format == "JPEG":
+                image = image.convert("RGBA" if pil_format == "WEBP" and "A" in image.getbands() else "RGB")
+
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target_path), prefix=".thumb-")
+            with os.fdopen(fd, "wb") as tmp:
+                image.save(tmp, pil_format, **options)
+            os.replace(tmp_path, target_path)
+            tmp_path = None
+        return True
+    except (OSError, ValueError):
+        return False
+    finally:
+        # A failed save must not leave its partial file in the photo store
+        if tmp_path is not None:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(tmp_path)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.thumbnail_workers)
+    return _executor
+
+
+def shutdown():
+    global _executor
+    for task in list(_background):
+        task.cancel()
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def ensure_thumbnail(photo_id: str, size: str, image_format: str) -> Optional[str]:
+    """
+    Path of the cached derivative, rendering it first if needed. Concurrent
+    requests for the same derivative share one render. None when the photo
+    does not exist or cannot be decoded as an image.
+    """
+    storage = get_photo_storage()
+    target_path = storage.derivative_path(photo_id, f"{size}.{image_format}")
+    if os.path.exists(target_path):
+        return target_path
+
+    source_path = storage.local_path(photo_id)
+    if source_path is None:
+        return None
+
+    key = (photo_id, size, image_format)
+    future = _in_flight.get(key)
+    if future is None:
+        loop = asyncio.get_running_loop()
+        future = asyncio.ensure_future(loop.run_in_executor(
+            _get_executor(), _render_thumbnail, source_path, target_path, THUMBNAIL_SIZES[size], image_format
+        ))
+        _in_flight[key] = future
+        future.add_done_callback(lambda _: _in_flight.pop(key, None))
+
+    rendered = await asyncio.shield(future)
+    return target_path if rendered else None
+
+
+async def _render_all(photo_id: str):
+    for size in THUMBNAIL_SIZES:
+        try:
+            await ensure_thumbnail(photo_id, size, "webp")
+        except Exception:
+            logger.exception("Failed to render %s thumbnail of photo %s", size, photo_id)
+
+
+def schedule_thumbnails(photo_id: str):
+    """Eagerly render the WebP derivatives of a new upload in the background."""
+    task = asyncio.create_task(_render_all(photo_id))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
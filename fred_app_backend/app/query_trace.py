@@ -0,0 +1,158 @@
+"""
+Per-request SQL tracer for development and staging (QUERY_TRACE=true).
+
+Every statement a request issues is recorded with its duration and the
+app/ frames that issued it. Responses get a summary:
+    X-DB-Queries: 4
+    X-DB-Time: 3.21          (ms)
+A request over its statement budget (QUERY_BUDGETS["GET /route/{param}"],
+else QUERY_BUDGET), or repeating the same statement QUERY_REPEAT_LIMIT
+times or more (the N+1 shape), is logged with the full trace, or fails with
+QueryBudgetExceeded when QUERY_BUDGET_ACTION=raise. Under TestClient that
+exception reaches the test, so round-trip regressions fail the run (see
+benchmarks/check_query_budgets.py).
+"""
+import logging
+import os
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger("fred_app.query_trace")
+
+_THIS_FILE = os.path.abspath(__file__)
+_APP_DIR = os.path.dirname(_THIS_FILE)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+class TracedStatement:
+    __slots__ = ("sql", "seconds", "stack")
+
+    def __init__(self, sql: str, seconds: float, stack: List[str]):
+        self.sql = sql
+        self.seconds = seconds
+        self.stack = stack
+
+
+class QueryTrace:
+    def __init__(self):
+        self.statements: List[TracedStatement] = []
+
+    @property
+    def seconds(self) -> float:
+        return sum(statement.seconds for statement in self.statements)
+
+    def repeated(self) -> List[tuple]:
+        """(sql, count) of the statements issued QUERY_REPEAT_LIMIT times or more."""
+        counts = Counter(statement.sql for statement in self.statements)
+        return [(sql, count) for sql, count in counts.most_common() if count >= settings.query_repeat_limit]
+
+    def report(self) -> str:
+        lines = []
+        for number, statement in enumerate(self.statements, start=1):
+            lines.append(f"#{number} {statement.seconds * 1000:.2f} ms: {statement.sql}")
+            lines.extend(f"    at {frame}" for frame in statement.stack)
+        return "\n".join(lines)
+
+
+_current_trace: ContextVar[Optional[QueryTrace]] = ContextVar("query_trace", default=None)
+
+
+def _call_site() -> List[str]:
+    """Innermost app/ frames (this module excluded) that led to the statement."""
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(_APP_DIR) and frame.filename != _THIS_FILE
+    ]
+    return [
+        f"{os.path.relpath(frame.filename, _APP_DIR)}:{frame.lineno} in {frame.name}"
+        for frame in frames[-settings.query_trace_stack_depth:]
+    ]
+
+
+def instrument_engine(engine: Engine):
+    """Record the statements of engine (the sync_engine of an AsyncEngine) into the current trace."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_statement(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_trace_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end_statement(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_trace_start"].pop()
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.statements.append(TracedStatement(" ".join(statement.split()), elapsed, _call_site()))
+
+    @event.listens_for(engine, "handle_error")
+    def _failed_statement(exception_context):
+        connection = exception_context.connection
+        starts = connection.info.get("query_trace_start") if connection is not None else None
+        if starts:
+            starts.pop()
+
+
+@contextmanager
+def capture() -> Iterator[QueryTrace]:
+    """Trace the statements issued inside the block (scripts, tests)."""
+    trace = QueryTrace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def check_budget(route: str, trace: QueryTrace):
+    """Log or raise (QUERY_BUDGET_ACTION) when route went over its budget or repeated a statement."""
+    budget = settings.query_budgets.get(route, settings.query_budget)
+    problems = []
+    if len(trace.statements) > budget:
+        problems.append(f"{len(trace.statements)} statements (budget {budget})")
+    for sql, count in trace.repeated():
+        problems.append(f"statement repeated {count} times (possible N+1): {sql[:200]}")
+    if not problems:
+        return
+
+    message = f"{route}: " + "; ".join(problems)
+    if settings.query_budget_action == "raise":
+        raise QueryBudgetExceeded(f"{message}\n{trace.report()}")
+    logger.warning("%s\n%s", message, trace.report())
+
+
+class QueryTraceMiddleware:
+    """ASGI middleware tracing each request's statements and adding X-DB-Queries / X-DB-Time."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_summary(message):
+            if message["type"] == "http.response.start":
+                # Headers go out once the handler is done: its statements are all in
+                route = getattr(scope.get("route"), "path", None) or scope["path"]
+                check_budget(f"{scope['method']} {route}", trace)
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-db-queries", str(len(trace.statements)).encode()),
+                    (b"x-db-time", f"{trace.seconds * 1000:.2f}".encode()),
+                ]
+            await send(message)
+
+        with capture() as trace:
+            await self.app(scope, receive, send_with_summary)
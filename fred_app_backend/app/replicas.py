@@ -0,0 +1,122 @@
+"""
+Read replicas (DATABASE_REPLICA_URLS).
+
+ReadRoutingMiddleware lets the SELECTs of GET/HEAD requests run on a
+replica (app.database._route picks one, round-robin among the healthy ones,
+and a session keeps it for the rest of the request). Writes always go to the
+primary, and so does everything a session runs after its first write.
+
+Read-your-writes: a response to a request that wrote carries
+    X-Last-Write: <unix time>        (and the same value in a last_write cookie)
+and a client sending it back (header or cookie) reads from the primary for
+REPLICA_STICKY_SECONDS after that write, longer than the replicas are
+expected to lag.
+
+run_health_checks() takes a replica out of rotation while it is unreachable
+or, with REPLICA_MAX_LAG_SECONDS, further behind than that; a dropped
+connection during a request does the same right away.
+"""
+import asyncio
+import logging
+import math
+import time
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import cookie_parser
+
+from app import database
+from app.config import settings
+
+logger = logging.getLogger("fred_app.replicas")
+
+LAST_WRITE_HEADER = "x-last-write"
+LAST_WRITE_COOKIE = "last_write"
+
+# Replay lag in seconds; 0 when the replica has replayed everything it received
+# (an idle primary would otherwise show as an ever-growing lag)
+_LAG = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+def _last_write(scope) -> float:
+    headers = dict(scope["headers"])
+    value = headers.get(LAST_WRITE_HEADER.encode())
+    if value is not None:
+        value = value.decode("latin-1")
+    elif b"cookie" in headers:
+        value = cookie_parser(headers[b"cookie"].decode("latin-1")).get(LAST_WRITE_COOKIE)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class ReadRoutingMiddleware:
+    """ASGI middleware setting database.read_routing for each request and marking the responses of writes."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        recent_write = time.time() - _last_write(scope) < settings.replica_sticky_seconds
+        routing = database.ReadRouting(replica_allowed=scope["method"] in ("GET", "HEAD") and not recent_write)
+
+        async def send_with_last_write(message):
+            if message["type"] == "http.response.start" and routing.wrote:
+                # The handler is done: its writes are committed
+                stamp = f"{time.time():.3f}"
+                max_age = math.ceil(settings.replica_sticky_seconds)
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (LAST_WRITE_HEADER.encode(), stamp.encode()),
+                    (b"set-cookie",
+                     f"{LAST_WRITE_COOKIE}={stamp}; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax".encode()),
+                ]
+            await send(message)
+
+        token = database.read_routing.set(routing)
+        try:
+            await self.app(scope, receive, send_with_last_write)
+        finally:
+            database.read_routing.reset(token)
+
+
+def _sync_lag(replica: database.Replica) -> float:
+    with replica.engine().connect() as conn:
+        return conn.execute(_LAG).scalar()
+
+
+async def _lag(replica: database.Replica) -> float:
+    if settings.db_async:
+        async with replica.async_engine().connect() as conn:
+            return (await conn.execute(_LAG)).scalar()
+    return await run_in_threadpool(_sync_lag, replica)
+
+
+async def check_replica(replica: database.Replica) -> bool:
+    try:
+        lag = await asyncio.wait_for(_lag(replica), settings.replica_health_interval)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.debug("%s health check failed: %s", replica.name, e)
+        return False
+    return not settings.replica_max_lag_seconds or lag <= settings.replica_max_lag_seconds
+
+
+async def run_health_checks():
+    """Check every replica each REPLICA_HEALTH_INTERVAL seconds and update its health."""
+    while True:
+        results = await asyncio.gather(*(check_replica(replica) for replica in database.replicas))
+        for replica, healthy in zip(database.replicas, results):
+            if healthy != replica.healthy:
+                logger.warning("%s is %s", replica.name, "back in rotation" if healthy else "out of rotation")
+                replica.healthy = healthy
+        await asyncio.sleep(settings.replica_health_interval)
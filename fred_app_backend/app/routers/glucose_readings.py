@@ -1,53 +1,118 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import List, Optional
+from datetime import date
 
-from app import crud, schemas
-from app.database import get_db
+from app import crud_async, schemas
+from app.cache import CachedRoute
+from app.config import settings
+from app.database import DbSession, get_session
+from app.utils import decode_cursor, encode_cursor, parse_fields, rows_response, validate_batch_items
 
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
 
 
 @router.get("/glucose-readings", response_model=List[schemas.GlucoseReading])
-def read_glucose_readings(
+async def read_glucose_readings(
+    response: Response,
     pet_id: str = Query(..., description="Pet ID"),
     limit: int = Query(30, description="Maximum number of records"),
-    sort: Optional[str] = Query(None, description="Sort order"),
-    db: Session = Depends(get_db)
+    sort: Optional[str] = Query(None, description="Sort order (created_at:desc or created_at:asc)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id and created_at are always included)"),
+    db: DbSession = Depends(get_session)
 ):
-    glucose_readings = crud.get_glucose_readings(db, pet_id=pet_id, limit=limit, sort=sort)
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        selected_fields = parse_fields(fields, schemas.GlucoseReading, always=("id", "created_at"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    glucose_readings = await crud_async.get_glucose_readings(
+        db, pet_id=pet_id, limit=limit, sort=sort, after=after, lean=settings.lean_reads, fields=selected_fields
+    )
+
+    # A full page means there may be more rows after the last one
+    if limit and len(glucose_readings) == limit:
+        last = glucose_readings[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+    if settings.lean_reads or selected_fields:
+        return rows_response(glucose_readings, response)
     return glucose_readings
 
 
+@router.get("/glucose-readings/stats", response_model=schemas.GlucoseStats)
+async def read_glucose_stats(
+    pet_id: str = Query(..., description="Pet ID"),
+    days: int = Query(30, ge=1, le=366, description="Window size in days (e.g. 30, 90, 365)"),
+    end_date: Optional[date] = Query(None, description="Last day of the window in YYYY-MM-DD format"),
+    db: DbSession = Depends(get_session)
+):
+    # Set default date if not provided
+    end_date = end_date or date.today()
+
+    return await crud_async.get_glucose_stats(db, pet_id=pet_id, days=days, end_date=end_date)
+
+
 @router.post("/glucose-readings", response_model=schemas.GlucoseReading)
-def create_glucose_reading(
+async def create_glucose_reading(
     glucose_reading: schemas.GlucoseReadingCreate, 
     pet_id: str = Query(..., description="Pet ID"),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
-    # Verify pet exists
-    pet = crud.get_pet(db, pet_id=pet_id)
+    # Inserted only if the pet exists (single INSERT ... SELECT ... RETURNING)
+    db_glucose_reading = await crud_async.create_glucose_reading(db=db, glucose_reading=glucose_reading, pet_id=pet_id)
+    if db_glucose_reading is None:
+        raise HTTPException(status_code=404, detail="Pet not found")
+    return db_glucose_reading
+
+
+@router.post("/glucose-readings/batch", response_model=schemas.GlucoseReadingBatchResult)
+async def create_glucose_readings_batch(
+    batch: schemas.GlucoseReadingBatchCreate,
+    pet_id: str = Query(..., description="Pet ID"),
+    db: DbSession = Depends(get_session)
+):
+    # Verify pet exists (once for the whole batch)
+    pet = await crud_async.get_pet(db, pet_id=pet_id)
     if pet is None:
         raise HTTPException(status_code=404, detail="Pet not found")
-    
-    return crud.create_glucose_reading(db=db, glucose_reading=glucose_reading, pet_id=pet_id)
+
+    valid, errors = validate_batch_items(batch.items, schemas.GlucoseReadingCreate)
+    created = await crud_async.create_glucose_readings(
+        db, glucose_readings=[item for _, item in valid], pet_id=pet_id
+    )
+
+    results = [
+        schemas.GlucoseReadingBatchItemResult(index=index, status="created", item=db_glucose_reading)
+        for (index, _), db_glucose_reading in zip(valid, created)
+    ]
+    results += [
+        schemas.GlucoseReadingBatchItemResult(index=index, status="error", error=message)
+        for index, message in errors
+    ]
+    results.sort(key=lambda result: result.index)
+
+    return schemas.GlucoseReadingBatchResult(created=len(created), failed=len(errors), results=results)
 
 
 @router.patch("/glucose-readings/{glucose_reading_id}", response_model=schemas.GlucoseReading)
-def update_glucose_reading(
+async def update_glucose_reading(
     glucose_reading_id: str,
     updates: schemas.GlucoseReadingUpdate,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
-    db_glucose_reading = crud.update_glucose_reading(db, glucose_reading_id=glucose_reading_id, updates=updates)
+    db_glucose_reading = await crud_async.update_glucose_reading(db, glucose_reading_id=glucose_reading_id, updates=updates)
     if db_glucose_reading is None:
         raise HTTPException(status_code=404, detail="Glucose reading not found")
     return db_glucose_reading
 
 
 @router.delete("/glucose-readings/{glucose_reading_id}")
-def delete_glucose_reading(glucose_reading_id: str, db: Session = Depends(get_db)):
-    db_glucose_reading = crud.delete_glucose_reading(db, glucose_reading_id=glucose_reading_id)
+async def delete_glucose_reading(glucose_reading_id: str, db: DbSession = Depends(get_session)):
+    db_glucose_reading = await crud_async.delete_glucose_reading(db, glucose_reading_id=glucose_reading_id)
     if db_glucose_reading is None:
         raise HTTPException(status_code=404, detail="Glucose reading not found")
     return {"message": "Glucose reading deleted successfully"}
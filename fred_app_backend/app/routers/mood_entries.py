@@ -1,41 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import List, Optional
 
-from app import crud, schemas
-from app.database import get_db
+from app import crud_async, schemas
+from app.cache import CachedRoute
+from app.config import settings
+from app.database import DbSession, get_session
+from app.utils import decode_cursor, encode_cursor, parse_fields, rows_response
 
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
 
 
 @router.get("/mood-entries", response_model=List[schemas.MoodEntry])
-def read_mood_entries(
+async def read_mood_entries(
+    response: Response,
     pet_id: str = Query(..., description="Pet ID"),
     limit: int = Query(30, description="Maximum number of records"),
-    sort: Optional[str] = Query(None, description="Sort order"),
-    db: Session = Depends(get_db)
+    sort: Optional[str] = Query(None, description="Sort order (created_at:desc or created_at:asc)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id and created_at are always included)"),
+    db: DbSession = Depends(get_session)
 ):
-    mood_entries = crud.get_mood_entries(db, pet_id=pet_id, limit=limit, sort=sort)
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        selected_fields = parse_fields(fields, schemas.MoodEntry, always=("id", "created_at"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    mood_entries = await crud_async.get_mood_entries(
+        db, pet_id=pet_id, limit=limit, sort=sort, after=after, lean=settings.lean_reads, fields=selected_fields
+    )
+
+    # A full page means there may be more rows after the last one
+    if limit and len(mood_entries) == limit:
+        last = mood_entries[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+    if settings.lean_reads or selected_fields:
+        return rows_response(mood_entries, response)
     return mood_entries
 
 
 @router.post("/mood-entries", response_model=schemas.MoodEntry)
-def create_mood_entry(
+async def create_mood_entry(
     mood_entry: schemas.MoodEntryCreate, 
     pet_id: str = Query(..., description="Pet ID"),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
-    # Verify pet exists
-    pet = crud.get_pet(db, pet_id=pet_id)
-    if pet is None:
+    # Inserted only if the pet exists (single INSERT ... SELECT ... RETURNING)
+    db_mood_entry = await crud_async.create_mood_entry(db=db, mood_entry=mood_entry, pet_id=pet_id)
+    if db_mood_entry is None:
         raise HTTPException(status_code=404, detail="Pet not found")
-    
-    return crud.create_mood_entry(db=db, mood_entry=mood_entry, pet_id=pet_id)
+    return db_mood_entry
 
 
 @router.delete("/mood-entries/{mood_entry_id}")
-def delete_mood_entry(mood_entry_id: str, db: Session = Depends(get_db)):
-    db_mood_entry = crud.delete_mood_entry(db, mood_entry_id=mood_entry_id)
+async def delete_mood_entry(mood_entry_id: str, db: DbSession = Depends(get_session)):
+    db_mood_entry = await crud_async.delete_mood_entry(db, mood_entry_id=mood_entry_id)
     if db_mood_entry is None:
         raise HTTPException(status_code=404, detail="Mood entry not found")
     return {"message": "Mood entry deleted successfully"}
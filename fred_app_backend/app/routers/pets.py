@@ -1,35 +1,140 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from datetime import date as date_class
+import tempfile
 
-from app import crud, schemas
-from app.database import get_db
+from app import crud_async, events, export, importer, schemas
+from app.cache import CachedRoute
+from app.database import DbSession, get_session, release_session
 
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
 
 
 @router.get("/pets", response_model=List[schemas.Pet])
-def read_pets(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    pets = crud.get_pets(db, skip=skip, limit=limit)
+async def read_pets(skip: int = 0, limit: int = 100, db: DbSession = Depends(get_session)):
+    pets = await crud_async.get_pets(db, skip=skip, limit=limit)
     return pets
 
 
 @router.post("/pets", response_model=schemas.Pet)
-def create_pet(pet: schemas.PetCreate, db: Session = Depends(get_db)):
-    return crud.create_pet(db=db, pet=pet)
+async def create_pet(pet: schemas.PetCreate, db: DbSession = Depends(get_session)):
+    return await crud_async.create_pet(db=db, pet=pet)
 
 
 @router.get("/pets/{pet_id}", response_model=schemas.Pet)
-def read_pet(pet_id: str, db: Session = Depends(get_db)):
-    db_pet = crud.get_pet(db, pet_id=pet_id)
+async def read_pet(pet_id: str, db: DbSession = Depends(get_session)):
+    db_pet = await crud_async.get_pet(db, pet_id=pet_id)
     if db_pet is None:
         raise HTTPException(status_code=404, detail="Pet not found")
     return db_pet
 
 
+@router.get("/pets/{pet_id}/dashboard", response_model=schemas.PetDashboard)
+async def read_pet_dashboard(
+    pet_id: str,
+    date: Optional[date_class] = Query(None, description="Date in YYYY-MM-DD format"),
+    glucose_limit: int = Query(30, description="Maximum number of glucose readings"),
+    mood_limit: int = Query(30, description="Maximum number of mood entries"),
+    walk_limit: int = Query(60, description="Maximum number of walk entries"),
+    routine_days: int = Query(30, ge=1, description="Days of routine history up to the date"),
+    db: DbSession = Depends(get_session)
+):
+    # Set default date if not provided
+    target_date = date or date_class.today()
+
+    dashboard = await crud_async.get_pet_dashboard(
+        db,
+        pet_id=pet_id,
+        target_date=target_date,
+        glucose_limit=glucose_limit,
+        mood_limit=mood_limit,
+        walk_limit=walk_limit,
+        routine_days=routine_days,
+    )
+    if dashboard is None:
+        raise HTTPException(status_code=404, detail="Pet not found")
+    return dashboard
+
+
+@router.get("/pets/{pet_id}/export")
+async def export_pet_history(
+    pet_id: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    since: Optional[date_class] = Query(None, description="Only records from this date on (YYYY-MM-DD)"),
+    db: DbSession = Depends(get_session)
+):
+    db_pet = await crud_async.get_pet(db, pet_id=pet_id)
+    if db_pet is None:
+        raise HTTPException(status_code=404, detail="Pet not found")
+
+    pet = schemas.Pet.model_validate(db_pet).model_dump()
+    # The stream reads through its own sessions; this one must not pin a connection meanwhile
+    await release_session(db)
+
+    chunks = export.ndjson_chunks if format == "ndjson" else export.csv_chunks
+    filename = f"fred-{pet_id}-{date_class.today()}.{format}"
+    return StreamingResponse(
+        chunks(pet, since),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/pets/{pet_id}/events")
+async def stream_pet_events(pet_id: str, db: DbSession = Depends(get_session)):
+    """Server-Sent Events: insert/update/delete of the pet's routine items, glucose, mood and walks."""
+    db_pet = await crud_async.get_pet(db, pet_id=pet_id)
+    if db_pet is None:
+        raise HTTPException(status_code=404, detail="Pet not found")
+    # The stream stays open indefinitely; it must not pin a pool connection
+    await release_session(db)
+
+    return StreamingResponse(
+        events.sse_stream(pet_id),
+        media_type="text/event-stream",
+        # X-Accel-Buffering: nginx passes each event through as it comes
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _import_and_close(upload, pet_id: str, kind: str, format: str):
+    try:
+        yield from importer.import_events(upload, pet_id, kind, format)
+    finally:
+        upload.close()
+
+
+@router.post("/pets/{pet_id}/import")
+async def import_pet_history(
+    pet_id: str,
+    request: Request,
+    kind: str = Query(..., pattern="^(glucose|walks)$", description="glucose or walks"),
+    format: str = Query("csv", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    db: DbSession = Depends(get_session)
+):
+    """Raw CSV/NDJSON request body; answers with NDJSON progress and per-row error events."""
+    db_pet = await crud_async.get_pet(db, pet_id=pet_id)
+    if db_pet is None:
+        raise HTTPException(status_code=404, detail="Pet not found")
+    # Uploading and importing can take minutes; the importer has its own sessions
+    await release_session(db)
+
+    # Spooled to disk past a few MB, so large files never sit in memory
+    upload = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    async for chunk in request.stream():
+        upload.write(chunk)
+    upload.seek(0)
+
+    return StreamingResponse(
+        _import_and_close(upload, pet_id, kind, format),
+        media_type="application/x-ndjson",
+    )
+
+
 @router.delete("/pets/{pet_id}")
-def delete_pet(pet_id: str, db: Session = Depends(get_db)):
-    db_pet = crud.delete_pet(db, pet_id=pet_id)
+async def delete_pet(pet_id: str, db: DbSession = Depends(get_session)):
+    db_pet = await crud_async.delete_pet(db, pet_id=pet_id)
     if db_pet is None:
         raise HTTPException(status_code=404, detail="Pet not found")
     return {"message": "Pet deleted successfully"}
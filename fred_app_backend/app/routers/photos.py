@@ -0,0 +1,90 @@
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+
+from app import photo_thumbnails, schemas
+from app.cache import etag_matches
+from app.config import settings
+from app.photo_storage import CHUNK_SIZE, PhotoTooLarge, get_photo_storage, sniff_image_type
+
+# Not a CachedRoute: blobs are immutable and cached by the client instead
+router = APIRouter()
+
+# Content-addressed: a photo id never changes content
+PHOTO_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.post("/photos", response_model=schemas.PhotoUpload, status_code=201)
+async def upload_photo(file: UploadFile = File(...)):
+    content_type = sniff_image_type(await file.read(16))
+    if content_type is None:
+        raise HTTPException(status_code=415, detail="Unsupported image type")
+    await file.seek(0)
+
+    # Hashed and written chunk by chunk from the spooled upload, off the event loop
+    chunks = iter(lambda: file.file.read(CHUNK_SIZE), b"")
+    try:
+        digest, size = await run_in_threadpool(
+            get_photo_storage().save_stream, chunks, settings.photo_max_bytes
+        )
+    except PhotoTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    photo_thumbnails.schedule_thumbnails(digest)
+    return {"id": digest, "size": size, "content_type": content_type}
+
+
+def _locate_photo(photo_id: str) -> Optional[Tuple[str, str]]:
+    path = get_photo_storage().local_path(photo_id)
+    if path is None:
+        return None
+    with open(path, "rb") as f:
+        content_type = sniff_image_type(f.read(16)) or "application/octet-stream"
+    return path, content_type
+
+
+@router.get("/photos/{photo_id}")
+async def read_photo(
+    photo_id: str,
+    request: Request,
+    size: Optional[str] = Query(
+        None,
+        pattern="^(small|medium|large)$",
+        description="Thumbnail (longest edge 160, 480 or 1080 px) instead of the original",
+    ),
+):
+    if size is not None:
+        return await _read_thumbnail(photo_id, size, request)
+
+    photo = await run_in_threadpool(_locate_photo, photo_id)
+    if photo is None:
+        raise HTTPException(status_code=404, detail="Photo not found")
+
+    etag = f'"{photo_id}"'
+    headers = {"ETag": etag, "Cache-Control": PHOTO_CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    # FileResponse streams the file and answers Range requests with 206
+    path, content_type = photo
+    return FileResponse(path, media_type=content_type, headers=headers)
+
+
+async def _read_thumbnail(photo_id: str, size: str, request: Request):
+    # WebP when the client takes it, JPEG otherwise
+    image_format = "webp" if "image/webp" in request.headers.get("accept", "") else "jpeg"
+    etag = f'"{photo_id}-{size}.{image_format}"'
+    headers = {"ETag": etag, "Cache-Control": PHOTO_CACHE_CONTROL, "Vary": "Accept"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    if not get_photo_storage().exists(photo_id):
+        raise HTTPException(status_code=404, detail="Photo not found")
+    path = await photo_thumbnails.ensure_thumbnail(photo_id, size, image_format)
+    if path is None:
+        raise HTTPException(status_code=415, detail="Photo cannot be resized")
+
+    _, media_type, _ = photo_thumbnails.THUMBNAIL_FORMATS[image_format]
+    return FileResponse(path, media_type=media_type, headers=headers)
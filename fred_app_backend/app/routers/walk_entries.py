@@ -1,64 +1,135 @@
+from datetime import date
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
-from app import crud, schemas
-from app.database import get_db
+from app import crud_async, schemas
+from app.cache import CachedRoute
+from app.config import settings
+from app.database import DbSession, get_session
+from app.utils import decode_cursor, encode_cursor, parse_fields, rows_response, validate_batch_items
 
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
 
 
 @router.get("/walk-entries", response_model=List[schemas.WalkEntry])
-def read_walk_entries(
+async def read_walk_entries(
+    response: Response,
     pet_id: str = Query(..., description="Pet ID"),
     limit: int = Query(30, description="Número máximo de registros"),
     sort: Optional[str] = Query("start_time:desc", description="Ordenação desejada"),
-    start_date: Optional[str] = Query(None, description="Filtra passeios a partir desta data (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="Filtra passeios até esta data (YYYY-MM-DD)"),
-    db: Session = Depends(get_db),
+    start_date: Optional[date] = Query(None, description="Filtra passeios a partir desta data (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="Filtra passeios até esta data (YYYY-MM-DD)"),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor da página anterior"),
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (id e start_time sempre incluídos)"),
+    db: DbSession = Depends(get_session),
 ):
-    return crud.get_walk_entries(
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        selected_fields = parse_fields(fields, schemas.WalkEntry, always=("id", "start_time"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    walk_entries = await crud_async.get_walk_entries(
         db,
         pet_id=pet_id,
         limit=limit,
         sort=sort,
         start_date=start_date,
         end_date=end_date,
+        after=after,
+        lean=settings.lean_reads,
+        fields=selected_fields,
+    )
+
+    # Página cheia: pode haver mais registros depois do último
+    if limit and len(walk_entries) == limit:
+        last = walk_entries[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.start_time, last.id)
+    if settings.lean_reads or selected_fields:
+        return rows_response(walk_entries, response)
+    return walk_entries
+
+
+@router.get("/walk-entries/summary", response_model=List[schemas.WalkSummaryBucket])
+async def read_walk_summary(
+    pet_id: str = Query(..., description="Pet ID"),
+    bucket: str = Query("week", pattern="^(week|month)$", description="Agrupamento: week ou month"),
+    start_date: Optional[date] = Query(None, description="Considera passeios a partir desta data (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="Considera passeios até esta data (YYYY-MM-DD)"),
+    db: DbSession = Depends(get_session),
+):
+    return await crud_async.get_walk_summary(
+        db,
+        pet_id=pet_id,
+        bucket=bucket,
+        start_date=start_date,
+        end_date=end_date,
     )
 
 
 @router.post("/walk-entries", response_model=schemas.WalkEntry)
-def create_walk_entry(
+async def create_walk_entry(
     walk_entry: schemas.WalkEntryCreate,
     pet_id: str = Query(..., description="Pet ID"),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
 ):
-    pet = crud.get_pet(db, pet_id=pet_id)
+    # Inserted only if the pet exists (single INSERT ... SELECT ... RETURNING)
+    db_walk_entry = await crud_async.create_walk_entry(db=db, walk_entry=walk_entry, pet_id=pet_id)
+    if db_walk_entry is None:
+        raise HTTPException(status_code=404, detail="Pet not found")
+    return db_walk_entry
+
+
+@router.post("/walk-entries/batch", response_model=schemas.WalkEntryBatchResult)
+async def create_walk_entries_batch(
+    batch: schemas.WalkEntryBatchCreate,
+    pet_id: str = Query(..., description="Pet ID"),
+    db: DbSession = Depends(get_session),
+):
+    pet = await crud_async.get_pet(db, pet_id=pet_id)
     if pet is None:
         raise HTTPException(status_code=404, detail="Pet not found")
 
-    return crud.create_walk_entry(db=db, walk_entry=walk_entry, pet_id=pet_id)
+    valid, errors = validate_batch_items(batch.items, schemas.WalkEntryCreate)
+    created = await crud_async.create_walk_entries(
+        db, walk_entries=[item for _, item in valid], pet_id=pet_id
+    )
+
+    results = [
+        schemas.WalkEntryBatchItemResult(index=index, status="created", item=db_walk_entry)
+        for (index, _), db_walk_entry in zip(valid, created)
+    ]
+    results += [
+        schemas.WalkEntryBatchItemResult(index=index, status="error", error=message)
+        for index, message in errors
+    ]
+    results.sort(key=lambda result: result.index)
+
+    return schemas.WalkEntryBatchResult(created=len(created), failed=len(errors), results=results)
 
 
 @router.patch("/walk-entries/{walk_entry_id}", response_model=schemas.WalkEntry)
-def update_walk_entry(
+async def update_walk_entry(
     walk_entry_id: str,
     updates: schemas.WalkEntryUpdate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
 ):
-    db_walk_entry = crud.update_walk_entry(db, walk_entry_id=walk_entry_id, updates=updates)
+    db_walk_entry = await crud_async.update_walk_entry(db, walk_entry_id=walk_entry_id, updates=updates)
     if db_walk_entry is None:
         raise HTTPException(status_code=404, detail="Walk entry not found")
     return db_walk_entry
 
 
 @router.delete("/walk-entries/{walk_entry_id}")
-def delete_walk_entry(
+async def delete_walk_entry(
     walk_entry_id: str,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
 ):
-    db_walk_entry = crud.delete_walk_entry(db, walk_entry_id=walk_entry_id)
+    db_walk_entry = await crud_async.delete_walk_entry(db, walk_entry_id=walk_entry_id)
     if db_walk_entry is None:
         raise HTTPException(status_code=404, detail="Walk entry not found")
     return {"message": "Walk entry deleted successfully"}
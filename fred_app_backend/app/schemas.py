@@ -1,6 +1,6 @@
-from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
+from pydantic import AliasChoices, BaseModel, Field
+from typing import Any, Dict, List, Optional
+from datetime import date as date_class, datetime
 
 
 # Pet schemas
@@ -52,7 +52,7 @@ class RoutineTemplate(RoutineTemplateBase):
 class RoutineItemBase(BaseModel):
     period: str  # morning, afternoon, evening
     task: str
-    date: Optional[str] = None
+    date: Optional[date_class] = None
 
 
 class RoutineItemCreate(RoutineItemBase):
@@ -69,7 +69,7 @@ class RoutineItem(RoutineItemBase):
     template_id: Optional[str] = None
     completed: bool
     completed_at: Optional[datetime] = None
-    date: str
+    date: date_class
 
     class Config:
         from_attributes = True
@@ -81,7 +81,7 @@ class GlucoseReadingBase(BaseModel):
     time_of_day: str
     protocol: Optional[str] = None
     notes: Optional[str] = None
-    date: Optional[str] = None
+    date: Optional[date_class] = None
     insulin_dose: Optional[float] = None
 
 
@@ -89,8 +89,15 @@ class GlucoseReadingCreate(BaseModel):
     value: float
     protocol: Optional[str] = None
     notes: Optional[str] = None
-    date: Optional[str] = None
+    date: Optional[date_class] = None
     insulin_dose: Optional[float] = None
+    measured_at: Optional[datetime] = None  # when the reading was taken (default: now)
+
+
+class GlucoseReadingImport(GlucoseReadingCreate):
+    # Required: it is the natural key that lets a re-run skip the rows already
+    # imported. An export's created_at column is accepted as well.
+    measured_at: datetime = Field(validation_alias=AliasChoices("measured_at", "created_at"))
 
 
 class GlucoseReadingUpdate(BaseModel):
@@ -101,13 +108,62 @@ class GlucoseReadingUpdate(BaseModel):
 
 class GlucoseReading(GlucoseReadingBase):
     id: str
-    date: str
+    date: date_class
     created_at: datetime
 
     class Config:
         from_attributes = True
 
 
+class GlucoseReadingBatchCreate(BaseModel):
+    # Raw dicts so one invalid reading is reported per item instead of failing the batch
+    items: List[Dict[str, Any]] = Field(
+        ..., max_length=500, description="Readings in the GlucoseReadingCreate format"
+    )
+
+
+class GlucoseReadingBatchItemResult(BaseModel):
+    index: int
+    status: str  # created, error
+    item: Optional[GlucoseReading] = None
+    error: Optional[str] = None
+
+
+class GlucoseReadingBatchResult(BaseModel):
+    created: int
+    failed: int
+    results: List[GlucoseReadingBatchItemResult]
+
+
+class GlucoseDailyStats(BaseModel):
+    date: date_class
+    reading_count: int
+    mean: float
+    min: float
+    max: float
+    in_range_count: int
+
+
+class GlucoseStats(BaseModel):
+    pet_id: str
+    days: int
+    start_date: date_class
+    end_date: date_class
+    range_low: float
+    range_high: float
+    reading_count: int
+    days_with_readings: int
+    readings_per_day: Optional[float] = None
+    mean: Optional[float] = None
+    std_dev: Optional[float] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+    time_in_range: Optional[float] = None  # fraction of readings (0-1)
+    time_below_range: Optional[float] = None
+    time_above_range: Optional[float] = None
+    daily: List[GlucoseDailyStats]
+
+
 # Mood Entry schemas
 class MoodEntryBase(BaseModel):
     energy_level: str  # alta, media, baixa
@@ -115,7 +171,7 @@ class MoodEntryBase(BaseModel):
     appetite: str  # alto, normal, baixo, nao-comeu
     walk: str  # longo, curto, nao-passeou
     notes: Optional[str] = None
-    date: Optional[str] = None
+    date: Optional[date_class] = None
 
 
 class MoodEntryCreate(MoodEntryBase):
@@ -124,7 +180,7 @@ class MoodEntryCreate(MoodEntryBase):
 
 class MoodEntry(MoodEntryBase):
     id: str
-    date: str
+    date: date_class
     created_at: datetime
 
     class Config:
@@ -152,7 +208,7 @@ class WalkEntryBase(BaseModel):
     poop_blood: Optional[bool] = None
     poop_mucus: Optional[bool] = None
     poop_color: Optional[str] = None
-    photos: Optional[List[str]] = None
+    photos: Optional[List[str]] = None  # photo ids (POST /photos) or external URLs
     weather: Optional[str] = None
     temperature_celsius: Optional[float] = None
     route_distance_km: Optional[float] = None
@@ -163,7 +219,7 @@ class WalkEntryBase(BaseModel):
     cough: Optional[bool] = None
     notes: Optional[str] = None
     alerts: Optional[List[str]] = None
-    date: Optional[str] = None
+    date: Optional[date_class] = None
 
 
 class WalkEntryCreate(WalkEntryBase):
@@ -200,13 +256,65 @@ class WalkEntryUpdate(BaseModel):
 
 class WalkEntry(WalkEntryBase):
     id: str
-    date: str
+    date: date_class
     created_at: datetime
 
     class Config:
         from_attributes = True
 
 
+class WalkEntryBatchCreate(BaseModel):
+    # Raw dicts so one invalid walk is reported per item instead of failing the batch
+    items: List[Dict[str, Any]] = Field(
+        ..., max_length=500, description="Walks in the WalkEntryCreate format"
+    )
+
+
+class WalkEntryBatchItemResult(BaseModel):
+    index: int
+    status: str  # created, error
+    item: Optional[WalkEntry] = None
+    error: Optional[str] = None
+
+
+class WalkEntryBatchResult(BaseModel):
+    created: int
+    failed: int
+    results: List[WalkEntryBatchItemResult]
+
+
+class WalkSummaryBucket(BaseModel):
+    bucket_start: date_class  # first day of the week (Monday) or month
+    walk_count: int
+    total_duration_seconds: int
+    average_duration_seconds: float
+    total_distance_km: float
+    pee_walk_count: int
+    pee_count: int
+    poop_count: int
+    poop_frequency: float  # poops per walk
+    loose_poop_count: int
+    average_energy_score: Optional[float] = None  # very-low=1 ... very-high=5
+
+
+class PhotoUpload(BaseModel):
+    id: str  # SHA-256 of the content; goes into WalkEntry.photos
+    size: int
+    content_type: str
+
+
+# Dashboard schema
+class PetDashboard(BaseModel):
+    pet: Pet
+    date: date_class
+    routine_templates: List[RoutineTemplate]
+    routine_items: List[RoutineItem]
+    all_routine_items: List[RoutineItem]
+    glucose_readings: List[GlucoseReading]
+    mood_entries: List[MoodEntry]
+    walk_entries: List[WalkEntry]
+
+
 # Error schema
 class ErrorResponse(BaseModel):
     error: str
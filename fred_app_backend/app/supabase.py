@@ -1,16 +1,31 @@
 """
 Supabase client configuration.
 This provides access to Supabase features like Auth, Storage, Realtime, etc.
+
+The supabase package is optional (requirements-supabase.txt) and imported on
+the first call, so it never weighs on the API's startup.
 """
-from typing import Optional
-from supabase import create_client, Client
+from typing import TYPE_CHECKING, Optional
 from app.config import settings
 
+if TYPE_CHECKING:
+    from supabase import Client
+
+
+_supabase_client: Optional["Client"] = None
+
 
-_supabase_client: Optional[Client] = None
+def _create_client(url: str, key: str) -> "Client":
+    try:
+        from supabase import create_client
+    except ImportError as e:
+        raise RuntimeError(
+            "The supabase package is not installed: pip install -r requirements-supabase.txt"
+        ) from e
+    return create_client(url, key)
 
 
-def get_supabase_client() -> Optional[Client]:
+def get_supabase_client() -> Optional["Client"]:
     """
     Get or create a Supabase client instance.
     Returns None if Supabase is not configured (useful for local development).
@@ -23,7 +38,7 @@ def get_supabase_client() -> Optional[Client]:
     if not settings.supabase_url or not settings.supabase_key:
         return None
 
-    _supabase_client = create_client(
+    _supabase_client = _create_client(
         settings.supabase_url,
         settings.supabase_key
     )
@@ -31,7 +46,7 @@ def get_supabase_client() -> Optional[Client]:
     return _supabase_client
 
 
-def get_supabase_admin_client() -> Optional[Client]:
+def get_supabase_admin_client() -> Optional["Client"]:
     """
     Get a Supabase client with admin privileges (service role key).
     Use this for server-side operations that bypass RLS policies.
@@ -40,7 +55,7 @@ def get_supabase_admin_client() -> Optional[Client]:
     if not settings.supabase_url or not settings.supabase_service_role_key:
         return None
 
-    return create_client(
+    return _create_client(
         settings.supabase_url,
         settings.supabase_service_role_key
     )
@@ -1,4 +1,11 @@
+import base64
+import json
 from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+import orjson
+from fastapi import Response
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Row
 from app.config import BRASILIA_TZ
 
 
@@ -39,3 +46,79 @@ def get_time_of_day_from_hour(hour: int) -> str:
         return "evening"
     else:  # 0 <= hour < 5
         return "dawn"
+
+
+def encode_cursor(sort_value: datetime, row_id: str) -> str:
+    """
+    Builds an opaque keyset pagination cursor from the last row of a page.
+
+    The cursor is the URL-safe base64 of the (timestamp, id) pair the next
+    page starts after; clients must treat it as an opaque string.
+    """
+    payload = json.dumps([sort_value.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Reverses encode_cursor.
+
+    Raises:
+        ValueError: if the cursor was not produced by encode_cursor
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(sort_value), str(row_id)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def validate_batch_items(items: List[Dict[str, Any]], schema: Type[BaseModel]):
+    """
+    Validates each raw batch item against schema independently.
+
+    Returns:
+        (valid, errors): valid is a list of (index, model) pairs and errors a
+        list of (index, message) pairs, both in request order
+    """
+    valid = []
+    errors = []
+    for index, raw_item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(raw_item)))
+        except ValidationError as exc:
+            message = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in exc.errors()
+            )
+            errors.append((index, message))
+    return valid, errors
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel], always: Sequence[str] = ("id",)) -> Optional[List[str]]:
+    """
+    Parse a `fields=a,b,c` sparse fieldset against the response schema.
+    Returns the selected fields in schema order (plus `always`), or None when
+    no fieldset was requested. Raises ValueError on unknown fields.
+    """
+    if not fields:
+        return None
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(schema.model_fields)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    requested.update(always)
+    return [name for name in schema.model_fields if name in requested]
+
+
+def rows_response(rows: Sequence[Row], response: Response) -> Response:
+    """
+    Serialize Core rows (lean list reads) straight to JSON bytes with orjson,
+    skipping the response_model validation. Keeps the headers already set on
+    the route's injected `response`.
+    """
+    content = orjson.dumps([row._asdict() for row in rows], option=orjson.OPT_UTC_Z)
+    return Response(content=content, media_type="application/json", headers=response.headers)
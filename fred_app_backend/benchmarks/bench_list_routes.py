@@ -0,0 +1,110 @@
+"""
+CPU per request of the glucose, mood and walk list routes, ORM + response_model
+versus the lean read path (Core rows + orjson, settings.lean_reads).
+
+Runs in-process against the database in DATABASE_URL (already migrated) with
+a throwaway pet that is removed at the end:
+    python -m benchmarks.bench_list_routes [--rows 200] [--limit 30] [--requests 300]
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+# Every request must reach the handler, and no background job should compete for CPU
+os.environ["RESPONSE_CACHE_SIZE"] = "0"
+os.environ["DAILY_TASKS_SCHEDULER"] = "false"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import delete  # noqa: E402
+
+from app import crud, models, schemas  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+
+ROUTES = ("/glucose-readings", "/mood-entries", "/walk-entries")
+
+
+def seed(rows: int) -> str:
+    db = SessionLocal()
+    try:
+        pet = crud.create_pet(db, schemas.PetCreate(name="benchmark"))
+        start = datetime(2026, 1, 1, 7, 0)
+        crud.create_glucose_readings(db, [
+            schemas.GlucoseReadingCreate(value=90 + i % 200, insulin_dose=2.5, notes="pós refeição")
+            for i in range(rows)
+        ], pet.id)
+        for i in range(rows):
+            crud.create_mood_entry(db, schemas.MoodEntryCreate(
+                energy_level="media", general_mood=["calmo", "brincalhão"], appetite="normal", walk="curto",
+                notes="ok",
+            ), pet.id)
+        crud.create_walk_entries(db, [
+            schemas.WalkEntryCreate(
+                start_time=start + timedelta(hours=i),
+                end_time=start + timedelta(hours=i, minutes=25),
+                pause_events=[{"started_at": start + timedelta(hours=i, minutes=10),
+                               "ended_at": start + timedelta(hours=i, minutes=12)}],
+                energy_level="moderate", behavior=["curious", "calm"], completed_route=True,
+                pee_count="2x", poop_made=True, poop_consistency="normal",
+                weather="sunny", temperature_celsius=24.5, route_distance_km=1.8,
+                notes="passeio no parque", alerts=[],
+            )
+            for i in range(rows)
+        ], pet.id)
+        return pet.id
+    finally:
+        db.close()
+
+
+def cleanup(pet_id: str):
+    db = SessionLocal()
+    try:
+        for model in (models.GlucoseDailyStat, models.GlucoseReading, models.MoodEntry,
+                      models.WalkDailyStat, models.WalkEntry):
+            db.execute(delete(model).where(model.pet_id == pet_id))
+        db.execute(delete(models.Pet).where(models.Pet.id == pet_id))
+        db.commit()
+    finally:
+        db.close()
+
+
+def measure(client: TestClient, url: str, requests: int):
+    """Returns (CPU ms, wall ms) per request."""
+    for _ in range(min(20, requests)):  # warm up pool, statement caches, serializers
+        client.get(url).raise_for_status()
+
+    cpu, wall = time.process_time(), time.perf_counter()
+    for _ in range(requests):
+        client.get(url)
+    cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+    return cpu * 1000 / requests, wall * 1000 / requests
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the lean read path of the list routes")
+    parser.add_argument("--rows", type=int, default=200, help="Rows seeded per table")
+    parser.add_argument("--limit", type=int, default=30, help="Page size requested")
+    parser.add_argument("--requests", type=int, default=300, help="Measured requests per route and mode")
+    args = parser.parse_args(argv)
+
+    pet_id = seed(args.rows)
+    try:
+        with TestClient(app) as client:
+            print(f"{'route':<20}{'orm cpu ms':>12}{'lean cpu ms':>13}{'cpu drop':>10}{'orm wall ms':>13}{'lean wall ms':>14}")
+            for route in ROUTES:
+                url = f"{route}?pet_id={pet_id}&limit={args.limit}"
+                results = {}
+                for lean in (False, True):
+                    settings.lean_reads = lean
+                    results[lean] = measure(client, url, args.requests)
+                (orm_cpu, orm_wall), (lean_cpu, lean_wall) = results[False], results[True]
+                drop = (1 - lean_cpu / orm_cpu) * 100 if orm_cpu else 0.0
+                print(f"{route:<20}{orm_cpu:>12.3f}{lean_cpu:>13.3f}{drop:>9.1f}%{orm_wall:>13.3f}{lean_wall:>14.3f}")
+    finally:
+        cleanup(pet_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Round-trip budgets of the main routes: fails (exit 1) when a route issues
+more SQL statements than listed in BUDGETS, or repeats one (N+1).
+
+Runs in-process with QUERY_TRACE on, against the database in DATABASE_URL
+(already migrated), with a throwaway pet that is removed at the end:
+    python -m benchmarks.check_query_budgets
+
+Lower a budget when a change saves a round trip; raising one should be a
+deliberate, reviewed decision.
+"""
+import os
+import sys
+from datetime import date
+
+os.environ["QUERY_TRACE"] = "true"
+os.environ["QUERY_BUDGET_ACTION"] = "raise"
+# Every request must reach the handler, and no background job should issue statements
+os.environ["RESPONSE_CACHE_SIZE"] = "0"
+os.environ["DAILY_TASKS_SCHEDULER"] = "false"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import delete  # noqa: E402
+
+from app import crud, models, schemas  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.query_trace import QueryBudgetExceeded  # noqa: E402
+
+# "METHOD /route/template" -> max statements. Writes include the rollup
+# refresh (advisory lock + stale DELETE + upsert) and the change feed NOTIFY.
+BUDGETS = {
+    "GET /pets/{pet_id}": 1,
+    "GET /pets/{pet_id}/dashboard": 7,
+    "POST /routine-items/ensure-daily": 3,
+    "GET /routine-items": 1,
+    "POST /glucose-readings": 5,
+    "POST /glucose-readings/batch": 6,
+    "PATCH /glucose-readings/{glucose_reading_id}": 2,
+    "GET /glucose-readings": 1,
+    "GET /glucose-readings/stats": 1,
+    "POST /mood-entries": 2,
+    "GET /mood-entries": 1,
+    "POST /walk-entries": 5,
+    "POST /walk-entries/batch": 6,
+    "GET /walk-entries": 1,
+    "GET /walk-entries/summary": 1,
+    "DELETE /walk-entries/{walk_entry_id}": 5,
+}
+
+WALK = {
+    "start_time": "2026-01-01T07:00:00-03:00",
+    "end_time": "2026-01-01T07:25:00-03:00",
+    "energy_level": "moderate",
+    "pee_count": "2x",
+    "poop_made": True,
+    "route_distance_km": 1.8,
+}
+
+
+def seed() -> str:
+    db = SessionLocal()
+    try:
+        pet = crud.create_pet(db, schemas.PetCreate(name="query budgets"))
+        crud.create_routine_template(db, schemas.RoutineTemplateCreate(period="morning", task="Insulina"), pet.id)
+        return pet.id
+    finally:
+        db.close()
+
+
+def cleanup(pet_id: str):
+    db = SessionLocal()
+    try:
+        for model in (models.RoutineItem, models.RoutineTemplate, models.GlucoseDailyStat, models.GlucoseReading,
+                      models.MoodEntry, models.WalkDailyStat, models.WalkEntry):
+            db.execute(delete(model).where(model.pet_id == pet_id))
+        db.execute(delete(models.Pet).where(models.Pet.id == pet_id))
+        db.commit()
+    finally:
+        db.close()
+
+
+def steps(pet_id: str):
+    """(route, request) for every budgeted route, in an order where each one has data to work on.
+    A request gets the client and the ids created by the previous steps."""
+    today = date.today().isoformat()
+    query = {"pet_id": pet_id}
+    mood = {"energy_level": "media", "general_mood": ["calmo"], "appetite": "normal", "walk": "curto"}
+
+    return [
+        ("POST /routine-items/ensure-daily",
+         lambda client, ids: client.post("/routine-items/ensure-daily", params={**query, "date": today})),
+        ("GET /pets/{pet_id}/dashboard", lambda client, ids: client.get(f"/pets/{pet_id}/dashboard")),
+        ("GET /pets/{pet_id}", lambda client, ids: client.get(f"/pets/{pet_id}")),
+        ("GET /routine-items", lambda client, ids: client.get("/routine-items", params=query)),
+        ("POST /glucose-readings",
+         lambda client, ids: client.post("/glucose-readings", params=query, json={"value": 180, "insulin_dose": 2.5})),
+        ("POST /glucose-readings/batch",
+         lambda client, ids: client.post(
+             "/glucose-readings/batch", params=query, json={"items": [{"value": 90 + i} for i in range(10)]}
+         )),
+        ("PATCH /glucose-readings/{glucose_reading_id}",
+         lambda client, ids: client.patch(
+             f"/glucose-readings/{ids['POST /glucose-readings']}", json={"notes": "pós refeição"}
+         )),
+        ("GET /glucose-readings", lambda client, ids: client.get("/glucose-readings", params=query)),
+        ("GET /glucose-readings/stats", lambda client, ids: client.get("/glucose-readings/stats", params=query)),
+        ("POST /mood-entries", lambda client, ids: client.post("/mood-entries", params=query, json=mood)),
+        ("GET /mood-entries", lambda client, ids: client.get("/mood-entries", params=query)),
+        ("POST /walk-entries", lambda client, ids: client.post("/walk-entries", params=query, json=WALK)),
+        ("POST /walk-entries/batch",
+         lambda client, ids: client.post("/walk-entries/batch", params=query, json={"items": [WALK] * 10})),
+        ("GET /walk-entries", lambda client, ids: client.get("/walk-entries", params=query)),
+        ("GET /walk-entries/summary", lambda client, ids: client.get("/walk-entries/summary", params=query)),
+        ("DELETE /walk-entries/{walk_entry_id}",
+         lambda client, ids: client.delete(f"/walk-entries/{ids['POST /walk-entries']}")),
+    ]
+
+
+def main() -> int:
+    settings.query_budgets = BUDGETS
+    pet_id = seed()
+    failures = 0
+    try:
+        with TestClient(app) as client:
+            ids = {}
+            print(f"{'route':<48}{'statements':>11}{'budget':>8}")
+            for route, request in steps(pet_id):
+                try:
+                    response = request(client, ids)
+                except QueryBudgetExceeded as exc:
+                    failures += 1
+                    print(f"FAIL {exc}\n")
+                    continue
+                except KeyError:
+                    print(f"{route:<48}{'skipped (setup step failed)':>19}")
+                    continue
+
+                response.raise_for_status()
+                if route.startswith("POST") and "id" in response.json():
+                    ids[route] = response.json()["id"]
+                print(f"{route:<48}{response.headers['x-db-queries']:>11}{BUDGETS[route]:>8}")
+    finally:
+        cleanup(pet_id)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+Concurrent writes to the same pet and day must not lose rollup updates:
+fails (exit 1) when glucose_daily_stats / walk_daily_stats differ from a
+fresh aggregate of the raw rows after overlapping writes.
+
+Runs against the database in DATABASE_URL (already migrated), with a
+throwaway pet that is removed at the end:
+    python -m benchmarks.check_rollup_concurrency [--writers 8] [--writes 10]
+
+Two phases per rollup: a deterministic overlap (a write left uncommitted
+while a second writer of the same day runs and commits), then a burst of
+concurrent writers on the same day.
+"""
+import argparse
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+os.environ["DAILY_TASKS_SCHEDULER"] = "false"
+
+from sqlalchemy import delete, select  # noqa: E402
+
+from app import crud, models, schemas  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.utils import now_brasilia  # noqa: E402
+
+# How long the second writer gets to (wrongly) finish while the first is uncommitted
+OVERLAP_SECONDS = 1.0
+
+
+def glucose_writer(pet_id: str, when: datetime, n: int):
+    reading = schemas.GlucoseReadingCreate(value=100 + n, measured_at=when + timedelta(seconds=n))
+
+    def write(db, commit: bool = True):
+        if commit:
+            return crud.create_glucose_reading(db, reading, pet_id)
+        row = crud._insert_for_pet_returning(
+            db, models.GlucoseReading, crud._glucose_reading_values(reading, pet_id), commit=False
+        )
+        crud.refresh_glucose_daily_stats(db, pet_id=pet_id, dates=[row.date])
+
+    return write
+
+
+def walk_writer(pet_id: str, when: datetime, n: int):
+    start = when + timedelta(minutes=n)
+    walk = schemas.WalkEntryCreate(start_time=start, end_time=start + timedelta(minutes=20 + n))
+
+    def write(db, commit: bool = True):
+        if commit:
+            return crud.create_walk_entry(db, walk, pet_id)
+        row = crud._insert_for_pet_returning(
+            db, models.WalkEntry, crud._walk_entry_values(walk, pet_id), commit=False
+        )
+        crud.refresh_walk_daily_stats(db, pet_id=pet_id, dates=[row.date])
+
+    return write
+
+
+# name -> (rollup model, aggregate of the raw rows, writer factory)
+ROLLUPS = {
+    "glucose_daily_stats": (models.GlucoseDailyStat, crud._glucose_daily_stats_source, glucose_writer),
+    "walk_daily_stats": (models.WalkDailyStat, crud._walk_daily_stats_source, walk_writer),
+}
+
+
+def run(write, commit: bool = True):
+    db = SessionLocal()
+    try:
+        write(db, commit)
+    finally:
+        db.close()
+
+
+def overlap(first, second):
+    """first writes and refreshes without committing; second runs meanwhile; then first commits."""
+    db = SessionLocal()
+    try:
+        first(db, commit=False)
+        other = threading.Thread(target=run, args=(second,))
+        other.start()
+        other.join(OVERLAP_SECONDS)
+        db.commit()
+        other.join()
+    finally:
+        db.close()
+
+
+def drift(pet_id: str, stats_model, source) -> list:
+    """Rollup rows of pet_id that differ from the aggregate of the raw rows (updated_at aside)."""
+    columns = list(stats_model.__table__.c)
+    compared = [index for index, column in enumerate(columns) if column.name != "updated_at"]
+
+    def rows(statement):
+        return {tuple(row[index] for index in compared) for row in db.execute(statement)}
+
+    db = SessionLocal()
+    try:
+        stored = rows(select(*columns).where(stats_model.pet_id == pet_id))
+        expected = rows(source(pet_id))
+    finally:
+        db.close()
+    return sorted(stored ^ expected, key=str)
+
+
+def cleanup(pet_id: str):
+    db = SessionLocal()
+    try:
+        for model in (models.GlucoseDailyStat, models.GlucoseReading, models.WalkDailyStat, models.WalkEntry):
+            db.execute(delete(model).where(model.pet_id == pet_id))
+        db.execute(delete(models.Pet).where(models.Pet.id == pet_id))
+        db.commit()
+    finally:
+        db.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check the daily rollups under concurrent writes")
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=10, help="Writes per writer in the burst")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        pet_id = crud.create_pet(db, schemas.PetCreate(name="rollup concurrency")).id
+    finally:
+        db.close()
+
+    # Midday, so every write lands on the same day in Brasília time
+    when = now_brasilia().replace(hour=12, minute=0, second=0, microsecond=0)
+    failures = 0
+    try:
+        for name, (stats_model, source, writer) in ROLLUPS.items():
+            overlap(writer(pet_id, when, 0), writer(pet_id, when, 1))
+
+            writes = [writer(pet_id, when, 2 + n) for n in range(args.writers * args.writes)]
+            with ThreadPoolExecutor(max_workers=args.writers) as pool:
+                list(pool.map(run, writes))
+
+            differences = drift(pet_id, stats_model, source)
+            print(f"{name:<24}{'OK' if not differences else 'FAIL'}")
+            for row in differences:
+                print(f"    {row}")
+            failures += bool(differences)
+    finally:
+        cleanup(pet_id)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
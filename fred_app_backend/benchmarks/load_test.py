@@ -0,0 +1,520 @@
+"""
+Load test: virtual users replay the frontend's session on the synthetic pets
+of benchmarks.synthetic_history. A session loads the pet list and the
+dashboard (loadPetData), then performs a weighted mix of the app's everyday
+actions covering every route in app/routers/. Reads page through the history
+and writes create rows. At the end of the session those rows are deleted
+again, so repeated runs see the same volumes. The SSE feed
+(GET /pets/{pet_id}/events) is not measured: a stream has no response time.
+
+    python -m benchmarks.synthetic_history --pets 1000 --years 3
+    python -m benchmarks.load_test [--users 20] [--duration 60] [--warmup 10] [--seed 42]
+        [--base-url http://localhost:8000] [--output report.json] [--compare baseline.json]
+
+Without --base-url the app runs in-process with QUERY_TRACE on, against
+DATABASE_URL. A remote server reports queries per request only if it runs
+with QUERY_TRACE=true. Reported per route and in total: p50/p95/p99 latency,
+throughput, errors and queries per request. --output writes the same
+numbers as JSON, with the commit and the run parameters, sorted so that two
+reports diff cleanly. --compare prints the change against an older report.
+Needs httpx, like the TestClient-based benchmarks.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+PET_PREFIX = "synthetic-"
+
+# Session shape: actions after loadPetData, and their weights
+ACTIONS_PER_SESSION = (3, 8)
+THINK_TIME_SECONDS = (0.0, 0.2)
+
+
+class RouteStats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.queries: List[int] = []
+        self.errors = 0
+
+
+class Recorder:
+    """Latency, status and X-DB-Queries of every request made while recording."""
+
+    def __init__(self):
+        self.routes: Dict[str, RouteStats] = {}
+        self.recording = False
+        self.started = 0.0
+        self.stopped = 0.0
+
+    def start(self):
+        self.routes.clear()
+        self.recording = True
+        self.started = time.perf_counter()
+
+    def stop(self):
+        self.recording = False
+        self.stopped = time.perf_counter()
+
+    def add(self, route: str, seconds: float, status: int, queries: Optional[str]):
+        if not self.recording:
+            return
+        stats = self.routes.setdefault(route, RouteStats())
+        stats.latencies.append(seconds)
+        if status >= 400:
+            stats.errors += 1
+        if queries is not None:
+            stats.queries.append(int(queries))
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, rng: random.Random, pet_ids: List[str]):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.pet_ids = pet_ids
+        # (route, url) deletes that undo this session's writes, run last-in first-out
+        self.undo: List[tuple] = []
+
+    async def request(self, route: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            await response.aread()
+        except httpx.HTTPError:
+            self.recorder.add(route, time.perf_counter() - start, 599, None)
+            return None
+        self.recorder.add(route, time.perf_counter() - start, response.status_code, response.headers.get("x-db-queries"))
+        return response if response.is_success else None
+
+    async def think(self):
+        await asyncio.sleep(self.rng.uniform(*THINK_TIME_SECONDS))
+
+    async def session(self):
+        # initializeApp: the pet list (twice, loadPets + getPets), then loadPetData
+        await self.request("GET /pets", "GET", "/pets")
+        await self.request("GET /pets", "GET", "/pets")
+        pet_id = self.rng.choice(self.pet_ids)
+        response = await self.request("GET /pets/{pet_id}/dashboard", "GET", f"/pets/{pet_id}/dashboard")
+        dashboard = response.json() if response is not None else {}
+
+        try:
+            for _ in range(self.rng.randint(*ACTIONS_PER_SESSION)):
+                await self.think()
+                action = self.rng.choices(ACTIONS, weights=[weight for _, weight in ACTIONS])[0][0]
+                await action(self, pet_id, dashboard)
+        finally:
+            for route, url in reversed(self.undo):
+                await self.request(route, "DELETE", url)
+            self.undo.clear()
+
+
+# Payloads
+
+def _glucose(rng: random.Random) -> dict:
+    return {"value": round(min(600, max(40, rng.gauss(200, 70)))), "insulin_dose": rng.choice([None, 2.5, 3, 4.5])}
+
+
+def _walk(rng: random.Random, photo_id: Optional[str] = None) -> dict:
+    start = datetime.now(timezone.utc) - timedelta(minutes=rng.randint(30, 600))
+    return {
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(minutes=rng.randint(10, 50))).isoformat(),
+        "energy_level": rng.choice(["low", "moderate", "high"]),
+        "behavior": rng.sample(["curious", "calm", "pulling", "sniffing"], 2),
+        "pee_count": rng.choice(["1x", "2x", "3x-plus"]),
+        "poop_made": rng.random() < 0.5,
+        "route_distance_km": round(rng.uniform(0.5, 3), 2),
+        "photos": [photo_id] if photo_id else None,
+    }
+
+
+def _png() -> bytes:
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (640, 480), (90, 140, 60)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _import_csv(days: int = 20) -> bytes:
+    # Fixed timestamps: after the first run every row is a duplicate, so volumes stay put
+    lines = ["value,measured_at,insulin_dose"]
+    for day in range(days):
+        lines.append(f"{100 + day * 7},2020-01-{day + 1:02d}T07:00:00-03:00,3")
+    return "\n".join(lines).encode()
+
+
+# Actions: coroutine(user, pet_id, dashboard)
+
+async def toggle_routine_item(user: VirtualUser, pet_id: str, dashboard: dict):
+    items = dashboard.get("routine_items") or []
+    if not items:
+        return
+    item = user.rng.choice(items)
+    item["completed"] = not item["completed"]
+    await user.request(
+        "PATCH /routine-items/{routine_item_id}", "PATCH", f"/routine-items/{item['id']}",
+        json={"completed": item["completed"], "completed_at": datetime.now(timezone.utc).isoformat()},
+    )
+
+
+async def routine_screen(user: VirtualUser, pet_id: str, dashboard: dict):
+    query = {"pet_id": pet_id, "date": date.today().isoformat()}
+    await user.request("POST /routine-items/ensure-daily", "POST", "/routine-items/ensure-daily", params=query)
+    await user.request("GET /routine-items", "GET", "/routine-items", params=query)
+    await user.request("GET /routine-templates", "GET", "/routine-templates", params={"pet_id": pet_id})
+
+
+async def manage_routine(user: VirtualUser, pet_id: str, dashboard: dict):
+    query = {"pet_id": pet_id}
+    response = await user.request(
+        "POST /routine-templates", "POST", "/routine-templates", params=query,
+        json={"period": "afternoon", "task": "Carga de teste"},
+    )
+    if response is not None:
+        template_id = response.json()["id"]
+        user.undo.append(("DELETE /routine-templates/{template_id}", f"/routine-templates/{template_id}"))
+        await user.request(
+            "PATCH /routine-templates/{template_id}", "PATCH", f"/routine-templates/{template_id}",
+            json={"task": "Carga de teste (editada)"},
+        )
+    response = await user.request(
+        "POST /routine-items", "POST", "/routine-items", params=query,
+        json={"period": "evening", "task": "Tarefa avulsa", "date": date.today().isoformat()},
+    )
+    if response is not None:
+        user.undo.append(("DELETE /routine-items/{routine_item_id}", f"/routine-items/{response.json()['id']}"))
+
+
+async def log_glucose(user: VirtualUser, pet_id: str, dashboard: dict):
+    response = await user.request(
+        "POST /glucose-readings", "POST", "/glucose-readings", params={"pet_id": pet_id}, json=_glucose(user.rng),
+    )
+    if response is None:
+        return
+    reading_id = response.json()["id"]
+    user.undo.append(("DELETE /glucose-readings/{glucose_reading_id}", f"/glucose-readings/{reading_id}"))
+    if user.rng.random() < 0.3:
+        await user.request(
+            "PATCH /glucose-readings/{glucose_reading_id}", "PATCH", f"/glucose-readings/{reading_id}",
+            json={"notes": "corrigido"},
+        )
+
+
+async def sync_glucose_batch(user: VirtualUser, pet_id: str, dashboard: dict):
+    # Offline queue flushed at once
+    response = await user.request(
+        "POST /glucose-readings/batch", "POST", "/glucose-readings/batch", params={"pet_id": pet_id},
+        json={"items": [_glucose(user.rng) for _ in range(user.rng.randint(2, 10))]},
+    )
+    if response is not None:
+        for result in response.json()["results"]:
+            if result["item"]:
+                user.undo.append((
+                    "DELETE /glucose-readings/{glucose_reading_id}", f"/glucose-readings/{result['item']['id']}",
+                ))
+
+
+async def browse_glucose(user: VirtualUser, pet_id: str, dashboard: dict):
+    query = {"pet_id": pet_id, "limit": 30}
+    response = await user.request("GET /glucose-readings", "GET", "/glucose-readings", params=query)
+    for _ in range(user.rng.randint(0, 3)):  # scrolling back through the history
+        if response is None or "x-next-cursor" not in response.headers:
+            break
+        response = await user.request(
+            "GET /glucose-readings", "GET", "/glucose-readings",
+            params={**query, "cursor": response.headers["x-next-cursor"]},
+        )
+    await user.request(
+        "GET /glucose-readings/stats", "GET", "/glucose-readings/stats",
+        params={"pet_id": pet_id, "days": user.rng.choice([7, 30, 90, 365])},
+    )
+
+
+async def log_mood(user: VirtualUser, pet_id: str, dashboard: dict):
+    response = await user.request(
+        "POST /mood-entries", "POST", "/mood-entries", params={"pet_id": pet_id},
+        json={
+            "energy_level": user.rng.choice(["alta", "media", "baixa"]),
+            "general_mood": user.rng.sample(["calmo", "brincalhão", "carinhoso", "sonolento"], 2),
+            "appetite": user.rng.choice(["alto", "normal", "baixo"]),
+            "walk": user.rng.choice(["longo", "curto"]),
+        },
+    )
+    if response is not None:
+        user.undo.append(("DELETE /mood-entries/{mood_entry_id}", f"/mood-entries/{response.json()['id']}"))
+
+
+async def browse_mood(user: VirtualUser, pet_id: str, dashboard: dict):
+    await user.request("GET /mood-entries", "GET", "/mood-entries", params={"pet_id": pet_id, "limit": 30})
+
+
+async def log_walk(user: VirtualUser, pet_id: str, dashboard: dict):
+    photo_id = None
+    if user.rng.random() < 0.3:
+        response = await user.request(
+            "POST /photos", "POST", "/photos", files={"file": ("walk.png", PHOTO, "image/png")},
+        )
+        photo_id = response.json()["id"] if response is not None else None
+
+    response = await user.request(
+        "POST /walk-entries", "POST", "/walk-entries", params={"pet_id": pet_id}, json=_walk(user.rng, photo_id),
+    )
+    if response is None:
+        return
+    walk_id = response.json()["id"]
+    user.undo.append(("DELETE /walk-entries/{walk_entry_id}", f"/walk-entries/{walk_id}"))
+    if user.rng.random() < 0.3:
+        await user.request(
+            "PATCH /walk-entries/{walk_entry_id}", "PATCH", f"/walk-entries/{walk_id}",
+            json={"notes": "encontrou outro cachorro"},
+        )
+    if photo_id:
+        params = {"size": "small"} if user.rng.random() < 0.5 else {}
+        await user.request("GET /photos/{photo_id}", "GET", f"/photos/{photo_id}", params=params)
+
+
+async def sync_walk_batch(user: VirtualUser, pet_id: str, dashboard: dict):
+    response = await user.request(
+        "POST /walk-entries/batch", "POST", "/walk-entries/batch", params={"pet_id": pet_id},
+        json={"items": [_walk(user.rng) for _ in range(user.rng.randint(2, 5))]},
+    )
+    if response is not None:
+        for result in response.json()["results"]:
+            if result["item"]:
+                user.undo.append(("DELETE /walk-entries/{walk_entry_id}", f"/walk-entries/{result['item']['id']}"))
+
+
+async def browse_walks(user: VirtualUser, pet_id: str, dashboard: dict):
+    query = {"pet_id": pet_id, "limit": 30}
+    response = await user.request("GET /walk-entries", "GET", "/walk-entries", params=query)
+    if response is not None and "x-next-cursor" in response.headers and user.rng.random() < 0.5:
+        await user.request(
+            "GET /walk-entries", "GET", "/walk-entries", params={**query, "cursor": response.headers["x-next-cursor"]},
+        )
+    await user.request(
+        "GET /walk-entries/summary", "GET", "/walk-entries/summary",
+        params={"pet_id": pet_id, "bucket": user.rng.choice(["week", "month"])},
+    )
+
+
+async def open_pet(user: VirtualUser, pet_id: str, dashboard: dict):
+    await user.request("GET /pets/{pet_id}", "GET", f"/pets/{pet_id}")
+
+
+async def export_history(user: VirtualUser, pet_id: str, dashboard: dict):
+    since = (date.today() - timedelta(days=user.rng.choice([30, 365]))).isoformat()
+    await user.request(
+        "GET /pets/{pet_id}/export", "GET", f"/pets/{pet_id}/export",
+        params={"format": user.rng.choice(["ndjson", "csv"]), "since": since},
+    )
+
+
+async def import_history(user: VirtualUser, pet_id: str, dashboard: dict):
+    await user.request(
+        "POST /pets/{pet_id}/import", "POST", f"/pets/{pet_id}/import",
+        params={"kind": "glucose", "format": "csv"}, content=IMPORT_CSV,
+    )
+
+
+async def add_pet(user: VirtualUser, pet_id: str, dashboard: dict):
+    response = await user.request("POST /pets", "POST", "/pets", json={"name": "Carga de teste", "breed": "SRD"})
+    if response is not None:
+        user.undo.append(("DELETE /pets/{pet_id}", f"/pets/{response.json()['id']}"))
+
+
+ACTIONS = [
+    (toggle_routine_item, 30),
+    (log_glucose, 15),
+    (browse_glucose, 10),
+    (log_walk, 10),
+    (browse_walks, 8),
+    (log_mood, 8),
+    (browse_mood, 5),
+    (routine_screen, 5),
+    (open_pet, 3),
+    (sync_glucose_batch, 2),
+    (sync_walk_batch, 2),
+    (manage_routine, 1),
+    (export_history, 1),
+    (import_history, 1),
+    (add_pet, 1),
+]
+
+PHOTO = _png()
+IMPORT_CSV = _import_csv()
+
+
+# Report
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    # Nearest rank
+    index = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _summary(latencies: List[float], queries: List[int], errors: int, seconds: float) -> dict:
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / seconds, 2),
+        "p50_ms": round(_percentile(values, 50) * 1000, 2),
+        "p95_ms": round(_percentile(values, 95) * 1000, 2),
+        "p99_ms": round(_percentile(values, 99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2),
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+        "queries_max": max(queries) if queries else None,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}-dirty" if dirty else commit
+
+
+def build_report(recorder: Recorder, args, pets: int) -> dict:
+    seconds = recorder.stopped - recorder.started
+    routes = {
+        route: _summary(stats.latencies, stats.queries, stats.errors, seconds)
+        for route, stats in sorted(recorder.routes.items())
+    }
+    everything = list(recorder.routes.values())
+    return {
+        "run": {
+            "commit": _git_commit(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "target": args.base_url or "in-process",
+            "users": args.users,
+            "duration_seconds": args.duration,
+            "warmup_seconds": args.warmup,
+            "seed": args.seed,
+            "pets": pets,
+        },
+        "total": _summary(
+            [latency for stats in everything for latency in stats.latencies],
+            [count for stats in everything for count in stats.queries],
+            sum(stats.errors for stats in everything),
+            seconds,
+        ),
+        "routes": routes,
+    }
+
+
+def print_report(report: dict):
+    print(f"{'route':<48}{'reqs':>7}{'err':>5}{'rps':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'q/req':>7}")
+    rows = [*report["routes"].items(), ("TOTAL", report["total"])]
+    for route, row in rows:
+        queries = "-" if row["queries_per_request"] is None else f"{row['queries_per_request']:.1f}"
+        print(f"{route:<48}{row['requests']:>7}{row['errors']:>5}{row['throughput_rps']:>8.1f}"
+              f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{queries:>7}")
+
+
+def print_comparison(report: dict, baseline: dict):
+    print(f"\nversus {baseline['run'].get('commit')} ({baseline['run'].get('date')}):")
+    print(f"{'route':<48}{'p50':>10}{'p95':>10}{'p99':>10}{'q/req':>8}")
+    rows = [*report["routes"].items(), ("TOTAL", report["total"])]
+    for route, row in rows:
+        old = baseline["total"] if route == "TOTAL" else baseline["routes"].get(route)
+        if old is None:
+            print(f"{route:<48}{'new':>10}")
+            continue
+
+        def change(key):
+            if not old[key]:
+                return "-"
+            return f"{(row[key] - old[key]) / old[key] * 100:+.0f}%"
+
+        queries = "-"
+        if row["queries_per_request"] is not None and old["queries_per_request"] is not None:
+            queries = f"{row['queries_per_request'] - old['queries_per_request']:+.1f}"
+        print(f"{route:<48}{change('p50_ms'):>10}{change('p95_ms'):>10}{change('p99_ms'):>10}{queries:>8}")
+
+
+# Run
+
+def _client(base_url: Optional[str]) -> httpx.AsyncClient:
+    timeout = httpx.Timeout(30.0)
+    if base_url:
+        return httpx.AsyncClient(base_url=base_url, timeout=timeout)
+
+    # In-process: the statement counts come from the SQL tracer
+    os.environ.setdefault("QUERY_TRACE", "true")
+    os.environ.setdefault("DAILY_TASKS_SCHEDULER", "false")
+    import logging
+
+    from app.main import app
+
+    # Budget warnings are check_query_budgets' job; here they would only flood the output
+    logging.getLogger("fred_app.query_trace").setLevel(logging.ERROR)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load-test", timeout=timeout)
+
+
+async def run(args) -> dict:
+    recorder = Recorder()
+    async with _client(args.base_url) as client:
+        response = await client.get("/pets", params={"limit": 100_000})
+        response.raise_for_status()
+        pet_ids = sorted(pet["id"] for pet in response.json() if pet["name"].startswith(PET_PREFIX))
+        if not pet_ids:
+            sys.exit("No synthetic pets found; seed them first with python -m benchmarks.synthetic_history")
+
+        deadline = time.perf_counter() + args.warmup + args.duration
+
+        async def user_loop(number: int):
+            user = VirtualUser(client, recorder, random.Random(args.seed * 1000 + number), pet_ids)
+            while time.perf_counter() < deadline:
+                await user.session()
+
+        async def measure():
+            await asyncio.sleep(args.warmup)
+            recorder.start()
+            await asyncio.sleep(args.duration)
+            recorder.stop()
+
+        await asyncio.gather(measure(), *(user_loop(number) for number in range(args.users)))
+
+    return build_report(recorder, args, len(pet_ids))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Replay the app's sessions and report latency percentiles")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=10, help="Unmeasured seconds before")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--base-url", default=None, help="Server to load (default: the app in-process)")
+    parser.add_argument("--output", default=None, help="Write the JSON report here")
+    parser.add_argument("--compare", default=None, help="Earlier JSON report to compare with")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+            output.write("\n")
+    if args.compare:
+        with open(args.compare) as baseline:
+            print_comparison(report, json.load(baseline))
+
+    return 1 if report["total"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
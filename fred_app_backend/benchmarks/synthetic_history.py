@@ -0,0 +1,215 @@
+"""
+Synthetic history generator: seeds the database in DATABASE_URL (already
+migrated) with pets named "synthetic-NNNN" and years of glucose readings,
+mood entries, routine items and walks, loaded with COPY one pet at a time.
+The daily rollups are rebuilt at the end. Same --seed, same data.
+
+    python -m benchmarks.synthetic_history [--pets 1000] [--years 3] [--seed 42] [--reset]
+
+Shapes (per pet, per day) roughly follow a diabetic senior dog's log:
+- glucose: before the two insulin doses, plus a 2-hourly curve every ~2 weeks;
+  values log-normal around a per-pet mean (120-280 mg/dL), 40-600 clipped
+- mood: most days, energy and appetite correlated with the day's glucose
+- routine items: 3-6 templates, ~92% completed
+- walks: 1-3 a day, log-normal duration around 25 min, elimination fields
+"""
+import argparse
+import math
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import delete, select
+
+from app import crud, models
+from app.config import BRASILIA_TZ
+from app.database import SessionLocal
+from app.utils import get_time_of_day_from_hour
+
+PET_PREFIX = "synthetic-"
+
+BREEDS = ["Golden Retriever", "Poodle", "Schnauzer", "Beagle", "Labrador", "SRD", "Dachshund", "Yorkshire"]
+TASKS = {
+    "morning": ["Insulina manhã", "Ração manhã", "Medir glicemia manhã", "Passeio manhã"],
+    "afternoon": ["Água fresca", "Petisco", "Escovar pelos"],
+    "evening": ["Insulina noite", "Ração noite", "Medir glicemia noite", "Passeio noite"],
+}
+MOODS = ["calmo", "brincalhão", "carinhoso", "ansioso", "sonolento", "agitado", "quieto"]
+BEHAVIORS = ["curious", "calm", "pulling", "sniffing", "social", "reactive", "tired"]
+WEATHER = ["sunny", "cloudy", "rainy", "hot", "cold"]
+ENERGY_LEVELS = ["very-low", "low", "moderate", "high", "very-high"]
+
+
+def _at(day: date, hour: float) -> datetime:
+    naive = datetime.combine(day, datetime.min.time()) + timedelta(hours=hour)
+    return BRASILIA_TZ.localize(naive)
+
+
+def _row_id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _glucose_rows(rng: random.Random, pet_id: str, days: List[date], mean: float) -> List[dict]:
+    rows = []
+    for day in days:
+        hours = [7 + rng.gauss(0, 0.5), 19 + rng.gauss(0, 0.5)]
+        if rng.random() < 1 / 14:  # glucose curve day
+            hours += [9, 11, 13, 15, 17]
+        for hour in hours:
+            measured_at = _at(day, max(0.0, min(hour, 23.9)))
+            value = min(600.0, max(40.0, rng.lognormvariate(math.log(mean), 0.35)))
+            dose = round(rng.uniform(2, 8) * 2) / 2 if hour in hours[:2] else None
+            rows.append(dict(
+                id=_row_id(rng), pet_id=pet_id, value=round(value), time_of_day=get_time_of_day_from_hour(measured_at.hour),
+                protocol=rng.choice([None, "jejum", "pós refeição"]), notes=None,
+                date=day, insulin_dose=dose, created_at=measured_at,
+            ))
+    return rows
+
+
+def _mood_rows(rng: random.Random, pet_id: str, days: List[date], glucose_by_day: Dict[date, float]) -> List[dict]:
+    rows = []
+    for day in days:
+        if rng.random() > 0.75:
+            continue
+        high = glucose_by_day.get(day, 0) > 250
+        rows.append(dict(
+            id=_row_id(rng), pet_id=pet_id,
+            energy_level=rng.choices(["alta", "media", "baixa"], [1, 4, 3 if high else 1])[0],
+            general_mood=rng.sample(MOODS, rng.randint(1, 3)),
+            appetite=rng.choices(["alto", "normal", "baixo", "nao-comeu"], [2, 10, 3 if high else 1, 0.3])[0],
+            walk=rng.choices(["longo", "curto", "nao-passeou"], [3, 6, 1])[0],
+            notes=rng.choice([None, None, None, "dormiu bem", "vomitou uma vez"]),
+            date=day, created_at=_at(day, 20 + rng.random() * 3),
+        ))
+    return rows
+
+
+def _routine_rows(rng: random.Random, pet_id: str, days: List[date], templates: List[dict]) -> List[dict]:
+    rows = []
+    for day in days:
+        for template in templates:
+            completed = rng.random() < 0.92
+            hour = {"morning": 8, "afternoon": 14, "evening": 20}[template["period"]]
+            rows.append(dict(
+                id=_row_id(rng), pet_id=pet_id, template_id=template["id"], period=template["period"],
+                task=template["task"], completed=completed,
+                completed_at=_at(day, hour + rng.random() * 2) if completed else None,
+                date=day, created_at=_at(day, 0),
+            ))
+    return rows
+
+
+def _walk_rows(rng: random.Random, pet_id: str, days: List[date]) -> List[dict]:
+    rows = []
+    for day in days:
+        for hour in sorted(rng.sample([7, 12, 18, 21], rng.choices([1, 2, 3], [2, 5, 3])[0])):
+            start = _at(day, hour + rng.random())
+            duration = int(min(7200, max(300, rng.lognormvariate(math.log(25 * 60), 0.4))))
+            poop_made = rng.random() < 0.55
+            rows.append(dict(
+                id=_row_id(rng), pet_id=pet_id, date=day, start_time=start,
+                end_time=start + timedelta(seconds=duration), duration_seconds=duration,
+                pause_events=None, energy_level=rng.choices(ENERGY_LEVELS, [1, 3, 6, 3, 1])[0],
+                behavior=rng.sample(BEHAVIORS, rng.randint(0, 3)), completed_route=rng.random() < 0.9,
+                pee_count=rng.choices(["none", "1x", "2x", "3x-plus"], [1, 5, 3, 1])[0],
+                pee_volume=rng.choice(["low", "normal", "high"]), pee_color=rng.choices(["normal", "dark", "blood"], [30, 3, 0.2])[0],
+                poop_made=poop_made,
+                poop_consistency=rng.choices(["hard", "normal", "soft", "diarrhea"], [1, 8, 2, 0.5])[0] if poop_made else None,
+                poop_blood=False if poop_made else None, poop_mucus=False if poop_made else None,
+                poop_color="brown" if poop_made else None, photos=None,
+                weather=rng.choice(WEATHER), temperature_celsius=round(rng.gauss(24, 5), 1),
+                route_distance_km=round(duration / 3600 * rng.uniform(2.5, 4.5), 2),
+                route_description=None, mobility_notes=None, disorientation=rng.random() < 0.03,
+                excessive_panting=rng.random() < 0.08, cough=rng.random() < 0.02,
+                notes=None, alerts=[], created_at=start,
+            ))
+    return rows
+
+
+def seed_pet(db, rng: random.Random, number: int, days: List[date]) -> Dict[str, int]:
+    pet_id = _row_id(rng)
+    created_at = _at(days[0], 0)
+    crud._copy_rows(db, models.Pet.__table__, [dict(
+        id=pet_id, name=f"{PET_PREFIX}{number:04d}", breed=rng.choice(BREEDS), age=rng.randint(6, 15),
+        created_at=created_at, updated_at=None,
+    )])
+
+    templates = [
+        dict(id=_row_id(rng), pet_id=pet_id, period=period, task=task, is_active=True, created_at=created_at)
+        for period, tasks in TASKS.items()
+        for task in rng.sample(tasks, rng.randint(1, 2))
+    ]
+    crud._copy_rows(db, models.RoutineTemplate.__table__, templates)
+
+    glucose = _glucose_rows(rng, pet_id, days, mean=rng.uniform(120, 280))
+    daily_max: Dict[date, float] = {}
+    for row in glucose:
+        daily_max[row["date"]] = max(daily_max.get(row["date"], 0), row["value"])
+
+    tables = {
+        models.GlucoseReading: glucose,
+        models.MoodEntry: _mood_rows(rng, pet_id, days, daily_max),
+        models.RoutineItem: _routine_rows(rng, pet_id, days, templates),
+        models.WalkEntry: _walk_rows(rng, pet_id, days),
+    }
+    for model, rows in tables.items():
+        crud._copy_rows(db, model.__table__, rows)
+    db.commit()
+    return {model.__tablename__: len(rows) for model, rows in tables.items()}
+
+
+def reset():
+    """Remove every synthetic pet and its history."""
+    db = SessionLocal()
+    try:
+        pet_ids = select(models.Pet.id).where(models.Pet.name.startswith(PET_PREFIX))
+        for model in (models.RoutineItem, models.RoutineTemplate, models.GlucoseDailyStat, models.GlucoseReading,
+                      models.MoodEntry, models.WalkDailyStat, models.WalkEntry):
+            db.execute(delete(model).where(model.pet_id.in_(pet_ids)))
+        db.execute(delete(models.Pet).where(models.Pet.name.startswith(PET_PREFIX)))
+        db.commit()
+    finally:
+        db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed synthetic pets with years of history")
+    parser.add_argument("--pets", type=int, default=1000)
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="Last day (default: today)")
+    parser.add_argument("--reset", action="store_true", help="Remove the synthetic pets first")
+    args = parser.parse_args(argv)
+
+    if args.reset:
+        reset()
+
+    end = args.end_date or date.today()
+    days = [end - timedelta(days=offset) for offset in range(int(args.years * 365) - 1, -1, -1)]
+    rng = random.Random(args.seed)
+    totals: Dict[str, int] = {}
+    started = time.perf_counter()
+
+    db = SessionLocal()
+    try:
+        for number in range(args.pets):
+            for table, count in seed_pet(db, rng, number, days).items():
+                totals[table] = totals.get(table, 0) + count
+            if (number + 1) % 50 == 0 or number + 1 == args.pets:
+                print(f"{number + 1}/{args.pets} pets, {sum(totals.values())} rows, {time.perf_counter() - started:.0f}s")
+
+        # One set-based rebuild instead of per-write maintenance
+        crud.refresh_glucose_daily_stats(db)
+        crud.refresh_walk_daily_stats(db)
+        db.commit()
+    finally:
+        db.close()
+
+    print({"pets": args.pets, **totals, "seconds": round(time.perf_counter() - started, 1)})
+
+
+if __name__ == "__main__":
+    main()
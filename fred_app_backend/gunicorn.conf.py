@@ -0,0 +1,60 @@
+"""
+Production server: gunicorn managing uvicorn workers.
+    gunicorn -c gunicorn.conf.py app.main:app      (or: python run.py --prod)
+
+- WEB_CONCURRENCY workers (default: one per CPU core), each with its own
+  event loop and database pool, sized from DB_MAX_CONNECTIONS (see
+  app.database.pool_limits).
+- preload_app: the app is imported once in the master and forked, so workers
+  start in milliseconds and share the imported code pages. Importing opens
+  no connection (engines are created on first use), so no socket is shared
+  across the fork.
+- Workers are recycled after WORKER_MAX_REQUESTS requests (with jitter, so
+  they do not all restart at once) to bound memory growth.
+- Graceful: on SIGTERM or a recycle, a worker stops accepting connections
+  and gets WORKER_GRACEFUL_TIMEOUT seconds to finish the requests in flight
+  (SSE clients reconnect by themselves). `kill -HUP <master>` replaces the
+  workers one by one with the preloaded code; a deploy of new code restarts
+  the container (or sends USR2 + QUIT to the old master).
+- Metrics: every worker writes its Prometheus values to
+  PROMETHEUS_MULTIPROC_DIR (a fresh temp dir unless set), which /metrics
+  aggregates; the gauges of a worker that exits are dropped in child_exit.
+"""
+import glob
+import os
+import tempfile
+
+# Before the app (and prometheus_client) is preloaded: the value storage is chosen on import
+if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="prometheus-")
+
+from app.config import settings, worker_count  # noqa: E402
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = "uvicorn_worker.UvicornWorker"
+workers = worker_count()
+preload_app = True
+
+max_requests = settings.worker_max_requests
+max_requests_jitter = max(1, settings.worker_max_requests // 10) if settings.worker_max_requests else 0
+graceful_timeout = settings.worker_graceful_timeout
+# Heartbeat of the worker process, not a request timeout (the event loop keeps beating)
+timeout = 60
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+loglevel = "info"
+
+
+def on_starting(server):
+    # Files left by a previous master in a reused directory: those processes are gone.
+    # Once per master start; a HUP reload re-reads this file but must keep the live workers' values.
+    for stale in glob.glob(os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], "*.db")):
+        os.remove(stale)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
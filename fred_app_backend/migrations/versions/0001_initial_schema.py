@@ -0,0 +1,131 @@
+"""Initial schema (tables previously created by create_all at startup)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _missing(table_name):
+    # Databases bootstrapped by the old create_all() call already have these
+    # tables; only create what is not there yet so `upgrade head` works on both.
+    if op.get_context().as_sql:
+        return True
+    return not sa.inspect(op.get_bind()).has_table(table_name)
+
+
+def upgrade():
+    if _missing("pets"):
+        op.create_table(
+            "pets",
+            sa.Column("id", sa.String(), primary_key=True, index=True),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("breed", sa.String(), nullable=True),
+            sa.Column("age", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        )
+
+    if _missing("routine_templates"):
+        op.create_table(
+            "routine_templates",
+            sa.Column("id", sa.String(), primary_key=True, index=True),
+            sa.Column("pet_id", sa.String(), sa.ForeignKey("pets.id"), nullable=False),
+            sa.Column("period", sa.String(), nullable=False),
+            sa.Column("task", sa.String(), nullable=False),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        )
+
+    if _missing("routine_items"):
+        op.create_table(
+            "routine_items",
+            sa.Column("id", sa.String(), primary_key=True, index=True),
+            sa.Column("pet_id", sa.String(), sa.ForeignKey("pets.id"), nullable=False),
+            sa.Column("template_id", sa.String(), sa.ForeignKey("routine_templates.id"), nullable=True),
+            sa.Column("period", sa.String(), nullable=False),
+            sa.Column("task", sa.String(), nullable=False),
+            sa.Column("completed", sa.Boolean(), nullable=True),
+            sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("date", sa.String(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        )
+
+    if _missing("glucose_readings"):
+        op.create_table(
+            "glucose_readings",
+            sa.Column("id", sa.String(), primary_key=True, index=True),
+            sa.Column("pet_id", sa.String(), sa.ForeignKey("pets.id"), nullable=False),
+            sa.Column("value", sa.Float(), nullable=False),
+            sa.Column("time_of_day", sa.String(), nullable=False),
+            sa.Column("protocol", sa.String(), nullable=True),
+            sa.Column("notes", sa.Text(), nullable=True),
+            sa.Column("date", sa.String(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        )
+
+    if _missing("mood_entries"):
+        op.create_table(
+            "mood_entries",
+            sa.Column("id", sa.String(), primary_key=True, index=True),
+            sa.Column("pet_id", sa.String(), sa.ForeignKey("pets.id"), nullable=False),
+            sa.Column("energy_level", sa.String(), nullable=False),
+            sa.Column("general_mood", sa.JSON(), nullable=False),
+            sa.Column("appetite", sa.String(), nullable=False),
+            sa.Column("walk", sa.String(), nullable=False),
+            sa.Column("notes", sa.Text(), nullable=True),
+            sa.Column("date", sa.String(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        )
+
+    if _missing("walk_entries"):
+        op.create_table(
+            "walk_entries",
+            sa.Column("id", sa.String(), primary_key=True, index=True),
+            sa.Column("pet_id", sa.String(), sa.ForeignKey("pets.id"), nullable=False),
+            sa.Column("date", sa.String(), nullable=False),
+            sa.Column("start_time", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("end_time", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("duration_seconds", sa.Integer(), nullable=True),
+            sa.Column("pause_events", sa.JSON(), nullable=True),
+            sa.Column("energy_level", sa.String(), nullable=True),
+            sa.Column("behavior", sa.JSON(), nullable=True),
+            sa.Column("completed_route", sa.Boolean(), nullable=True),
+            sa.Column("pee_count", sa.String(), nullable=True),
+            sa.Column("pee_volume", sa.String(), nullable=True),
+            sa.Column("pee_color", sa.String(), nullable=True),
+            sa.Column("poop_made", sa.Boolean(), nullable=True),
+            sa.Column("poop_consistency", sa.String(), nullable=True),
+            sa.Column("poop_blood", sa.Boolean(), nullable=True),
+            sa.Column("poop_mucus", sa.Boolean(), nullable=True),
+            sa.Column("poop_color", sa.String(), nullable=True),
+            sa.Column("photos", sa.JSON(), nullable=True),
+            sa.Column("weather", sa.String(), nullable=True),
+            sa.Column("temperature_celsius", sa.Float(), nullable=True),
+            sa.Column("route_distance_km", sa.Float(), nullable=True),
+            sa.Column("route_description", sa.String(), nullable=True),
+            sa.Column("mobility_notes", sa.Text(), nullable=True),
+            sa.Column("disorientation", sa.Boolean(), nullable=True),
+            sa.Column("excessive_panting", sa.Boolean(), nullable=True),
+            sa.Column("cough", sa.Boolean(), nullable=True),
+            sa.Column("notes", sa.Text(), nullable=True),
+            sa.Column("alerts", sa.JSON(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        )
+
+
+def downgrade():
+    op.drop_table("walk_entries")
+    op.drop_table("mood_entries")
+    op.drop_table("glucose_readings")
+    op.drop_table("routine_items")
+    op.drop_table("routine_templates")
+    op.drop_table("pets")
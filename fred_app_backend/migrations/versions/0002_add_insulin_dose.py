@@ -0,0 +1,25 @@
+"""Add optional insulin_dose to glucose readings (was scripts/003_add_insulin_dose.sql)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # IF NOT EXISTS: the column may already have been added by hand with the old script
+    op.execute(
+        "ALTER TABLE glucose_readings "
+        "ADD COLUMN IF NOT EXISTS insulin_dose DOUBLE PRECISION NULL"
+    )
+
+
+def downgrade():
+    op.execute("ALTER TABLE glucose_readings DROP COLUMN IF EXISTS insulin_dose")
@@ -0,0 +1,50 @@
+"""Composite (pet_id, date/time) indexes for the per-pet list queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ("ix_routine_templates_pet_id_is_active", "routine_templates", ["pet_id", "is_active"]),
+    ("ix_routine_items_pet_id_date", "routine_items", ["pet_id", "date"]),
+    ("ix_glucose_readings_pet_id_created_at", "glucose_readings", ["pet_id", "created_at"]),
+    ("ix_glucose_readings_pet_id_date", "glucose_readings", ["pet_id", "date"]),
+    ("ix_mood_entries_pet_id_created_at", "mood_entries", ["pet_id", "created_at"]),
+    ("ix_mood_entries_pet_id_date", "mood_entries", ["pet_id", "date"]),
+    ("ix_walk_entries_pet_id_start_time", "walk_entries", ["pet_id", "start_time"]),
+    ("ix_walk_entries_pet_id_date", "walk_entries", ["pet_id", "date"]),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block and does
+    # not block writes on tables that already hold years of history.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,52 @@
+"""Extend the (pet_id, created_at/start_time) indexes with id for keyset pagination
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+# (old index, new index, table, new columns)
+INDEXES = [
+    (
+        "ix_glucose_readings_pet_id_created_at",
+        "ix_glucose_readings_pet_id_created_at_id",
+        "glucose_readings",
+        ["pet_id", "created_at", "id"],
+    ),
+    (
+        "ix_mood_entries_pet_id_created_at",
+        "ix_mood_entries_pet_id_created_at_id",
+        "mood_entries",
+        ["pet_id", "created_at", "id"],
+    ),
+    (
+        "ix_walk_entries_pet_id_start_time",
+        "ix_walk_entries_pet_id_start_time_id",
+        "walk_entries",
+        ["pet_id", "start_time", "id"],
+    ),
+]
+
+
+def upgrade():
+    # The (sort column, id) key used by the cursors is then served straight
+    # from the index, in order, for every page.
+    with op.get_context().autocommit_block():
+        for old_name, new_name, table, columns in INDEXES:
+            op.create_index(new_name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+            op.drop_index(old_name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for old_name, new_name, table, columns in INDEXES:
+            op.create_index(old_name, table, columns[:2], postgresql_concurrently=True, if_not_exists=True)
+            op.drop_index(new_name, table_name=table, postgresql_concurrently=True, if_exists=True)
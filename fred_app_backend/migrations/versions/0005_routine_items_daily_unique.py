@@ -0,0 +1,53 @@
+"""Unique (pet_id, template_id, date) on routine items for race-free daily materialization
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Concurrent ensure-daily calls may already have created duplicates; keep
+    # the completed one (or else the oldest) for each template and day.
+    op.execute(
+        """
+        DELETE FROM routine_items ri
+        USING (
+            SELECT id,
+                   row_number() OVER (
+                       PARTITION BY pet_id, template_id, date
+                       ORDER BY completed DESC NULLS LAST, created_at, id
+                   ) AS position
+            FROM routine_items
+            WHERE template_id IS NOT NULL
+        ) duplicates
+        WHERE ri.id = duplicates.id AND duplicates.position > 1
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "uq_routine_items_pet_id_template_id_date",
+            "routine_items",
+            ["pet_id", "template_id", "date"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "uq_routine_items_pet_id_template_id_date",
+            table_name="routine_items",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,37 @@
+"""Per pet, per day glucose rollup table
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+
+Populate it afterwards with: python -m app.jobs.backfill_glucose_stats
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "glucose_daily_stats",
+        sa.Column("pet_id", sa.String(), sa.ForeignKey("pets.id"), primary_key=True),
+        sa.Column("date", sa.String(), primary_key=True),
+        sa.Column("reading_count", sa.Integer(), nullable=False),
+        sa.Column("value_sum", sa.Float(), nullable=False),
+        sa.Column("value_sum_squares", sa.Float(), nullable=False),
+        sa.Column("value_min", sa.Float(), nullable=False),
+        sa.Column("value_max", sa.Float(), nullable=False),
+        sa.Column("below_range_count", sa.Integer(), nullable=False),
+        sa.Column("in_range_count", sa.Integer(), nullable=False),
+        sa.Column("above_range_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table("glucose_daily_stats")
@@ -0,0 +1,38 @@
+"""Per pet, per day walk rollup table
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+
+Populate it afterwards with: python -m app.jobs.backfill_walk_stats
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "walk_daily_stats",
+        sa.Column("pet_id", sa.String(), sa.ForeignKey("pets.id"), primary_key=True),
+        sa.Column("date", sa.String(), primary_key=True),
+        sa.Column("walk_count", sa.Integer(), nullable=False),
+        sa.Column("total_duration_seconds", sa.Integer(), nullable=False),
+        sa.Column("total_distance_km", sa.Float(), nullable=False),
+        sa.Column("pee_walk_count", sa.Integer(), nullable=False),
+        sa.Column("pee_count", sa.Integer(), nullable=False),
+        sa.Column("poop_count", sa.Integer(), nullable=False),
+        sa.Column("loose_poop_count", sa.Integer(), nullable=False),
+        sa.Column("energy_score_sum", sa.Integer(), nullable=False),
+        sa.Column("energy_score_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table("walk_daily_stats")
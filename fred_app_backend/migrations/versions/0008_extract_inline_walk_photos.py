@@ -0,0 +1,64 @@
+"""Move inline base64 walk photos to the photo store, keeping only their SHA-256 ids
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+
+Blobs are written to the configured photo storage (PHOTO_STORAGE_DIR), so run
+it where the API's photo volume is mounted.
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.photo_storage import externalize_photos
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 100
+# Photo lists holding only URLs/ids stay far below this
+INLINE_THRESHOLD = 1024
+
+
+def upgrade():
+    if op.get_context().as_sql:
+        # Needs the row contents; nothing to emit in offline mode
+        return
+
+    bind = op.get_bind()
+    select_batch = sa.text(
+        """
+        SELECT id, photos::text AS photos
+        FROM walk_entries
+        WHERE id > :after AND photos IS NOT NULL AND length(photos::text) > :threshold
+        ORDER BY id
+        LIMIT :limit
+        """
+    )
+    update_photos = sa.text("UPDATE walk_entries SET photos = CAST(:photos AS json) WHERE id = :id")
+
+    after = ""
+    while True:
+        rows = bind.execute(
+            select_batch, {"after": after, "threshold": INLINE_THRESHOLD, "limit": BATCH_SIZE}
+        ).all()
+        if not rows:
+            break
+
+        for row in rows:
+            photos = json.loads(row.photos)
+            if isinstance(photos, list):
+                extracted = externalize_photos(photos)
+                if extracted != photos:
+                    bind.execute(update_photos, {"id": row.id, "photos": json.dumps(extracted)})
+        after = rows[-1].id
+
+
+def downgrade():
+    # Photo ids stay valid (GET /photos/{id}); the blobs are not inlined back
+    pass
@@ -0,0 +1,145 @@
+"""Native DATE columns instead of 'YYYY-MM-DD' strings
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+
+Online for the history tables (routine_items, glucose_readings, mood_entries,
+walk_entries): a DATE shadow column is added, kept in sync by a trigger while
+the old workers still write strings, backfilled in batches and indexed
+concurrently. Only the final swap (drop the string column, rename the shadow
+one) takes an exclusive lock, and it touches no rows.
+
+Malformed strings fall back to the Brasília day of created_at. Rollup rows of
+malformed days are dropped; rebuild them afterwards with
+python -m app.jobs.backfill_glucose_stats and backfill_walk_stats.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+# table -> date indexes as (name, columns, unique)
+TABLES = {
+    "routine_items": [
+        ("ix_routine_items_pet_id_date", ["pet_id", "date"], False),
+        ("uq_routine_items_pet_id_template_id_date", ["pet_id", "template_id", "date"], True),
+    ],
+    "glucose_readings": [("ix_glucose_readings_pet_id_date", ["pet_id", "date"], False)],
+    "mood_entries": [("ix_mood_entries_pet_id_date", ["pet_id", "date"], False)],
+    "walk_entries": [("ix_walk_entries_pet_id_date", ["pet_id", "date"], False)],
+}
+
+# Derived tables: small, so their column is converted in place
+ROLLUP_TABLES = ["glucose_daily_stats", "walk_daily_stats"]
+
+
+def _shadow_columns(columns):
+    return ["date_new" if column == "date" else column for column in columns]
+
+
+def _backfill(bind, table):
+    fill = f"UPDATE {table} SET date_new = iso_date_or(date, created_date(created_at)) WHERE date_new IS NULL"
+    if op.get_context().as_sql:
+        op.execute(fill)
+        return
+
+    # Short transactions of BATCH_SIZE rows each (autocommit), in id order
+    select_batch = sa.text(f"SELECT id FROM {table} WHERE id > :after ORDER BY id LIMIT :limit")
+    fill_batch = sa.text(f"{fill} AND id > :after AND id <= :last")
+    after = ""
+    while True:
+        ids = bind.execute(select_batch, {"after": after, "limit": BATCH_SIZE}).scalars().all()
+        if not ids:
+            break
+        bind.execute(fill_batch, {"after": after, "last": ids[-1]})
+        after = ids[-1]
+
+
+def upgrade():
+    op.execute(
+        r"""
+        CREATE OR REPLACE FUNCTION iso_date_or(value text, fallback date) RETURNS date
+        LANGUAGE plpgsql STABLE AS $$
+        BEGIN
+            IF value ~ '^\d{4}-\d{2}-\d{2}$' THEN
+                RETURN value::date;
+            END IF;
+            RETURN fallback;
+        EXCEPTION WHEN datetime_field_overflow OR invalid_datetime_format THEN
+            RETURN fallback;
+        END $$
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION created_date(created_at timestamptz) RETURNS date
+        LANGUAGE sql STABLE AS $$
+            SELECT (coalesce(created_at, now()) AT TIME ZONE 'America/Sao_Paulo')::date
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION sync_date_new() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.date_new := iso_date_or(NEW.date, created_date(NEW.created_at));
+            RETURN NEW;
+        END $$
+        """
+    )
+
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        for table, indexes in TABLES.items():
+            op.add_column(table, sa.Column("date_new", sa.Date(), nullable=True))
+            op.execute(
+                f"CREATE TRIGGER {table}_sync_date_new BEFORE INSERT OR UPDATE OF date ON {table} "
+                f"FOR EACH ROW EXECUTE FUNCTION sync_date_new()"
+            )
+            _backfill(bind, table)
+
+            # Validated CHECK: the SET NOT NULL of the swap then skips the table scan
+            op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_date_new_not_null CHECK (date_new IS NOT NULL) NOT VALID")
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {table}_date_new_not_null")
+
+            for name, columns, unique in indexes:
+                op.create_index(
+                    f"{name}_new",
+                    table,
+                    _shadow_columns(columns),
+                    unique=unique,
+                    postgresql_concurrently=True,
+                    if_not_exists=True,
+                )
+
+    # Swap: catalog-only changes, one short exclusive lock per table
+    for table, indexes in TABLES.items():
+        op.execute(f"DROP TRIGGER {table}_sync_date_new ON {table}")
+        op.alter_column(table, "date_new", nullable=False)
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {table}_date_new_not_null")
+        op.drop_column(table, "date")  # drops the string indexes with it
+        op.alter_column(table, "date_new", new_column_name="date")
+        for name, _, _ in indexes:
+            op.execute(f"ALTER INDEX {name}_new RENAME TO {name}")
+
+    for table in ROLLUP_TABLES:
+        op.execute(f"DELETE FROM {table} WHERE iso_date_or(date, NULL) IS NULL")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN date TYPE date USING date::date")
+
+    op.execute("DROP FUNCTION sync_date_new()")
+    op.execute("DROP FUNCTION created_date(timestamptz)")
+    op.execute("DROP FUNCTION iso_date_or(text, date)")
+
+
+def downgrade():
+    # Rewrites the tables under an exclusive lock (indexes are rebuilt with them)
+    for table in [*TABLES, *ROLLUP_TABLES]:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN date TYPE varchar USING to_char(date, 'YYYY-MM-DD')")
@@ -1,13 +1,23 @@
 #!/usr/bin/env python3
 """
 Fred Care API Server
-Run with: python run.py
+Run with: python run.py           (single process, reload when DEBUG)
+          python run.py --prod    (gunicorn workers, see gunicorn.conf.py)
 """
 
-import uvicorn
-from app.config import settings
+import os
+import sys
 
 if __name__ == "__main__":
+    if "--prod" in sys.argv[1:]:
+        os.execvp("gunicorn", ["gunicorn", "-c", "gunicorn.conf.py", "app.main:app"])
+
+    # One process: the whole DB_MAX_CONNECTIONS budget belongs to it
+    os.environ.setdefault("WEB_CONCURRENCY", "1")
+
+    import uvicorn
+    from app.config import settings
+
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
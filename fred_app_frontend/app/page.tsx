@@ -45,6 +45,7 @@ import {
   Camera,
 } from "lucide-react"
 import { usePetData } from "@/hooks/use-pet-data"
+import { photoService } from "@/lib/api/photo-service"
 import {
   RoutineItem,
   GlucoseReading,
@@ -1048,6 +1049,23 @@ export default function FredCareApp() {
       []
     )
 
+    const handleUploadPhotos = useCallback(async (files: FileList | null) => {
+      if (!files?.length) return
+      try {
+        const uploaded = await Promise.all(Array.from(files).map((file) => photoService.uploadPhoto(file)))
+        setWalkForm((prev) => {
+          if (!prev) return prev
+          const existing = prev.photosText.trim()
+          const ids = uploaded.map((photo) => photo.id).join("\n")
+          return { ...prev, photosText: existing ? `${existing}\n${ids}` : ids }
+        })
+        toast.success(uploaded.length > 1 ? "Fotos enviadas!" : "Foto enviada!")
+      } catch (error) {
+        console.error("Error uploading photos:", error)
+        toast.error("Não foi possível enviar a foto")
+      }
+    }, [])
+
     const handleToggleBehavior = useCallback((value: string) => {
       setWalkForm((prev) => {
         if (!prev) return prev
@@ -1942,6 +1960,16 @@ export default function FredCareApp() {
                     className="w-full rounded-md border px-3 py-2 text-sm"
                     placeholder="Cole links de fotos ou referências para mostrar ao veterinário..."
                   />
+                  <input
+                    type="file"
+                    accept="image/*"
+                    multiple
+                    onChange={(event) => {
+                      void handleUploadPhotos(event.target.files)
+                      event.target.value = ""
+                    }}
+                    className="mt-2 w-full text-sm"
+                  />
                 </div>
               </CardContent>
             </Card>
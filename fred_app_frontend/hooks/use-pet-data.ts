@@ -1,17 +1,29 @@
 "use client"
 
-import { useEffect, useState } from "react"
+import { useEffect, useRef, useState } from "react"
 import { routineService, CreateRoutineItemData, UpdateRoutineItemData } from "@/lib/api/routine-service"
 import { routineTemplateService, RoutineTemplate, CreateRoutineTemplateData, UpdateRoutineTemplateData } from "@/lib/api/routine-template-service"
 import { glucoseService, UpdateGlucoseReadingData } from "@/lib/api/glucose-service"
 import { moodService, CreateMoodEntryData } from "@/lib/api/mood-service"
-import { petService, CreatePetData } from "@/lib/api/pet-service"
+import { petService, CreatePetData, PetChangeEvent } from "@/lib/api/pet-service"
 import { walkService, CreateWalkEntryData, UpdateWalkEntryData } from "@/lib/api/walk-service"
 import { RoutineItem, GlucoseReading, MoodEntry, Pet, WalkEntry } from "@/types"
 
 // Default pet ID for compatibility - will be managed by context later
 const DEFAULT_PET_ID = "default-pet"
 
+const PERIOD_ORDER: Record<string, number> = { morning: 1, afternoon: 2, evening: 3 }
+
+const newestFirst = <T,>(key: keyof T) => (a: T, b: T) => String(b[key]).localeCompare(String(a[key]))
+const byPeriod = (a: RoutineItem, b: RoutineItem) => (PERIOD_ORDER[a.period] ?? 4) - (PERIOD_ORDER[b.period] ?? 4)
+
+// Applies one change feed event (insert/update/delete of a record) to a list
+function applyChange<T extends { id: string }>(list: T[], event: PetChangeEvent, compare: (a: T, b: T) => number): T[] {
+  const rest = list.filter(item => item.id !== event.id)
+  if (event.op === "delete" || !event.data) return rest
+  return [...rest, event.data as unknown as T].sort(compare)
+}
+
 export function usePetData() {
   const [pets, setPets] = useState<Pet[]>([])
   const [currentPetId, setCurrentPetId] = useState<string>(DEFAULT_PET_ID)
@@ -22,6 +34,8 @@ export function usePetData() {
   const [moodEntries, setMoodEntries] = useState<MoodEntry[]>([])
   const [walkEntries, setWalkEntries] = useState<WalkEntry[]>([])
   const [isLoading, setIsLoading] = useState(true)
+  // True while the change feed is connected: mutations then skip their refetch
+  const feedConnected = useRef(false)
 
   // Load data on mount
   useEffect(() => {
@@ -35,6 +49,56 @@ export function usePetData() {
     }
   }, [currentPetId])
 
+  // Live changes made on other devices (and our own), applied as deltas
+  useEffect(() => {
+    if (!currentPetId || currentPetId === DEFAULT_PET_ID) return
+
+    const source = new EventSource(petService.getEventsUrl(currentPetId))
+    source.addEventListener("ready", () => {
+      feedConnected.current = true
+    })
+    source.addEventListener("resync", () => {
+      loadPetData()
+    })
+    source.addEventListener("change", (message) => {
+      const event: PetChangeEvent = JSON.parse((message as MessageEvent).data)
+      if (event.op === "bulk" || (event.op !== "delete" && !event.data)) {
+        loadPetData()
+        return
+      }
+      switch (event.entity) {
+        case "routine_item": {
+          const today = new Date().toISOString().split("T")[0]
+          setAllRoutineItems(items => applyChange(items, event, newestFirst<RoutineItem>("date")))
+          setRoutineItems(items =>
+            event.op === "delete" || (event.data as { date?: string }).date === today
+              ? applyChange(items, event, byPeriod)
+              : items
+          )
+          break
+        }
+        case "glucose_reading":
+          setGlucoseReadings(readings => applyChange(readings, event, newestFirst<GlucoseReading>("created_at")))
+          break
+        case "mood_entry":
+          setMoodEntries(entries => applyChange(entries, event, newestFirst<MoodEntry>("created_at")))
+          break
+        case "walk_entry":
+          setWalkEntries(entries => applyChange(entries, event, newestFirst<WalkEntry>("start_time")))
+          break
+      }
+    })
+    source.onerror = () => {
+      // EventSource reconnects by itself; refetch after mutations meanwhile
+      feedConnected.current = false
+    }
+
+    return () => {
+      feedConnected.current = false
+      source.close()
+    }
+  }, [currentPetId])
+
   const initializeApp = async () => {
     setIsLoading(true)
     try {
@@ -73,17 +137,14 @@ export function usePetData() {
     
     setIsLoading(true)
     try {
-      // Ensure daily tasks exist before loading
-      await ensureDailyTasks()
-      
-      await Promise.all([
-        loadRoutineTemplates(),
-        loadRoutineItems(),
-        loadAllRoutineItems(),
-        loadGlucoseReadings(),
-        loadMoodEntries(),
-        loadWalkEntries()
-      ])
+      // One request: materializes today's tasks and returns every list
+      const dashboard = await petService.getDashboard(currentPetId)
+      setRoutineTemplates(dashboard.routine_templates)
+      setRoutineItems(dashboard.routine_items)
+      setAllRoutineItems(dashboard.all_routine_items)
+      setGlucoseReadings(dashboard.glucose_readings)
+      setMoodEntries(dashboard.mood_entries)
+      setWalkEntries(dashboard.walk_entries)
     } catch (error) {
       console.error("Error loading pet data:", error)
     } finally {
@@ -185,7 +246,7 @@ export function usePetData() {
         completed,
         completed_at: completed ? new Date().toISOString() : null,
       })
-      await Promise.all([loadRoutineItems(), loadAllRoutineItems()])
+      if (!feedConnected.current) await Promise.all([loadRoutineItems(), loadAllRoutineItems()])
     } catch (error) {
       console.error("Error updating routine item:", error)
     }
@@ -269,7 +330,7 @@ export function usePetData() {
         protocol,
         notes,
       })
-      await loadGlucoseReadings()
+      if (!feedConnected.current) await loadGlucoseReadings()
     } catch (error) {
       console.error("Error adding glucose reading:", error)
     }
@@ -278,7 +339,7 @@ export function usePetData() {
   const updateGlucoseReading = async (id: string, updates: UpdateGlucoseReadingData) => {
     try {
       await glucoseService.updateGlucoseReading(id, updates)
-      await loadGlucoseReadings()
+      if (!feedConnected.current) await loadGlucoseReadings()
     } catch (error) {
       console.error("Error updating glucose reading:", error)
       throw error
@@ -296,7 +357,7 @@ export function usePetData() {
     if (!currentPetId) return
     try {
       await moodService.createMoodEntry(currentPetId, entry)
-      await loadMoodEntries()
+      if (!feedConnected.current) await loadMoodEntries()
     } catch (error) {
       console.error("Error adding mood entry:", error)
     }
@@ -306,7 +367,7 @@ export function usePetData() {
     if (!currentPetId) return undefined
     try {
       const created = await walkService.createWalkEntry(currentPetId, entry)
-      await loadWalkEntries()
+      if (!feedConnected.current) await loadWalkEntries()
       return created
     } catch (error) {
       console.error("Error creating walk entry:", error)
@@ -317,7 +378,7 @@ export function usePetData() {
   const updateWalkEntry = async (id: string, updates: UpdateWalkEntryData): Promise<WalkEntry> => {
     try {
       const updated = await walkService.updateWalkEntry(id, updates)
-      await loadWalkEntries()
+      if (!feedConnected.current) await loadWalkEntries()
       return updated
     } catch (error) {
       console.error("Error updating walk entry:", error)
@@ -328,7 +389,7 @@ export function usePetData() {
   const deleteWalkEntry = async (id: string) => {
     try {
       await walkService.deleteWalkEntry(id)
-      await loadWalkEntries()
+      if (!feedConnected.current) await loadWalkEntries()
     } catch (error) {
       console.error("Error deleting walk entry:", error)
       throw error
@@ -14,6 +14,8 @@ interface ApiResponse<T> {
 class ApiClient {
   private baseURL: string
   private defaultHeaders: Record<string, string>
+  // Time of our last write (X-Last-Write), echoed back so reads right after it see it
+  private lastWrite: string | null = null
 
   constructor() {
     this.baseURL = API_CONFIG.baseURL
@@ -27,6 +29,7 @@ class ApiClient {
       method,
       headers: {
         ...this.defaultHeaders,
+        ...(this.lastWrite ? { 'X-Last-Write': this.lastWrite } : {}),
         ...headers,
       },
     }
@@ -36,7 +39,14 @@ class ApiClient {
     }
 
     try {
-      const response = await fetch(`${this.baseURL}${endpoint}`, config)
+      let response = await fetch(`${this.baseURL}${endpoint}`, config)
+      if (response.status === 503 && method === 'GET') {
+        // Shed by the server's admission control: retry once after Retry-After
+        const retryAfter = Number(response.headers.get('Retry-After') ?? 1)
+        await new Promise(resolve => setTimeout(resolve, retryAfter * 1000))
+        response = await fetch(`${this.baseURL}${endpoint}`, config)
+      }
+      this.lastWrite = response.headers.get('X-Last-Write') ?? this.lastWrite
 
       if (!response.ok) {
         throw new Error(`HTTP error! status: ${response.status}`)
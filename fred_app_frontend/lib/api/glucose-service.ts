@@ -8,6 +8,7 @@ export interface CreateGlucoseReadingData {
   notes?: string
   date?: string
   insulin_dose?: number | null
+  measured_at?: string
 }
 
 export interface UpdateGlucoseReadingData {
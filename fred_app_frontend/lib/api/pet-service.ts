@@ -1,6 +1,7 @@
 import { apiClient } from './client'
-import { API_ENDPOINTS } from './config'
-import { Pet } from '../../types'
+import { API_CONFIG, API_ENDPOINTS } from './config'
+import { Pet, RoutineItem, GlucoseReading, MoodEntry, WalkEntry } from '../../types'
+import { RoutineTemplate } from './routine-template-service'
 
 export interface CreatePetData {
   name: string
@@ -8,6 +9,25 @@ export interface CreatePetData {
   age?: number
 }
 
+export interface PetChangeEvent {
+  pet_id: string
+  entity: 'routine_item' | 'glucose_reading' | 'mood_entry' | 'walk_entry'
+  op: 'insert' | 'update' | 'delete' | 'bulk'
+  id?: string
+  data?: Record<string, unknown>  // missing for bulk events and very large records
+}
+
+export interface PetDashboard {
+  pet: Pet
+  date: string
+  routine_templates: RoutineTemplate[]
+  routine_items: RoutineItem[]
+  all_routine_items: RoutineItem[]
+  glucose_readings: GlucoseReading[]
+  mood_entries: MoodEntry[]
+  walk_entries: WalkEntry[]
+}
+
 class PetService {
   async getPets(): Promise<Pet[]> {
     return apiClient.get<Pet[]>(API_ENDPOINTS.pets)
@@ -17,6 +37,23 @@ class PetService {
     return apiClient.get<Pet>(`${API_ENDPOINTS.pets}/${id}`)
   }
 
+  async getDashboard(id: string, date?: string): Promise<PetDashboard> {
+    const today = date || new Date().toISOString().split("T")[0]
+    return apiClient.get<PetDashboard>(`${API_ENDPOINTS.pets}/${id}/dashboard?date=${today}`)
+  }
+
+  // Full history download (streamed by the API); use as a link href
+  getExportUrl(id: string, format: 'ndjson' | 'csv' = 'csv', since?: string): string {
+    const params = new URLSearchParams({ format })
+    if (since) params.set('since', since)
+    return `${API_CONFIG.baseURL}${API_ENDPOINTS.pets}/${id}/export?${params.toString()}`
+  }
+
+  // Server-Sent Events feed of the pet's changes; use with EventSource
+  getEventsUrl(id: string): string {
+    return `${API_CONFIG.baseURL}${API_ENDPOINTS.pets}/${id}/events`
+  }
+
   async createPet(data: CreatePetData): Promise<Pet> {
     return apiClient.post<Pet>(API_ENDPOINTS.pets, data)
   }
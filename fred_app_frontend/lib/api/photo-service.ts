@@ -0,0 +1,35 @@
+import { API_CONFIG } from "./config"
+
+export interface UploadedPhoto {
+  id: string
+  size: number
+  content_type: string
+}
+
+// Longest edge: small 160px, medium 480px, large 1080px
+export type PhotoSize = "small" | "medium" | "large"
+
+const PHOTO_ID_PATTERN = /^[0-9a-f]{64}$/
+
+class PhotoService {
+  // Multipart upload; the returned id (SHA-256 of the file) goes into WalkEntry.photos
+  async uploadPhoto(file: File): Promise<UploadedPhoto> {
+    const form = new FormData()
+    form.append("file", file)
+
+    const response = await fetch(`${API_CONFIG.baseURL}/photos`, { method: "POST", body: form })
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`)
+    }
+    return response.json()
+  }
+
+  // Photo ids are served by the API (optionally as a thumbnail); anything else is already a URL
+  getPhotoUrl(photo: string, size?: PhotoSize): string {
+    if (!PHOTO_ID_PATTERN.test(photo)) return photo
+    const url = `${API_CONFIG.baseURL}/photos/${photo}`
+    return size ? `${url}?size=${size}` : url
+  }
+}
+
+export const photoService = new PhotoService()
@@ -47,7 +47,7 @@ export interface UpdateWalkEntryData extends Omit<CreateWalkEntryData, "start_ti
 class WalkService {
   async getWalkEntries(
     petId: string,
-    options: { limit?: number; startDate?: string; endDate?: string } = {},
+    options: { limit?: number; startDate?: string; endDate?: string; fields?: (keyof WalkEntry)[] } = {},
   ): Promise<WalkEntry[]> {
     const searchParams = new URLSearchParams({ pet_id: petId })
 
@@ -63,6 +63,11 @@ class WalkService {
       searchParams.set("end_date", options.endDate)
     }
 
+    // Sparse fieldset: the API returns only these fields (plus id and start_time)
+    if (options.fields?.length) {
+      searchParams.set("fields", options.fields.join(","))
+    }
+
     // Always default to most recent first
     searchParams.set("sort", "start_time:desc")
 